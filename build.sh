@@ -5,8 +5,14 @@ set -o errexit
 # Modify this line as needed for your package manager (pip, poetry, etc.)
 pip install -r requirements.txt
 
+# Precompile bytecode so new instances don't compile the app on cold start
+python -m compileall -q task_manager tasks manage.py
+
 # Convert static asset files
 python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Render task and comment HTML stored by older Markdown renderer versions
+python manage.py render_markup
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Gunicorn settings for production.
+
+``gunicorn task_manager.wsgi`` reads this file from the working directory.
+The master imports the application once and forks the workers from it, so
+they share its memory copy-on-write instead of each importing Django on
+its own. Garbage collection stays off until then and the imported objects
+are frozen before every fork, since a collection would write to, and so
+unshare, nearly every page the master holds.
+
+Tune with WEB_CONCURRENCY (workers), GUNICORN_WORKER_CLASS,
+GUNICORN_THREADS, GUNICORN_TIMEOUT and GUNICORN_MAX_REQUESTS.
+"""
+
+import gc
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings.prod")
+
+wsgi_app = "task_manager.wsgi:application"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0"))
+
+max_requests_jitter = max_requests // 10
+
+preload_app = True
+
+accesslog = "-"
+
+gc.disable()
+
+
+def when_ready(server):
+    from tasks import health
+
+    # In the master, before the first fork, so the URLconf and compiled
+    # templates are frozen with the app and shared by every worker.
+    health.load_code()
+
+
+def pre_fork(server, worker):
+    from django.core.cache import caches
+    from django.db import connections
+
+    # Sockets opened while loading the app would be shared by every worker,
+    # interleaving their traffic; close them so there is nothing to inherit.
+    connections.close_all()
+    caches.close_all()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from django.core.cache import caches
+    from django.db import connections
+
+    from tasks import health
+
+    # Nothing should be left after pre_fork, but a worker must never talk
+    # over a connection it did not open.
+    connections.close_all()
+    caches.close_all()
+    gc.enable()
+    health.readiness.start()
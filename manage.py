@@ -1,16 +1,16 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
 
-from dotenv import load_dotenv
-
 import os
 import sys
 
-load_dotenv()
+from dotenv import load_dotenv
 
 
 def main():
     """Run administrative tasks."""
+    # Before settings are chosen: .env may set DJANGO_SETTINGS_MODULE.
+    load_dotenv()
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings.dev")
     try:
         from django.core.management import execute_from_command_line
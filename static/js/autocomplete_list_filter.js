@@ -0,0 +1,17 @@
+(function () {
+  "use strict";
+
+  // Apply an autocomplete list filter as soon as a value is picked.
+  window.addEventListener("load", function () {
+    django.jQuery(".autocomplete-list-filter select").on("change", function () {
+      const params = new URLSearchParams(
+        this.closest(".autocomplete-list-filter").dataset.clearUrl
+      );
+      if (this.value) {
+        params.set(this.name, this.value);
+      }
+      params.delete("p");
+      window.location.search = params.toString();
+    });
+  });
+})();
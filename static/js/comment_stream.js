@@ -0,0 +1,104 @@
+(function () {
+  "use strict";
+
+  const list = document.getElementById("comment-list");
+  if (!list) {
+    return;
+  }
+  const counter = document.getElementById("comment-count");
+  const form = document.getElementById("comment-form");
+
+  function findComment(id) {
+    return list.querySelector('[data-comment-id="' + id + '"]');
+  }
+
+  function fragment(html) {
+    const template = document.createElement("template");
+    template.innerHTML = html.trim();
+    return template.content.firstElementChild;
+  }
+
+  function updateCount(delta) {
+    if (counter) {
+      counter.textContent = Math.max(0, parseInt(counter.textContent, 10) + delta);
+    }
+  }
+
+  function insertComment(id, html) {
+    if (findComment(id)) {
+      return;
+    }
+    const empty = document.getElementById("comment-empty");
+    if (empty) {
+      empty.remove();
+    }
+    list.prepend(fragment(html));
+    updateCount(1);
+  }
+
+  const source = new EventSource(list.dataset.streamUrl);
+
+  source.addEventListener("created", function (event) {
+    const data = JSON.parse(event.data);
+    insertComment(data.id, data.html);
+  });
+
+  source.addEventListener("updated", function (event) {
+    const data = JSON.parse(event.data);
+    const current = findComment(data.id);
+    if (current) {
+      const updated = fragment(data.html);
+      // Keep the edit controls the server rendered for this viewer.
+      const controls = current.querySelector("ul");
+      const placeholder = updated.querySelector(".justify-content-between");
+      if (controls && placeholder && !updated.querySelector("ul")) {
+        placeholder.append(controls);
+      }
+      current.replaceWith(updated);
+    }
+  });
+
+  source.addEventListener("deleted", function (event) {
+    const data = JSON.parse(event.data);
+    const current = findComment(data.id);
+    if (current) {
+      current.remove();
+      updateCount(-1);
+    }
+  });
+
+  if (form) {
+    const errors = document.getElementById("comment-form-errors");
+
+    form.addEventListener("submit", function (event) {
+      event.preventDefault();
+      fetch(form.action || window.location.href, {
+        method: "POST",
+        body: new FormData(form),
+        headers: {"X-Requested-With": "XMLHttpRequest"},
+        credentials: "same-origin",
+      }).then(function (response) {
+        if (response.status === 201) {
+          return response.text().then(function (html) {
+            const comment = fragment(html);
+            const streamed = findComment(comment.dataset.commentId);
+            if (streamed) {
+              // The stream got there first, without this author's controls.
+              streamed.replaceWith(comment);
+            } else {
+              insertComment(comment.dataset.commentId, html);
+            }
+            form.reset();
+            errors.textContent = "";
+            errors.style.display = "none";
+          });
+        }
+        return response.json().then(function (data) {
+          const messages = Object.values(data.errors || {}).flat();
+          errors.textContent = messages.join(" ");
+          errors.style.display = "block";
+        });
+      });
+    });
+  }
+})();
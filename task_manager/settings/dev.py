@@ -16,3 +16,8 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+
+# Read replicas, as database URLs in DATABASE_REPLICA_URLS. Locally, a second
+# SQLite URL pointing at the same file is enough to exercise the routing.
+
+DATABASE_REPLICAS = add_replicas(DATABASES)
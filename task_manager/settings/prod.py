@@ -37,4 +37,8 @@ DATABASES = {
     }
 }
 
+# Read replicas, as database URLs in DATABASE_REPLICA_URLS.
+
+DATABASE_REPLICAS = add_replicas(DATABASES)
+
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
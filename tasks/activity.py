@@ -0,0 +1,105 @@
+"""Task activity log: field-level diffs written in batches.
+
+Entries are recorded from model signals and only join the buffer once the
+transaction that produced them commits, so rolled-back changes never reach
+the log. Inside a request the buffer is flushed with one ``bulk_create``
+when the response is ready (see ``ActivityLogMiddleware``); elsewhere it is
+flushed as soon as an entry arrives. A full buffer is always flushed early.
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from tasks.models import TaskActivity
+
+TRACKED_TASK_FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "status",
+    "priority",
+    "task_type_id",
+    "parent_id",
+)
+
+_actor = ContextVar("activity_actor", default=None)
+_deferred = ContextVar("activity_deferred", default=False)
+
+
+class ActivityBuffer:
+    """Per-process list of committed entries waiting for ``bulk_create``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= settings.ACTIVITY_LOG_BUFFER_SIZE
+        if full or not _deferred.get():
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if entries:
+            TaskActivity.objects.bulk_create(entries)
+
+
+buffer = ActivityBuffer()
+atexit.register(buffer.flush)
+
+
+@contextmanager
+def recording(actor=None):
+    """Attribute entries to ``actor`` and flush them once, on exit."""
+    actor_token = _actor.set(actor)
+    deferred_token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(deferred_token)
+        _actor.reset(actor_token)
+        buffer.flush()
+
+
+def current_actor_id():
+    actor = _actor.get()
+    if actor is None or not actor.is_authenticated:
+        return None
+    return actor.pk
+
+
+def serialize(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def record(task, verb, changes=None):
+    entry = TaskActivity(
+        task_id=task.pk,
+        task_name=task.name,
+        actor_id=current_actor_id(),
+        verb=verb,
+        changes=changes or {},
+    )
+    transaction.on_commit(partial(buffer.add, entry))
+
+
+def task_changes(task):
+    return {
+        name.removesuffix("_id"): [serialize(old), serialize(new)]
+        for name, (old, new) in task.get_changes(TRACKED_TASK_FIELDS).items()
+    }
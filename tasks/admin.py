@@ -1,39 +1,209 @@
+import json
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import assignment
+from .models import (
+    Task,
+    TaskType,
+    Position,
+    Worker,
+    Comment,
+    Job,
+    JobStatus,
+    WebhookDelivery,
+    WebhookEndpoint,
+)
+
+
+def estimate_count(queryset):
+    """The planner's row estimate for ``queryset``, or None where unavailable."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts exactly up to ``exact_limit`` rows and estimates beyond that.
+
+    The bounded count stops after ``exact_limit + 1`` rows; past it the
+    database's planner estimate stands in for a full ``COUNT(*)``.
+    """
+
+    exact_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        bounded = queryset.values("pk")[: self.exact_limit + 1].count()
+        if bounded <= self.exact_limit:
+            return bounded
+        estimate = estimate_count(queryset)
+        if estimate is None:
+            return queryset.count()
+        return max(estimate, bounded)
+
+
+class AutocompleteListFilter(admin.FieldListFilter):
+    """Filters on a relation through the admin's autocomplete view.
+
+    Unlike ``RelatedFieldListFilter`` it never loads the related table; only
+    the selected object is fetched, to label the widget.
+    """
+
+    template = "admin/autocomplete_list_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.admin_site = model_admin.admin_site
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.lookup_val is None,
+            "query_string": changelist.get_query_string(remove=[self.lookup_kwarg]),
+            "display": "All",
+        }
+
+    @property
+    def rendered_widget(self):
+        remote_model = self.field.remote_field.model
+        form_field = forms.ModelChoiceField(
+            queryset=remote_model._default_manager.all(),
+            widget=AutocompleteSelect(self.field, self.admin_site),
+            required=False,
+        )
+        return form_field.widget.render(
+            self.lookup_kwarg,
+            self.lookup_val,
+            attrs={"id": f"id_filter_{self.field_path}", "style": "width: 100%"},
+        )
+
+
+class ProjectedChangeList(ChangeList):
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        if self.model_admin.list_only:
+            queryset = queryset.only(*self.model_admin.list_only)
+        return queryset
+
+
+class ScalableAdminMixin:
+    """Changelist defaults that hold up on large tables.
+
+    Counts are bounded and estimated, the unfiltered total is not counted
+    at all, and rows load only the ``list_only`` columns.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_only = None
 
-from .models import Task, TaskType, Position, Worker, Comment
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList
+
+    @property
+    def media(self):
+        media = super().media
+        if any(
+            isinstance(spec, tuple) and spec[1] is AutocompleteListFilter
+            for spec in self.list_filter
+        ):
+            media += AutocompleteSelect(None, self.admin_site).media
+            media += forms.Media(js=["js/autocomplete_list_filter.js"])
+        return media
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ("name", "priority", "deadline", "status")
-    list_filter = ("priority", "status", "deadline")
+    list_filter = (
+        "priority",
+        "status",
+        "deadline",
+        ("assignee", AutocompleteListFilter),
+    )
+    list_select_related = ()
+    list_only = ("name", "priority", "deadline", "status")
     search_fields = ("name", "description")
-    filter_horizontal = ("assignee",)
-    autocomplete_fields = ("task_type",)
+    autocomplete_fields = ("task_type", "assignee", "parent")
     ordering = ("-created_at",)
+    actions = ("auto_assign",)
+
+    @admin.action(description="Assign unassigned tasks to the least-loaded workers")
+    def auto_assign(self, request, queryset):
+        tasks = queryset.filter(pk__in=assignment.unassigned_tasks().values("pk"))
+        plan = assignment.balancer.assign_many(
+            tasks.only("pk", "status", "priority", "deadline", "task_type_id")
+        )
+        assigned = sum(len(task_ids) for task_ids in plan.values())
+        self.message_user(request, f"Assigned {assigned} task(s).")
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if db_field.name == "assignee":
+            # Labels of the selected workers include their position.
+            kwargs["queryset"] = Worker.objects.select_related("position")
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
 
 
 @admin.register(TaskType)
-class TaskTypeAdmin(admin.ModelAdmin):
+class TaskTypeAdmin(ScalableAdminMixin, admin.ModelAdmin):
     search_fields = ("name",)
+    list_select_related = ()
+    list_only = ("name",)
 
 
 @admin.register(Position)
-class PositionAdmin(admin.ModelAdmin):
+class PositionAdmin(ScalableAdminMixin, admin.ModelAdmin):
     search_fields = ("name",)
+    list_select_related = ()
+    list_only = ("name",)
 
 
 @admin.register(Worker)
-class WorkerAdmin(UserAdmin):
+class WorkerAdmin(ScalableAdminMixin, UserAdmin):
 
     list_display = UserAdmin.list_display + ("position",)
     list_filter = UserAdmin.list_filter + ("position",)
-    search_fields = ("username", "first_name", "last_name")
+    list_select_related = ("position",)
+    list_only = (
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "is_staff",
+        "position",
+        "position__name",
+    )
+    # Prefix matches, served by the UPPER(...) indexes from migration 0018.
+    search_fields = ("^username", "^first_name", "^last_name")
     autocomplete_fields = ("position",)
 
     fieldsets = UserAdmin.fieldsets + ((None, {"fields": ("position",)}),)
 
+    def get_queryset(self, request):
+        # Worker.__str__ includes the position, also in autocomplete results.
+        return super().get_queryset(request).select_related("position")
+
     add_fieldsets = UserAdmin.add_fieldsets + (
         (
             None,
@@ -50,7 +220,82 @@ class WorkerAdmin(UserAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ("author", "task", "created_at")
-    list_filter = ("created_at", "author")
+class CommentAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("author_username", "task_name", "created_at")
+    list_filter = (
+        "created_at",
+        ("author", AutocompleteListFilter),
+        ("task", AutocompleteListFilter),
+    )
+    list_select_related = ("author", "task")
+    list_only = ("created_at", "author", "author__username", "task", "task__name")
     search_fields = ("content",)
+
+    @admin.display(description="Author", ordering="author__username")
+    def author_username(self, comment):
+        return comment.author.username
+
+    @admin.display(description="Task", ordering="task__name")
+    def task_name(self, comment):
+        return comment.task.name
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("url", "events", "is_active", "created_at")
+    list_filter = ("is_active",)
+    list_only = list_display
+    search_fields = ("url",)
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """The delivery log; rows are written by ``manage.py run_webhooks`` only."""
+
+    list_display = (
+        "outbox",
+        "endpoint",
+        "status",
+        "attempts",
+        "last_status_code",
+        "last_duration_ms",
+        "next_attempt_at",
+        "delivered_at",
+    )
+    list_filter = ("status", "endpoint")
+    list_select_related = ("outbox", "endpoint")
+    ordering = ("-pk",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "name",
+        "status",
+        "priority",
+        "run_at",
+        "attempts",
+        "worker",
+        "finished_at",
+    )
+    list_filter = ("status", "name")
+    list_only = list_display
+    search_fields = ("name",)
+    ordering = ("-pk",)
+    actions = ("run_again",)
+
+    @admin.action(description="Queue the selected jobs to run again now")
+    def run_again(self, request, queryset):
+        queued = queryset.exclude(status=JobStatus.RUNNING).update(
+            status=JobStatus.QUEUED,
+            run_at=timezone.now(),
+            attempts=0,
+            finished_at=None,
+        )
+        self.message_user(request, f"Queued {queued} job(s).")
@@ -0,0 +1,249 @@
+"""Moving long-closed tasks between the task table and the archive.
+
+Each batch copies tasks, their assignee links, comments, mentions,
+notifications and sent reminders with ``INSERT ... SELECT`` and then
+deletes the originals, all in one
+transaction, so an interrupted run loses at most the batch in flight and the
+next run picks up where it stopped. Archiving and restoring are not changes
+to the tasks themselves: while a batch runs, the activity log, comment
+streams, rollups, dependencies and subtask trees ignore the deletions it
+causes. Archived tasks keep their parent id and their dependency edges
+(``ArchivedTaskDependency``), and both come back on restore.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from itertools import chain
+
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from tasks import dependencies, hierarchy
+from tasks.models import (
+    CLOSED_STATUSES,
+    ArchivedComment,
+    ArchivedDeadlineReminder,
+    ArchivedMention,
+    ArchivedNotification,
+    ArchivedTask,
+    Comment,
+    DeadlineReminder,
+    Mention,
+    Notification,
+    SavedFilter,
+    Task,
+)
+
+# Live and archived tables moved along with tasks, in copy order, with the
+# column holding the id of their task (or, for mentions, their comment).
+RELATED = [
+    (Comment, ArchivedComment, "task_id"),
+    (Mention, ArchivedMention, "comment_id"),
+    (Notification, ArchivedNotification, "task_id"),
+    (DeadlineReminder, ArchivedDeadlineReminder, "task_id"),
+]
+
+_moving = ContextVar("archive_moving", default=False)
+
+
+def in_progress():
+    """Whether the current deletions are tasks being moved, not removed."""
+    return _moving.get()
+
+
+@contextmanager
+def moving():
+    token = _moving.set(True)
+    try:
+        yield
+    finally:
+        _moving.reset(token)
+
+
+def shared_columns(model, other):
+    names = {field.column for field in other._meta.concrete_fields}
+    return [
+        field.column for field in model._meta.concrete_fields if field.column in names
+    ]
+
+
+def copy_rows(source, target, columns, key, ids, constants=None):
+    """Copy rows of ``source`` whose ``key`` is in ``ids`` into ``target``.
+
+    ``columns`` maps target columns to source columns; ``constants`` gives
+    values for the remaining target columns.
+    """
+    constants = constants or {}
+    quote = connection.ops.quote_name
+    targets = ", ".join(quote(column) for column in chain(columns, constants))
+    selects = ", ".join(
+        chain((quote(column) for column in columns.values()), ["%s"] * len(constants))
+    )
+    sql = (
+        f"INSERT INTO {quote(target._meta.db_table)} ({targets}) "
+        f"SELECT {selects} FROM {quote(source._meta.db_table)} "
+        f"WHERE {quote(key)} IN ({', '.join(['%s'] * len(ids))})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*constants.values(), *ids])
+
+
+def move(ids, to_archive, constants=None):
+    tables = [(Task, ArchivedTask, "id"), *RELATED]
+    if not to_archive:
+        tables = [(archived, live, key) for live, archived, key in tables]
+    (source, target, _), *related = tables
+    ids = list(ids)
+    task_columns = shared_columns(target, source)
+    copy_rows(
+        source,
+        target,
+        {column: column for column in task_columns},
+        "id",
+        ids,
+        constants,
+    )
+    source_links = source.assignee.through
+    target_links = target.assignee.through
+    copy_rows(
+        source_links,
+        target_links,
+        {
+            target_links._meta.get_field(target._meta.model_name).column: (
+                source_links._meta.get_field(source._meta.model_name).column
+            ),
+            "worker_id": "worker_id",
+        },
+        source_links._meta.get_field(source._meta.model_name).column,
+        ids,
+    )
+    keys = {
+        "task_id": ids,
+        "comment_id": list(
+            related[0][0].objects.filter(task_id__in=ids).values_list("pk", flat=True)
+        ),
+    }
+    for source_rows, target_rows, key in related:
+        if keys[key]:
+            copy_rows(
+                source_rows,
+                target_rows,
+                {column: column for column in shared_columns(target_rows, source_rows)},
+                key,
+                keys[key],
+            )
+    with moving():
+        source.objects.filter(pk__in=ids).delete()
+
+
+def archivable(days):
+    """Tasks closed for ``days`` whose subtasks, if any, are archivable too."""
+    cutoff = timezone.now() - timedelta(days=days)
+    return Task.objects.filter(
+        status__in=CLOSED_STATUSES,
+        updated_at__lt=cutoff,
+        subtasks_done=F("subtask_count"),
+    ).exclude(
+        Exists(
+            Task.objects.filter(
+                path__startswith=OuterRef("path"), updated_at__gte=cutoff
+            )
+        )
+    )
+
+
+def archive_batch(days, batch_size):
+    """Archive up to ``batch_size`` tasks closed for ``days``; return how many."""
+    with transaction.atomic():
+        # Deepest first, so a task never leaves before its subtasks.
+        ids = list(
+            archivable(days)
+            .order_by("-depth", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if ids:
+            hierarchy.archived(ids)
+            dependencies.archived(ids)
+            archived_at = connection.ops.adapt_datetimefield_value(timezone.now())
+            move(ids, to_archive=True, constants={"archived_at": archived_at})
+    return len(ids)
+
+
+def archive(days, batch_size=500):
+    """Archive every task closed for longer than ``days``, batch by batch."""
+    total = 0
+    while True:
+        moved = archive_batch(days, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+def restore(ids):
+    """Move the archived tasks ``ids`` back into the task table."""
+    with transaction.atomic():
+        ids = list(ArchivedTask.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        if ids:
+            move(
+                ids,
+                to_archive=False,
+                constants={field: 0 for field in Task.MAINTAINED_FIELDS} | {"path": ""},
+            )
+            hierarchy.restored(ids)
+            dependencies.restored(ids)
+            # Restoring counts as a change, so the task is not archived again
+            # by the next run.
+            Task.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+            # Restored rows skip the signals; recount saved filters on next use.
+            SavedFilter.objects.update(refreshed_on=None)
+    return len(ids)
+
+
+class ChainedResults:
+    """Task results followed by archived ones, sliceable for pagination."""
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._counts = None
+
+    @property
+    def ordered(self):
+        return all(queryset.ordered for queryset in self.querysets)
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return chain.from_iterable(self.querysets)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return self[index : index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        results = []
+        for queryset, count in zip(self.querysets, self.counts()):
+            if stop <= 0:
+                break
+            if start < count:
+                results.extend(queryset[max(start, 0) : min(stop, count)])
+            start -= count
+            stop -= count
+        return results
+
+    def distinct(self):
+        return ChainedResults(*(queryset.distinct() for queryset in self.querysets))
+
+    def order_by(self, *fields):
+        return ChainedResults(
+            *(queryset.order_by(*fields) for queryset in self.querysets)
+        )
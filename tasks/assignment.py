@@ -0,0 +1,233 @@
+"""Automatic assignment of tasks to the least-loaded eligible worker.
+
+A worker's load is the sum of the weights of their open tasks: the task's
+priority, scaled up as its deadline gets close. Workers are eligible for the
+task types their position lists; task types no position lists can go to
+anyone.
+
+Each process keeps a min-heap of worker loads per position, built from one
+pass over the open assignments and then moved by the task signals once the
+changes commit, so picking a worker takes a heap peek per eligible position
+instead of a grouped query over the task table. Stale heap entries are
+skipped lazily. Deadlines drift closer and other processes assign too, so
+the heaps are rebuilt every ``TASK_AUTO_ASSIGN_REBUILD_SECONDS``.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import CLOSED_STATUSES, Position, Priority, Task, Worker
+
+PRIORITY_WEIGHTS = {
+    Priority.LOW: 1,
+    Priority.MEDIUM: 2,
+    Priority.HIGH: 3,
+    Priority.CRITICAL: 5,
+}
+
+# (due within, multiplier); tasks due later or without a deadline count twice
+# their priority weight.
+DEADLINE_MULTIPLIERS = ((timedelta(days=1), 4), (timedelta(days=7), 3))
+DEFAULT_MULTIPLIER = 2
+
+BATCH_SIZE = 500
+
+_planned = ContextVar("assignment_planned", default=False)
+
+
+def planned():
+    """Whether the assignments being saved were already counted by the balancer."""
+    return _planned.get()
+
+
+@contextmanager
+def planning():
+    token = _planned.set(True)
+    try:
+        yield
+    finally:
+        _planned.reset(token)
+
+
+def weight(status, priority, deadline, now=None):
+    """Load one task with these field values puts on each of its assignees."""
+    if status in CLOSED_STATUSES:
+        return 0
+    multiplier = DEFAULT_MULTIPLIER
+    if deadline is not None:
+        if isinstance(deadline, datetime) and timezone.is_naive(deadline):
+            deadline = timezone.make_aware(deadline)
+        remaining = deadline - (now or timezone.now())
+        for within, factor in DEADLINE_MULTIPLIERS:
+            if remaining <= within:
+                multiplier = factor
+                break
+    return PRIORITY_WEIGHTS.get(priority, 1) * multiplier
+
+
+def task_weight(task, now=None):
+    return weight(task.status, task.priority, task.deadline, now)
+
+
+class LoadBalancer:
+    """Per-process min-heaps of worker load, one per position."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_built(self):
+        if (
+            self._built_at is None
+            or time.monotonic() - self._built_at
+            > settings.TASK_AUTO_ASSIGN_REBUILD_SECONDS
+        ):
+            self._build()
+
+    def _build(self):
+        now = timezone.now()
+        positions = dict(
+            Worker.objects.filter(is_active=True).values_list("pk", "position_id")
+        )
+        loads = dict.fromkeys(positions, 0)
+        links = (
+            Task.assignee.through.objects.filter(worker_id__in=positions)
+            .exclude(task__status__in=CLOSED_STATUSES)
+            .values_list(
+                "worker_id", "task__status", "task__priority", "task__deadline"
+            )
+        )
+        for worker_id, status, priority, deadline in links.iterator():
+            loads[worker_id] += weight(status, priority, deadline, now)
+        members = defaultdict(list)
+        for worker_id, position_id in positions.items():
+            members[position_id].append(worker_id)
+        eligible = defaultdict(set)
+        handled = Position.task_types.through.objects.values_list(
+            "tasktype_id", "position_id"
+        )
+        for task_type_id, position_id in handled:
+            eligible[task_type_id].add(position_id)
+        self._positions = positions
+        self._loads = loads
+        self._members = members
+        self._eligible = eligible
+        self._heaps = {}
+        for position_id in members:
+            self._reheap(position_id)
+        self._built_at = time.monotonic()
+
+    def _reheap(self, position_id):
+        heap = [(self._loads[pk], pk) for pk in self._members[position_id]]
+        heapq.heapify(heap)
+        self._heaps[position_id] = heap
+
+    def _adjust(self, worker_ids, delta):
+        for pk in worker_ids:
+            if pk not in self._loads:
+                continue
+            load = self._loads[pk] + delta
+            self._loads[pk] = load
+            position_id = self._positions[pk]
+            heap = self._heaps[position_id]
+            heapq.heappush(heap, (load, pk))
+            if len(heap) > 2 * len(self._members[position_id]) + 16:
+                self._reheap(position_id)
+
+    def adjust(self, worker_ids, delta):
+        """Add ``delta`` to the load of ``worker_ids``, if the heaps are built."""
+        if not delta:
+            return
+        with self._lock:
+            if self._built_at is not None:
+                self._adjust(worker_ids, delta)
+
+    def adjust_on_commit(self, worker_ids, delta):
+        if delta and self.is_built:
+            transaction.on_commit(partial(self.adjust, list(worker_ids), delta))
+
+    def _top(self, position_id):
+        heap = self._heaps.get(position_id)
+        while heap:
+            load, pk = heap[0]
+            if self._loads.get(pk) == load:
+                return load, pk
+            heapq.heappop(heap)
+        return None
+
+    def _pick(self, task_type_id):
+        positions = self._eligible.get(task_type_id) or self._heaps.keys()
+        tops = [top for top in map(self._top, positions) if top is not None]
+        return min(tops)[1] if tops else None
+
+    def pick(self, task_type_id):
+        """The least-loaded worker eligible for ``task_type_id``, or None."""
+        with self._lock:
+            self._ensure_built()
+            return self._pick(task_type_id)
+
+    def assign_many(self, tasks):
+        """Balance ``tasks`` over the eligible workers in one pass.
+
+        Returns ``{worker_pk: [task_pk, ...]}``. Tasks nobody is eligible for
+        are left unassigned.
+        """
+        now = timezone.now()
+        plan = defaultdict(list)
+        with self._lock:
+            self._ensure_built()
+            for task in tasks:
+                worker_id = self._pick(task.task_type_id)
+                if worker_id is None:
+                    continue
+                plan[worker_id].append(task.pk)
+                self._adjust([worker_id], task_weight(task, now))
+        try:
+            with transaction.atomic(), planning():
+                for worker in Worker.objects.filter(pk__in=plan):
+                    task_ids = plan[worker.pk]
+                    for start in range(0, len(task_ids), BATCH_SIZE):
+                        worker.assigned_tasks.add(*task_ids[start : start + BATCH_SIZE])
+        except Exception:
+            # The loads above were counted for assignments that never happened.
+            self.invalidate()
+            raise
+        return dict(plan)
+
+    def assign(self, task):
+        """Assign ``task`` to the least-loaded eligible worker and return them."""
+        plan = self.assign_many([task])
+        if not plan:
+            return None
+        return Worker.objects.get(pk=next(iter(plan)))
+
+
+balancer = LoadBalancer()
+
+
+def unassigned_tasks():
+    """Open tasks nobody is assigned to, oldest first."""
+    return (
+        Task.objects.filter(assignee=None)
+        .exclude(status__in=CLOSED_STATUSES)
+        .order_by("created_at", "pk")
+        .only("pk", "status", "priority", "deadline", "task_type_id")
+    )
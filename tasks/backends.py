@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def worker_cache_key(user_id):
+    return f"tasks.auth.worker:{user_id}"
+
+
+def invalidate_cached_workers(*user_ids):
+    cache.delete_many([worker_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that loads the authenticated worker from the cache.
+
+    The cached worker, along with its position, is dropped whenever the
+    worker row or its position changes (see ``tasks.signals``).
+    """
+
+    def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        key = worker_cache_key(user_id)
+        user = cache.get(key) if timeout else None
+        if user is None:
+            user = (
+                get_user_model()
+                ._default_manager.select_related("position")
+                .filter(pk=user_id)
+                .first()
+            )
+            if user is None:
+                return None
+            if timeout:
+                cache.set(key, user, timeout)
+        return user if self.user_can_authenticate(user) else None
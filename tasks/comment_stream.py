@@ -0,0 +1,265 @@
+"""Server-sent event streams of task comments.
+
+Comment saves and deletes are published to an in-process broker once the
+surrounding transaction commits. Every open stream subscribes to the broker
+for its task and, between events, polls the database so that changes made
+by other processes still reach the client: comments created after its
+high-water mark, comments whose ``updated_at`` moved since the last poll,
+and comments the activity log records as deleted since then. The edit and
+delete checks look a few seconds further back than the last poll, to catch
+transactions that committed late, and the stream remembers what it sent so
+that nothing reaches the client twice.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+
+RETRY_MS = 3000
+
+# How much further back than the previous poll edits and deletes are looked for.
+CHANGE_OVERLAP = timedelta(seconds=5)
+
+
+class CommentEvent:
+    """A single change to a comment, ready to be written to an event stream."""
+
+    def __init__(self, kind, comment_id, created_at=None, html="", updated_at=None):
+        self.kind = kind
+        self.comment_id = comment_id
+        self.created_at = created_at
+        self.html = html
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_comment(cls, kind, comment):
+        html = ""
+        if kind != EVENT_DELETED:
+            html = render_to_string("includes/comment.html", {"comment": comment})
+        return cls(kind, comment.pk, comment.created_at, html, comment.updated_at)
+
+    def encode(self):
+        lines = [f"event: {self.kind}"]
+        if self.kind == EVENT_CREATED:
+            lines.append(f"id: {self.created_at.isoformat()}")
+        payload = {"id": self.comment_id}
+        if self.html:
+            payload["html"] = self.html
+        lines.append(f"data: {json.dumps(payload)}")
+        return "\n".join(lines) + "\n\n"
+
+
+class CommentBroker:
+    """Fan-out of comment events to the streams open in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, task_id, callback):
+        with self._lock:
+            self._subscribers.setdefault(task_id, set()).add(callback)
+        return callback
+
+    def unsubscribe(self, task_id, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(task_id)
+            if callbacks is None:
+                return
+            callbacks.discard(callback)
+            if not callbacks:
+                del self._subscribers[task_id]
+
+    def has_subscribers(self, task_id):
+        return task_id in self._subscribers
+
+    def publish(self, task_id, event):
+        with self._lock:
+            callbacks = list(self._subscribers.get(task_id, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except RuntimeError:
+                # The subscriber's event loop has already been closed.
+                self.unsubscribe(task_id, callback)
+
+
+broker = CommentBroker()
+
+
+def publish_comment_event(kind, comment):
+    """Render ``comment`` once and hand it to every local subscriber."""
+    if broker.has_subscribers(comment.task_id):
+        broker.publish(comment.task_id, CommentEvent.from_comment(kind, comment))
+
+
+def publish_comment_deleted(task_id, comment_id):
+    """Tell local subscribers a comment is gone; ids, as the row has no pk now."""
+    if broker.has_subscribers(task_id):
+        broker.publish(task_id, CommentEvent(EVENT_DELETED, comment_id))
+
+
+def parse_last_event_id(value):
+    """Return the high-water mark a reconnecting client asks to resume from.
+
+    The header comes from the client, so anything that is not a timestamp
+    is ignored, and one without a UTC offset is read in the current time zone.
+    """
+    if value:
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            return parsed
+    return timezone.now()
+
+
+class CommentStream:
+    """Event source for one client watching the comments of one task."""
+
+    def __init__(self, task_id, since):
+        self.task_id = task_id
+        self.high_water_mark = since
+        self.changes_since = since
+        self.seen = set()
+        self.versions = {}
+        self.deleted = set()
+        self.poll_interval = settings.COMMENT_STREAM_POLL_INTERVAL
+        self.max_duration = settings.COMMENT_STREAM_MAX_DURATION
+
+    def preamble(self):
+        return f"retry: {RETRY_MS}\n\n"
+
+    def accept(self, event):
+        """Track the high-water mark and drop events the client already has."""
+        if event.comment_id in self.deleted:
+            return ""
+        if event.kind == EVENT_DELETED:
+            self.deleted.add(event.comment_id)
+            return event.encode()
+        known = self.versions.get(event.comment_id)
+        if event.updated_at is not None:
+            if known is None or event.updated_at > known:
+                self.versions[event.comment_id] = event.updated_at
+        if event.kind == EVENT_CREATED:
+            if event.comment_id in self.seen:
+                return ""
+            self.seen.add(event.comment_id)
+            if event.created_at > self.high_water_mark:
+                self.high_water_mark = event.created_at
+        elif known is not None and event.updated_at is not None:
+            if event.updated_at <= known:
+                return ""
+        return event.encode()
+
+    def poll(self):
+        """Return encoded events for the comment changes since the last poll."""
+        from tasks.models import ActivityVerb, Comment, TaskActivity
+
+        started = timezone.now()
+        created_before = self.high_water_mark
+        comments = Comment.objects.filter(task_id=self.task_id).select_related("author")
+        chunks = []
+        for comment in comments.filter(created_at__gt=created_before).order_by(
+            "created_at"
+        ):
+            chunk = self.accept(CommentEvent.from_comment(EVENT_CREATED, comment))
+            if chunk:
+                chunks.append(chunk)
+        edited = comments.filter(
+            created_at__lte=created_before, updated_at__gt=self.changes_since
+        ).order_by("updated_at")
+        for comment in edited:
+            if comment.updated_at > self.versions.get(comment.pk, created_before):
+                chunks.append(
+                    self.accept(CommentEvent.from_comment(EVENT_UPDATED, comment))
+                )
+        deleted = TaskActivity.objects.filter(
+            task_id=self.task_id,
+            verb=ActivityVerb.COMMENT_DELETED,
+            created_at__gt=self.changes_since,
+        ).values_list("changes", flat=True)
+        for changes in deleted:
+            chunk = self.accept(CommentEvent(EVENT_DELETED, changes["comment"]))
+            if chunk:
+                chunks.append(chunk)
+        self.changes_since = started - CHANGE_OVERLAP
+        return chunks
+
+    def poll_connected(self):
+        """``poll`` from a pool thread, which no request cycle cleans up after."""
+        close_old_connections()
+        try:
+            return self.poll()
+        finally:
+            close_old_connections()
+
+    def events(self):
+        """Blocking iterator used when served by a WSGI worker."""
+        inbox = queue.SimpleQueue()
+        callback = broker.subscribe(self.task_id, inbox.put)
+        try:
+            yield self.preamble()
+            yield from self.poll()
+            deadline = time.monotonic() + self.max_duration
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = inbox.get(timeout=min(self.poll_interval, remaining))
+                except queue.Empty:
+                    yield from self.poll()
+                    yield ": keepalive\n\n"
+                    continue
+                chunk = self.accept(event)
+                if chunk:
+                    yield chunk
+        finally:
+            broker.unsubscribe(self.task_id, callback)
+
+    async def aevents(self):
+        """Non-blocking iterator used under ASGI, one coroutine per stream."""
+        loop = asyncio.get_running_loop()
+        inbox = asyncio.Queue()
+
+        def callback(event):
+            loop.call_soon_threadsafe(inbox.put_nowait, event)
+
+        broker.subscribe(self.task_id, callback)
+        # A read-only poll: streams need not queue on the one shared thread.
+        poll = sync_to_async(self.poll_connected, thread_sensitive=False)
+        try:
+            yield self.preamble()
+            for chunk in await poll():
+                yield chunk
+            deadline = loop.time() + self.max_duration
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        inbox.get(), timeout=min(self.poll_interval, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    for chunk in await poll():
+                        yield chunk
+                    yield ": keepalive\n\n"
+                    continue
+                chunk = self.accept(event)
+                if chunk:
+                    yield chunk
+        finally:
+            broker.unsubscribe(self.task_id, callback)
@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.utils.functional import SimpleLazyObject
+
+from tasks import saved_filters as saved_filter_cache
+
+
+def saved_filters(request):
+    """Saved filters for the sidebar, loaded only if the page shows them."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        "saved_filters": SimpleLazyObject(partial(saved_filter_cache.sidebar, user))
+    }
@@ -0,0 +1,302 @@
+"""Task dependencies kept with a closure table.
+
+``TaskDependency`` stores the edges people create; ``TaskDependencyPath``
+stores every pair connected by a chain of them together with how many of
+the descendant's direct blockers the ancestor is, or blocks. That count is
+bounded by the descendant's edges, however many chains cross the graph.
+Adding or removing an edge into ``blocked`` can only change the pairs of
+``blocked`` and the tasks after it, so their blockers are derived again,
+nearest first, from their edges and the stored blockers of the tasks
+before them. Transitive lookups and the cycle check are single queries.
+
+Edge changes lock both endpoints. Concurrent changes elsewhere in the same
+graph can still interleave; ``manage.py rebuild_dependency_paths`` recomputes
+the table from the edges.
+"""
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from tasks.models import (
+    CLOSED_STATUSES,
+    ArchivedTask,
+    ArchivedTaskDependency,
+    Status,
+    Task,
+    TaskDependency,
+    TaskDependencyPath,
+)
+
+
+def creates_cycle(task_id, depends_on_id):
+    """Whether making ``task_id`` depend on ``depends_on_id`` closes a loop."""
+    return (
+        task_id == depends_on_id
+        or TaskDependencyPath.objects.filter(
+            ancestor_id=task_id, descendant_id=depends_on_id
+        ).exists()
+    )
+
+
+def incoming(edges):
+    """``{task_id: [depends_on_id]}`` of the ``edges`` queryset."""
+    blockers = defaultdict(list)
+    for task_id, depends_on_id in edges.values_list("task_id", "depends_on_id"):
+        blockers[task_id].append(depends_on_id)
+    return blockers
+
+
+def topological(nodes, blockers):
+    """``nodes`` ordered so each comes after its blockers among them."""
+    waiting = Counter()
+    unblocks = defaultdict(list)
+    for node in nodes:
+        for blocker in blockers[node]:
+            if blocker in nodes:
+                unblocks[blocker].append(node)
+                waiting[node] += 1
+    order = [node for node in nodes if not waiting[node]]
+    for node in order:
+        for child in unblocks[node]:
+            waiting[child] -= 1
+            if not waiting[child]:
+                order.append(child)
+    return order
+
+
+def chain_counts(order, blockers, known):
+    """``{node: Counter(ancestor)}`` for ``order``, given ``known`` others.
+
+    An ancestor counts once for each direct blocker of the node that it is
+    or that it blocks.
+    """
+    counts = dict(known)
+    for node in order:
+        found = Counter()
+        for blocker in blockers[node]:
+            found.update({blocker, *counts.get(blocker, ())})
+        counts[node] = found
+    return counts
+
+
+def refresh(task_ids):
+    """Derive the pairs ending in ``task_ids`` or after them again.
+
+    Call after changing edges into ``task_ids``: no other pair can change.
+    """
+    after = set(task_ids) | set(
+        TaskDependencyPath.objects.filter(ancestor_id__in=task_ids).values_list(
+            "descendant_id", flat=True
+        )
+    )
+    blockers = incoming(TaskDependency.objects.filter(task_id__in=after))
+    before = {blocker for ids in blockers.values() for blocker in ids} - after
+    stored = defaultdict(dict)
+    for row in TaskDependencyPath.objects.select_for_update().filter(
+        descendant_id__in=after | before
+    ):
+        stored[row.descendant_id][row.ancestor_id] = row
+    counts = chain_counts(
+        topological(after, blockers),
+        blockers,
+        {node: stored[node] for node in before},
+    )
+    created, updated, emptied = [], [], []
+    for node in after:
+        rows = stored[node]
+        for ancestor, n in counts[node].items():
+            row = rows.pop(ancestor, None)
+            if row is None:
+                created.append(
+                    TaskDependencyPath(
+                        ancestor_id=ancestor, descendant_id=node, paths=n
+                    )
+                )
+            elif row.paths != n:
+                row.paths = n
+                updated.append(row)
+        emptied.extend(row.pk for row in rows.values())
+    TaskDependencyPath.objects.bulk_create(created)
+    TaskDependencyPath.objects.bulk_update(updated, ["paths"])
+    TaskDependencyPath.objects.filter(pk__in=emptied).delete()
+
+
+def lock(*task_ids):
+    list(Task.objects.select_for_update().filter(pk__in=task_ids).order_by("pk"))
+
+
+def add(task, depends_on):
+    """Record that ``task`` depends on ``depends_on``; refuse cycles."""
+    with transaction.atomic():
+        lock(task.pk, depends_on.pk)
+        if creates_cycle(task.pk, depends_on.pk):
+            raise ValueError("A task cannot depend on a task it blocks.")
+        dependency, created = TaskDependency.objects.get_or_create(
+            task=task, depends_on=depends_on
+        )
+        if created:
+            refresh([task.pk])
+            sync_blocked_status([task.pk])
+    return dependency
+
+
+def remove(task_id, depends_on_id):
+    with transaction.atomic():
+        lock(task_id, depends_on_id)
+        edges = TaskDependency.objects.filter(
+            task_id=task_id, depends_on_id=depends_on_id
+        )
+        if not edges.exists():
+            return False
+        edges.delete()
+        refresh([task_id])
+        sync_blocked_status([task_id])
+    return True
+
+
+def detach(task):
+    """Remove every edge of ``task``, before the task itself is deleted."""
+    edges = TaskDependency.objects.filter(Q(task=task) | Q(depends_on=task))
+    for task_id, depends_on_id in list(edges.values_list("task_id", "depends_on_id")):
+        remove(task_id, depends_on_id)
+
+
+def blockers(task):
+    """Every task ``task`` waits on, directly or through others."""
+    return Task.objects.filter(descendant_paths__descendant=task)
+
+
+def blocked_by(task):
+    """Every task waiting on ``task``, directly or through others."""
+    return Task.objects.filter(ancestor_paths__ancestor=task)
+
+
+def sync_blocked_status(task_ids):
+    """Block open tasks waiting on an open task and release the rest.
+
+    Only runs with ``TASK_DEPENDENCIES_AUTO_BLOCK``; released tasks go back to
+    pending.
+    """
+    if not settings.TASK_DEPENDENCIES_AUTO_BLOCK:
+        return
+    open_blocker = TaskDependency.objects.filter(task=OuterRef("pk")).exclude(
+        depends_on__status__in=CLOSED_STATUSES
+    )
+    tasks = (
+        Task.objects.filter(pk__in=task_ids)
+        .exclude(status__in=CLOSED_STATUSES)
+        .annotate(waiting=Exists(open_blocker))
+    )
+    for task in tasks:
+        if task.waiting and task.status != Status.BLOCKED:
+            task.status = Status.BLOCKED
+        elif not task.waiting and task.status == Status.BLOCKED:
+            task.status = Status.PENDING
+        else:
+            continue
+        task.save(update_fields=["status", "updated_at"])
+
+
+def blocker_status_changed(task):
+    """Re-check the direct dependents of ``task`` after it closed or reopened."""
+    sync_blocked_status(
+        list(
+            TaskDependency.objects.filter(depends_on=task).values_list(
+                "task_id", flat=True
+            )
+        )
+    )
+
+
+def compute():
+    """Chain counts for every connected pair, from the edges alone."""
+    blockers = incoming(TaskDependency.objects.all())
+    nodes = set(blockers) | {blocker for ids in blockers.values() for blocker in ids}
+    counts = chain_counts(topological(nodes, blockers), blockers, {})
+    return {
+        (ancestor, descendant): n
+        for descendant, found in counts.items()
+        for ancestor, n in found.items()
+    }
+
+
+def rebuild():
+    """Replace the closure table; return how many pairs had drifted."""
+    with transaction.atomic():
+        expected = compute()
+        rows = TaskDependencyPath.objects.select_for_update().values_list(
+            "ancestor_id", "descendant_id", "paths"
+        )
+        stored = {(ancestor, descendant): n for ancestor, descendant, n in rows}
+        drifted = sum(
+            1
+            for key in set(expected) | set(stored)
+            if expected.get(key) != stored.get(key)
+        )
+        TaskDependencyPath.objects.all().delete()
+        TaskDependencyPath.objects.bulk_create(
+            TaskDependencyPath(ancestor_id=ancestor, descendant_id=descendant, paths=n)
+            for (ancestor, descendant), n in expected.items()
+        )
+    return drifted
+
+
+def archived(task_ids):
+    """Move the edges of tasks about to be archived aside.
+
+    Archived tasks are closed, so no live task is blocked by them.
+    """
+    edges = list(
+        TaskDependency.objects.filter(
+            Q(task_id__in=task_ids) | Q(depends_on_id__in=task_ids)
+        )
+    )
+    ArchivedTaskDependency.objects.bulk_create(
+        ArchivedTaskDependency(
+            task_id=edge.task_id,
+            depends_on_id=edge.depends_on_id,
+            created_at=edge.created_at,
+        )
+        for edge in edges
+    )
+    TaskDependency.objects.filter(pk__in=[edge.pk for edge in edges]).delete()
+    refresh({edge.task_id for edge in edges})
+
+
+def restored(task_ids):
+    """Bring back archived edges of restored tasks whose other end is live.
+
+    Edges to tasks still archived wait for them; edges to deleted tasks, or
+    that would now close a loop, are dropped.
+    """
+    archived_edges = ArchivedTaskDependency.objects.filter(
+        Q(task_id__in=task_ids) | Q(depends_on_id__in=task_ids)
+    )
+    edges = list(archived_edges)
+    ends = {edge.task_id for edge in edges} | {edge.depends_on_id for edge in edges}
+    live = set(Task.objects.filter(pk__in=ends).values_list("pk", flat=True))
+    kept = set(
+        ArchivedTask.objects.filter(pk__in=ends - live).values_list("pk", flat=True)
+    )
+    restored_edges, created = [], []
+    for edge in edges:
+        if edge.task_id not in live or edge.depends_on_id not in live:
+            continue
+        if creates_cycle(edge.task_id, edge.depends_on_id):
+            continue
+        restored_edges.append(
+            TaskDependency.objects.create(
+                task_id=edge.task_id, depends_on_id=edge.depends_on_id
+            )
+        )
+        created.append(edge.created_at)
+        refresh([edge.task_id])
+    # Creating stamps created_at; put back when each edge was first made.
+    for edge, created_at in zip(restored_edges, created):
+        edge.created_at = created_at
+    TaskDependency.objects.bulk_update(restored_edges, ["created_at"])
+    archived_edges.exclude(task_id__in=kept).exclude(depends_on_id__in=kept).delete()
+    sync_blocked_status([edge.task_id for edge in restored_edges])
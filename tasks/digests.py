@@ -0,0 +1,216 @@
+"""Daily email digests of each worker's overdue, due-today and new tasks.
+
+Workers are read in id order, a batch at a time, and each batch takes
+three queries however many workers it holds: the workers themselves, their
+open tasks that are overdue or due today, and their open tasks among the
+assignments the activity log recorded since the previous day's digest
+(read once per run). Digests go to the mail backend over one connection
+kept open for the whole run.
+
+A run covers one day and one range of worker ids, so disjoint ranges can
+run in parallel processes. A lease keeps two processes off the same range,
+and ``DigestRun`` records the last worker whose digest was accepted after
+every batch. A crashed run resumes from there and re-sends at most the
+batch it was in the middle of.
+"""
+
+import logging
+import os
+import socket
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from tasks.models import CLOSED_STATUSES, ActivityVerb, DigestRun, Task, TaskActivity
+from tasks.reminders import acquire_lease, release_lease
+
+logger = logging.getLogger(__name__)
+
+WINDOW = timedelta(days=1)
+
+LEASE_TTL = timedelta(minutes=10)
+
+TASK_FIELDS = ("task_id", "task__name", "task__deadline", "task__priority")
+
+
+@dataclass
+class Digest:
+    worker_id: int
+    username: str
+    email: str
+    first_name: str = ""
+    overdue: list = field(default_factory=list)
+    due_today: list = field(default_factory=list)
+    assigned: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.overdue or self.due_today or self.assigned)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def task_entry(row):
+    task_id, name, deadline, priority = row
+    return {
+        "id": task_id,
+        "name": name,
+        "deadline": deadline,
+        "priority": priority,
+        "url": settings.SITE_URL.rstrip("/") + Task(pk=task_id).get_absolute_url(),
+    }
+
+
+def workers_after(first_id, end_id, after_id, limit):
+    """The next ``limit`` active workers with an email, in id order."""
+    workers = (
+        get_user_model()
+        .objects.filter(pk__gte=first_id, pk__gt=after_id or 0, is_active=True)
+        .exclude(email="")
+    )
+    if end_id is not None:
+        workers = workers.filter(pk__lt=end_id)
+    return list(
+        workers.order_by("pk").values_list("pk", "username", "email", "first_name")[
+            :limit
+        ]
+    )
+
+
+def assigned_since(since, cutoff):
+    """``{username: {task id}}`` of assignments logged in ``[since, cutoff)``."""
+    assigned = defaultdict(set)
+    entries = TaskActivity.objects.filter(
+        verb=ActivityVerb.ASSIGNED,
+        created_at__gte=since,
+        created_at__lt=cutoff,
+        task_id__isnull=False,
+    ).values_list("task_id", "changes")
+    for task_id, changes in entries.iterator():
+        for username in changes.get("assignee", ()):
+            assigned[username].add(task_id)
+    return assigned
+
+
+def collect(workers, day, since, cutoff, assigned=None):
+    """Digests of ``workers`` (rows from ``workers_after``), by worker id."""
+    digests = {row[0]: Digest(*row) for row in workers}
+    if not digests:
+        return digests
+    day_start, day_end = day_bounds(day)
+    low, high = min(digests), max(digests)
+    assignments = Task.assignee.through.objects.filter(
+        worker__gte=low, worker__lte=high
+    ).exclude(task__status__in=CLOSED_STATUSES)
+
+    due = assignments.filter(task__deadline__lt=day_end).values_list(
+        "worker_id", *TASK_FIELDS
+    )
+    for worker_id, *task in due.order_by("task__deadline").iterator():
+        digest = digests.get(worker_id)
+        if digest is not None:
+            bucket = digest.overdue if task[2] < day_start else digest.due_today
+            bucket.append(task_entry(task))
+
+    if assigned is None:
+        assigned = assigned_since(since, cutoff)
+    wanted = {
+        task_id
+        for digest in digests.values()
+        for task_id in assigned.get(digest.username, ())
+    }
+    if wanted:
+        new = assignments.filter(task_id__in=wanted).values_list(
+            "worker_id", *TASK_FIELDS
+        )
+        for worker_id, *task in new.order_by("-task_id").iterator():
+            digest = digests.get(worker_id)
+            if digest is None or task[0] not in assigned.get(digest.username, ()):
+                continue
+            # Tasks already listed as due are not repeated as new.
+            if not any(
+                entry["id"] == task[0] for entry in digest.overdue + digest.due_today
+            ):
+                digest.assigned.append(task_entry(task))
+    return digests
+
+
+def render(digest, day):
+    context = {"digest": digest, "day": day, "site_url": settings.SITE_URL}
+    return EmailMessage(
+        subject=render_to_string("tasks/email/digest_subject.txt", context).strip(),
+        body=render_to_string("tasks/email/digest.txt", context),
+        to=[digest.email],
+    )
+
+
+def lease_name(run):
+    end = run.end_worker_id if run.end_worker_id is not None else "end"
+    return f"digests:{run.day}:{run.first_worker_id}-{end}"
+
+
+def start_run(day, first_id, end_id):
+    now = timezone.now()
+    earlier = DigestRun.objects.filter(day__lt=day).order_by("-day")
+    previous = (
+        earlier.filter(first_worker_id=first_id, end_worker_id=end_id).first()
+        or earlier.first()
+    )
+    run, _ = DigestRun.objects.get_or_create(
+        day=day,
+        first_worker_id=first_id,
+        end_worker_id=end_id,
+        defaults={
+            "since": previous.cutoff if previous else now - WINDOW,
+            "cutoff": now,
+        },
+    )
+    return run
+
+
+def send(day, first_id=1, end_id=None, batch_size=None, connection=None):
+    """Send ``day``'s digests to workers with ids in ``[first_id, end_id)``.
+
+    Returns the run, or None when another process holds its range.
+    """
+    batch_size = batch_size or settings.DIGEST_BATCH_SIZE
+    run = start_run(day, first_id, end_id)
+    if run.finished_at is not None:
+        return run
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    name = lease_name(run)
+    if not acquire_lease(name, holder, LEASE_TTL):
+        return None
+
+    connection = connection or get_connection()
+    assigned = assigned_since(run.since, run.cutoff)
+    try:
+        connection.open()
+        while True:
+            workers = workers_after(first_id, end_id, run.last_worker_id, batch_size)
+            if not workers:
+                break
+            digests = collect(workers, day, run.since, run.cutoff, assigned)
+            messages = [render(digest, day) for digest in digests.values() if digest]
+            if messages:
+                connection.send_messages(messages)
+            run.last_worker_id = workers[-1][0]
+            run.sent += len(messages)
+            run.save(update_fields=["last_worker_id", "sent"])
+            if not acquire_lease(name, holder, LEASE_TTL):
+                logger.warning("Lost the lease on %s; stopping.", name)
+                return run
+        run.finished_at = timezone.now()
+        run.save(update_fields=["finished_at"])
+    finally:
+        connection.close()
+        release_lease(name, holder)
+    return run
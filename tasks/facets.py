@@ -0,0 +1,158 @@
+"""Option counts for the dropdowns of the task filter form.
+
+For each faceted dropdown, every option is labelled with the number of
+tasks the list would show if that option were picked and the other filters
+kept. That takes one grouped query per dropdown over the tasks matching
+every other filter; deadline buckets overlap, so they are counted with
+conditional aggregates in one query instead. Archived tasks are counted too
+when the list shows them.
+
+Dropdowns are counted in order until ``TASK_FACET_BUDGET_MS`` runs out
+(on PostgreSQL each query also gets the remaining time as its statement
+timeout); the rest keep their plain labels. Complete results are cached per
+filter state for ``TASK_FACET_CACHE_SECONDS``, and any task change starts a
+new cache generation.
+"""
+
+import hashlib
+import json
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connections, router, transaction
+from django.db.models import Count
+from django.forms import ModelChoiceField
+from django.utils import timezone
+
+from tasks.filters import TaskFilter
+from tasks.models import ArchivedTask, Task
+
+FACETS = ("status", "priority", "task_type", "assignee", "deadline_filter")
+
+GROUP_FIELDS = {
+    "status": "status",
+    "priority": "priority",
+    "task_type": "task_type",
+    "assignee": "assignee",
+}
+
+GENERATION_KEY = "task-facets:generation"
+
+
+def invalidate():
+    if not settings.TASK_FACET_CACHE_SECONDS:
+        return
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def cache_key(params):
+    signature = hashlib.sha1(
+        json.dumps(sorted(params.items()), default=str).encode()
+    ).hexdigest()
+    generation = cache.get(GENERATION_KEY, 0)
+    # Deadline buckets move at midnight.
+    return f"task-facets:{generation}:{timezone.localdate()}:{signature}"
+
+
+def filtered_except(filterset, queryset, excluded):
+    """``queryset`` narrowed by every filter of ``filterset`` but ``excluded``."""
+    for name, value in filterset.form.cleaned_data.items():
+        if name != excluded:
+            queryset = filterset.filters[name].filter(queryset, value)
+    return queryset
+
+
+def count_facet(filterset, name, model):
+    matching = filtered_except(filterset, model.objects.all(), name)
+    # Join-free base, so the search filter's joins cannot double count.
+    base = model.objects.filter(pk__in=matching.values("pk")).order_by()
+    if name == "deadline_filter":
+        buckets = {
+            bucket: Count("pk", filter=condition)
+            for bucket, condition in TaskFilter.deadline_conditions().items()
+        }
+        return base.aggregate(**buckets, **{TaskFilter.DEADLINE_ALL: Count("pk")})
+    field = GROUP_FIELDS[name]
+    rows = base.values_list(field).annotate(n=Count("pk")).values_list(field, "n")
+    return {str(value): n for value, n in rows if value is not None}
+
+
+def within(seconds, count, model=Task):
+    """Run ``count`` and give up once ``seconds`` have passed, where supported.
+
+    The timeout is set on the database ``model`` is read from, which is
+    where ``count`` runs.
+    """
+    using = router.db_for_read(model)
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return count()
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET LOCAL statement_timeout = %s", [max(int(seconds * 1000), 1)]
+            )
+        return count()
+
+
+def compute(filterset):
+    """``{facet: {option value: count}}``; facets over budget map to None."""
+    cleaned = filterset.form.cleaned_data
+    models = [Task]
+    if cleaned.get("active_filter") in (TaskFilter.STATUS_OFF, TaskFilter.STATUS_ALL):
+        models.append(ArchivedTask)
+    deadline = time.monotonic() + settings.TASK_FACET_BUDGET_MS / 1000
+    facets = {}
+    for name in FACETS:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            facets[name] = None
+            continue
+        try:
+            counts = Counter()
+            for model in models:
+                counts.update(
+                    within(
+                        remaining,
+                        lambda: count_facet(filterset, name, model),
+                        model,
+                    )
+                )
+            facets[name] = dict(counts)
+        except OperationalError:
+            facets[name] = None
+    return facets
+
+
+def for_filterset(filterset, params):
+    """Facet counts for a validated ``filterset``, cached when complete."""
+    timeout = settings.TASK_FACET_CACHE_SECONDS
+    key = cache_key(params) if timeout else None
+    facets = cache.get(key) if key else None
+    if facets is None:
+        facets = compute(filterset)
+        if key and all(counts is not None for counts in facets.values()):
+            cache.set(key, facets, timeout)
+    return facets
+
+
+def label_options(form, facets):
+    """Append each option's count to its label in ``form``."""
+    for name, counts in facets.items():
+        if counts is None:
+            continue
+        field = form.fields[name]
+        if isinstance(field, ModelChoiceField):
+            field.label_from_instance = (
+                lambda obj, counts=counts: f"{obj} ({counts.get(str(obj.pk), 0)})"
+            )
+        else:
+            field.choices = [
+                (value, f"{label} ({counts.get(value, 0)})" if value else label)
+                for value, label in field.choices
+            ]
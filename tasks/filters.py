@@ -2,7 +2,24 @@ import django_filters
 from django import forms
 from django.db.models import Q
 from django.utils import timezone
-from tasks.models import Task, TaskType, Worker
+from django_filters.fields import ModelChoiceField, ModelChoiceIterator
+from tasks.archive import ChainedResults
+from tasks.lookups import CachedChoiceFieldMixin, CachedChoicesMixin
+from tasks.models import ArchivedTask, Task, TaskType, Worker
+
+
+class LookupChoiceIterator(CachedChoicesMixin, ModelChoiceIterator):
+    pass
+
+
+class LookupChoiceField(CachedChoiceFieldMixin, ModelChoiceField):
+    iterator = LookupChoiceIterator
+
+
+class LookupChoiceFilter(django_filters.ModelChoiceFilter):
+    """Choice filter over a lookup table, listed from ``tasks.lookups``."""
+
+    field_class = LookupChoiceField
 
 
 class TaskFilter(django_filters.FilterSet):
@@ -42,7 +59,7 @@ class TaskFilter(django_filters.FilterSet):
         ),
     )
 
-    task_type = django_filters.ModelChoiceFilter(
+    task_type = LookupChoiceFilter(
         queryset=TaskType.objects.all(),
         label="Type",
         empty_label="—",
@@ -84,6 +101,25 @@ class TaskFilter(django_filters.FilterSet):
         widget=forms.Select(attrs={"class": "form-select form-select-sm"}),
     )
 
+    def __init__(self, *args, archive_queryset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if archive_queryset is None:
+            archive_queryset = ArchivedTask.objects.all()
+        self.archive_queryset = archive_queryset
+
+    @property
+    def qs(self):
+        """Live tasks, followed by archived ones when closed tasks are shown."""
+        if not hasattr(self, "_chained_qs"):
+            qs = super().qs
+            if getattr(self.form, "cleaned_data", {}).get("active_filter") in (
+                self.STATUS_OFF,
+                self.STATUS_ALL,
+            ):
+                qs = ChainedResults(qs, self.filter_queryset(self.archive_queryset))
+            self._chained_qs = qs
+        return self._chained_qs
+
     def filter_search(self, queryset, name, value):
         return queryset.filter(
             Q(name__icontains=value)
@@ -101,21 +137,27 @@ class TaskFilter(django_filters.FilterSet):
             return queryset
         return queryset
 
-    def filter_deadline(self, queryset, name, value):
+    @classmethod
+    def deadline_conditions(cls):
+        """``{deadline choice: Q}`` for every choice that narrows the list."""
         today = timezone.localdate()
+        this_week_end = today + timezone.timedelta(days=6 - today.weekday())
+        next_week_start = today + timezone.timedelta(days=7 - today.weekday())
+        return {
+            cls.DEADLINE_TODAY: Q(deadline__date=today),
+            cls.DEADLINE_OVERDUE: Q(deadline__date__lt=today),
+            cls.DEADLINE_TOMORROW: Q(deadline__date=today + timezone.timedelta(days=1)),
+            cls.DEADLINE_THIS_WEEK: Q(deadline__date__range=(today, this_week_end)),
+            cls.DEADLINE_NEXT_WEEK: Q(
+                deadline__date__range=(
+                    next_week_start,
+                    next_week_start + timezone.timedelta(days=6),
+                )
+            ),
+        }
 
-        if value == self.DEADLINE_TODAY:
-            return queryset.filter(deadline__date=today)
-        if value == self.DEADLINE_OVERDUE:
-            return queryset.filter(deadline__date__lt=today)
-        if value == self.DEADLINE_TOMORROW:
-            return queryset.filter(deadline__date=today + timezone.timedelta(days=1))
-        if value == self.DEADLINE_THIS_WEEK:
-            start = today
-            end = today + timezone.timedelta(days=6 - today.weekday())
-            return queryset.filter(deadline__date__range=(start, end))
-        if value == self.DEADLINE_NEXT_WEEK:
-            start = today + timezone.timedelta(days=7 - today.weekday())
-            end = start + timezone.timedelta(days=6)
-            return queryset.filter(deadline__date__range=(start, end))
-        return queryset
+    def filter_deadline(self, queryset, name, value):
+        condition = self.deadline_conditions().get(value)
+        if condition is None:
+            return queryset
+        return queryset.filter(condition)
@@ -2,7 +2,16 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 
-from tasks.models import Task, Worker, Comment, TaskType, Position
+from tasks import dependencies, hierarchy
+from tasks.models import (
+    Task,
+    TaskDependency,
+    Worker,
+    Comment,
+    TaskType,
+    Position,
+    SavedFilter,
+)
 
 
 class TaskTypeForm(forms.ModelForm):
@@ -61,6 +70,15 @@ class TaskForm(forms.ModelForm):
         required=False,
     )
 
+    parent = forms.ModelChoiceField(
+        queryset=Task.objects.only("id", "path", "depth"),
+        error_messages={"invalid_choice": "There is no task with that number."},
+        widget=forms.NumberInput(attrs={"placeholder": "Parent task # (optional)"}),
+        required=False,
+    )
+
+    auto_assign = forms.BooleanField(initial=False, required=False)
+
     class Meta:
         model = Task
         fields = (
@@ -71,6 +89,7 @@ class TaskForm(forms.ModelForm):
             "description",
             "assignee",
             "status",
+            "parent",
         )
         widgets = {
             "name": forms.TextInput(attrs={"placeholder": "Task Name"}),
@@ -87,13 +106,27 @@ class TaskForm(forms.ModelForm):
             if field_name != "assignee":
                 if isinstance(field.widget, forms.Select):
                     field.widget.attrs.update({"class": "form-select"})
+                elif isinstance(field.widget, forms.CheckboxInput):
+                    field.widget.attrs.update({"class": "form-check-input"})
                 elif not isinstance(field.widget, forms.DateTimeInput):
                     field.widget.attrs.update({"class": "form-control"})
 
+        if self.instance.pk:
+            del self.fields["auto_assign"]
+
         self.fields["task_type"].empty_label = "Select task type"
         self.fields["priority"].empty_label = "Select priority"
         self.fields["status"].empty_label = "Select status"
 
+    def clean_parent(self):
+        parent = self.cleaned_data["parent"]
+        if parent is not None:
+            try:
+                hierarchy.check_parent(self.instance.pk, parent.pk)
+            except ValueError as error:
+                raise forms.ValidationError(str(error))
+        return parent
+
 
 class WorkerCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -174,6 +207,7 @@ class PositionForm(forms.ModelForm):
                     "rows": 3,
                 }
             ),
+            "task_types": forms.CheckboxSelectMultiple,
         }
 
     def __init__(self, *args, **kwargs):
@@ -213,3 +247,50 @@ class CommentForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["content"].label = ""
+
+
+class TaskDependencyForm(forms.Form):
+    depends_on = forms.ModelChoiceField(
+        queryset=Task.objects.only("id"),
+        label="",
+        error_messages={"invalid_choice": "There is no task with that number."},
+        widget=forms.NumberInput(
+            attrs={"placeholder": "Task #", "class": "form-control form-control-sm"}
+        ),
+    )
+
+    def __init__(self, *args, task, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.task = task
+
+    def clean_depends_on(self):
+        depends_on = self.cleaned_data["depends_on"]
+        if dependencies.creates_cycle(self.task.pk, depends_on.pk):
+            raise forms.ValidationError(
+                "That task already waits on this one, directly or indirectly."
+            )
+        if TaskDependency.objects.filter(
+            task=self.task, depends_on=depends_on
+        ).exists():
+            raise forms.ValidationError("This dependency already exists.")
+        return depends_on
+
+
+class SavedFilterForm(forms.ModelForm):
+    shared = forms.BooleanField(
+        required=False,
+        label="Share with my position",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+    class Meta:
+        model = SavedFilter
+        fields = ("name",)
+        widgets = {
+            "name": forms.TextInput(
+                attrs={
+                    "placeholder": "Name this filter...",
+                    "class": "form-control form-control-sm",
+                }
+            ),
+        }
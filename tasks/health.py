@@ -0,0 +1,93 @@
+"""Liveness and readiness probes for web workers.
+
+``/healthz`` answers as soon as a worker handles requests. ``/readyz``
+answers 503 until the worker has warmed up: imported every view through
+the URLconf, compiled the templates of the main pages and reached the
+database and the cache. Load balancers then only send traffic to workers
+whose first user won't pay for all of that. Under gunicorn the master
+loads the URLconf and templates once, before it forks, so every worker
+shares them, and each worker starts the rest of the warm-up as soon as it
+forks; elsewhere the first readiness probe does all of it.
+"""
+
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/healthz"
+READY_PATH = "/readyz"
+
+TEMPLATES = (
+    "registration/login.html",
+    "tasks/index.html",
+    "tasks/dashboard.html",
+    "tasks/task_list.html",
+    "tasks/task_detail.html",
+    "tasks/task_form.html",
+    "tasks/worker_list.html",
+)
+
+
+def load_code():
+    """Import every view and compile the main templates, without any I/O."""
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def warm_up():
+    load_code()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()
+    cache.get(READY_PATH)
+
+
+class Readiness:
+    """Runs the warm-up once per process, in the background."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = False
+        self._ready = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            warm_up()
+        except Exception:
+            logger.exception("Warm-up failed; the next readiness probe retries.")
+            with self._lock:
+                self._started = False
+        else:
+            self._ready.set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def reset(self):
+        with self._lock:
+            self._started = False
+            self._ready.clear()
+
+
+readiness = Readiness()
@@ -0,0 +1,238 @@
+"""Subtask trees stored as materialized paths.
+
+Every task carries ``path``, the zero-padded ids of its ancestors and itself
+(``0000000001/0000000007/``), and ``depth``. A subtree is one indexed prefix
+query, the breadcrumb is one primary-key lookup, and moving a subtree
+rewrites all its paths with one ``UPDATE``.
+
+Each task also counts its subtasks at any depth and how many of them are
+closed. Creating, closing, reopening, moving and deleting a task adjust the
+counters of its ancestors with one ``UPDATE``, so progress is never
+recomputed when a task is shown.
+
+Paths and counters are always read back from the database here: instances
+in memory may predate a move.
+"""
+
+from collections import Counter
+
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Concat, Substr
+
+from tasks.models import CLOSED_STATUSES, Task
+
+SEGMENT_WIDTH = 10
+MAX_DEPTH = 20
+
+
+def segment(pk):
+    return f"{pk:0{SEGMENT_WIDTH}d}/"
+
+
+def ancestor_ids(path):
+    """Ids of the tasks above the one at ``path``, root first."""
+    return [int(part) for part in path.split("/")[:-2]]
+
+
+def placement(pk):
+    return Task.objects.filter(pk=pk).values("path", "depth", "status").first()
+
+
+def check_parent(task_pk, parent_pk):
+    """Raise ValueError when ``parent_pk`` cannot hold the subtree of ``task_pk``."""
+    if parent_pk is None:
+        return
+    parent = placement(parent_pk)
+    if parent is None:
+        raise ValueError("The parent task does not exist.")
+    if task_pk is None:
+        if parent["depth"] + 1 >= MAX_DEPTH:
+            raise ValueError(f"Subtasks can nest at most {MAX_DEPTH} levels deep.")
+        return
+    current = placement(task_pk)
+    if parent["path"].startswith(current["path"]):
+        raise ValueError("A task cannot be moved under itself or its subtasks.")
+    height = (
+        Task.objects.filter(path__startswith=current["path"])
+        .order_by("-depth")
+        .values_list("depth", flat=True)
+        .first()
+        - current["depth"]
+    )
+    if parent["depth"] + 1 + height >= MAX_DEPTH:
+        raise ValueError(f"Subtasks can nest at most {MAX_DEPTH} levels deep.")
+
+
+def adjust_counters(ids, total, done):
+    if ids and (total or done):
+        Task.objects.filter(pk__in=ids).update(
+            subtask_count=F("subtask_count") + total,
+            subtasks_done=F("subtasks_done") + done,
+        )
+
+
+def placed(task):
+    """Give a new task its path and count it in its ancestors."""
+    parent = placement(task.parent_id) if task.parent_id else None
+    prefix = parent["path"] if parent else ""
+    path = prefix + segment(task.pk)
+    depth = parent["depth"] + 1 if parent else 0
+    Task.objects.filter(pk=task.pk).update(path=path, depth=depth)
+    task.path, task.depth = path, depth
+    adjust_counters(ancestor_ids(path), 1, int(task.status in CLOSED_STATUSES))
+
+
+def status_changed(task, old_status, new_status):
+    was_closed = old_status in CLOSED_STATUSES
+    is_closed = new_status in CLOSED_STATUSES
+    if was_closed != is_closed:
+        current = placement(task.pk)
+        adjust_counters(ancestor_ids(current["path"]), 0, 1 if is_closed else -1)
+
+
+def move(task):
+    """Re-root the subtree of ``task`` under its (already saved) parent."""
+    current = Task.objects.filter(pk=task.pk).values(
+        "path", "depth", "status", "subtask_count", "subtasks_done"
+    )[0]
+    old_path = current["path"]
+    if not old_path:
+        return
+    parent = placement(task.parent_id) if task.parent_id else None
+    new_path = (parent["path"] if parent else "") + segment(task.pk)
+    if new_path == old_path:
+        return
+    total = current["subtask_count"] + 1
+    done = current["subtasks_done"] + int(current["status"] in CLOSED_STATUSES)
+    adjust_counters(ancestor_ids(old_path), -total, -done)
+    rewrite_subtree(old_path, new_path)
+    adjust_counters(ancestor_ids(new_path), total, done)
+
+
+def rewrite_subtree(old_prefix, new_prefix, exclude=None):
+    """Replace ``old_prefix`` with ``new_prefix`` across a subtree, set-based."""
+    shift = (len(new_prefix) - len(old_prefix)) // (SEGMENT_WIDTH + 1)
+    Task.objects.filter(path__startswith=old_prefix).exclude(pk=exclude).update(
+        path=Concat(
+            Value(new_prefix),
+            Substr("path", len(old_prefix) + 1),
+            output_field=CharField(),
+        ),
+        depth=F("depth") + shift,
+    )
+
+
+def removed(task):
+    """Hand the subtasks of a task about to be deleted to its parent."""
+    current = (
+        Task.objects.filter(pk=task.pk).values("path", "status", "parent_id").first()
+    )
+    if current is None:
+        return
+    path = current["path"]
+    if not path:
+        return
+    closed = int(current["status"] in CLOSED_STATUSES)
+    adjust_counters(ancestor_ids(path), -1, -closed)
+    Task.objects.filter(parent_id=task.pk).update(parent_id=current["parent_id"])
+    rewrite_subtree(path, path[: -(SEGMENT_WIDTH + 1)], exclude=task.pk)
+
+
+def adjust_outside(ids, rows, sign):
+    """Count ``(path, status)`` rows of the tasks ``ids`` in their other ancestors."""
+    totals, dones = Counter(), Counter()
+    for path, status in rows:
+        for ancestor in ancestor_ids(path):
+            if ancestor not in ids:
+                totals[ancestor] += 1
+                dones[ancestor] += int(status in CLOSED_STATUSES)
+    amounts = {}
+    for ancestor, total in totals.items():
+        amounts.setdefault((total, dones[ancestor]), []).append(ancestor)
+    for (total, done), ancestors in amounts.items():
+        adjust_counters(ancestors, sign * total, sign * done)
+
+
+def archived(ids):
+    """Uncount tasks about to move to the archive from the ancestors that stay.
+
+    Archived subtrees are whole (see ``tasks.archive.archivable``), so unlike
+    ``removed`` no subtask is left to hand over.
+    """
+    ids = set(ids)
+    adjust_outside(
+        ids, Task.objects.filter(pk__in=ids).values_list("path", "status"), -1
+    )
+
+
+def restored(ids):
+    """Place tasks coming back from the archive under their parents again.
+
+    A task whose parent is gone, still archived or too deep becomes a root.
+    Restored tasks count their restored subtasks and are counted again in
+    the ancestors they rejoin.
+    """
+    ids = set(ids)
+    tasks = {
+        task.pk: task
+        for task in Task.objects.filter(pk__in=ids).only("parent_id", "status")
+    }
+    outside = {
+        pk: (path, depth)
+        for pk, path, depth in Task.objects.filter(
+            pk__in={task.parent_id for task in tasks.values()} - ids
+        ).values_list("pk", "path", "depth")
+    }
+
+    def place(task):
+        if task.path:
+            return
+        parent = tasks.get(task.parent_id)
+        if parent is not None:
+            place(parent)
+            above = (parent.path, parent.depth)
+        else:
+            above = outside.get(task.parent_id)
+        if above is None or above[1] + 1 >= MAX_DEPTH:
+            task.parent_id = None
+            task.path, task.depth = segment(task.pk), 0
+        else:
+            task.path, task.depth = above[0] + segment(task.pk), above[1] + 1
+
+    for task in tasks.values():
+        task.path = ""
+    for task in tasks.values():
+        place(task)
+    for task in tasks.values():
+        task.subtask_count = task.subtasks_done = 0
+    for task in tasks.values():
+        for ancestor in ancestor_ids(task.path):
+            if ancestor in tasks:
+                tasks[ancestor].subtask_count += 1
+                tasks[ancestor].subtasks_done += int(task.status in CLOSED_STATUSES)
+    Task.objects.bulk_update(
+        tasks.values(), ["parent", "path", "depth", "subtask_count", "subtasks_done"]
+    )
+    adjust_outside(ids, [(task.path, task.status) for task in tasks.values()], 1)
+
+
+def descendants(task):
+    return Task.objects.filter(path__startswith=task.path).exclude(pk=task.pk)
+
+
+def subtree_status_counts(task):
+    """``{status: count}`` over the subtasks of ``task``, at any depth."""
+    return dict(
+        descendants(task)
+        .order_by()
+        .values("status")
+        .annotate(n=Count("pk"))
+        .values_list("status", "n")
+    )
+
+
+def breadcrumb(task):
+    """Ancestors of ``task``, root first, in one query."""
+    ids = ancestor_ids(task.path)
+    ancestors = Task.objects.only("id", "name").in_bulk(ids)
+    return [ancestors[pk] for pk in ids if pk in ancestors]
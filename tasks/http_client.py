@@ -0,0 +1,177 @@
+"""A small asyncio HTTP/1.1 client built on the standard library.
+
+Each client keeps one connection alive between requests, reconnecting when
+the server closed it, and a cookie jar, so it can act as one browser
+session; ``cookies=False`` turns the jar off for clients that are not one.
+It sends form-encoded bodies and reads Content-Length, chunked and
+read-until-close responses; redirects are returned, not followed.
+
+A request that fails on a reused connection is sent once more on a fresh
+one, whatever its method. The server may have acted on the first one
+before the connection broke, so callers sending requests that are not
+idempotent must be able to tell a repeat.
+"""
+
+import asyncio
+import ssl
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpError(Exception):
+    """The connection failed or the server sent something unreadable."""
+
+
+@dataclass
+class Response:
+    status: int
+    headers: list = field(default_factory=list)
+    body: bytes = b""
+
+    def header(self, name, default=None):
+        name = name.lower()
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return default
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout=30, cookies=True):
+        parts = urlsplit(base_url)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.secure else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.cookies = {} if cookies else None
+        self._reader = self._writer = None
+
+    @property
+    def host_header(self):
+        default = 443 if self.secure else 80
+        return self.host if self.port == default else f"{self.host}:{self.port}"
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.secure else None
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, ssl=context
+        )
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def get(self, path, params=None, headers=None):
+        if params:
+            path = f"{path}?{urlencode(params, doseq=True)}"
+        return await self.request("GET", path, headers=headers)
+
+    async def post(self, path, data=None, headers=None):
+        body = urlencode(data or {}, doseq=True).encode()
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            **(headers or {}),
+        }
+        return await self.request("POST", path, body=body, headers=headers)
+
+    async def request(self, method, path, body=b"", headers=None):
+        try:
+            return await asyncio.wait_for(
+                self._send(method, path, body, headers or {}), self.timeout
+            )
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+            await self.close()
+            raise HttpError(f"{method} {path}: {error!r}") from error
+
+    async def _send(self, method, path, body, headers):
+        lines = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body)}",
+        ]
+        if self.cookies:
+            lines.append(
+                "Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            )
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        reused = self._writer is not None
+        if not reused:
+            await self._connect()
+        try:
+            self._writer.write(payload)
+            await self._writer.drain()
+            response = await self._read()
+        except (OSError, asyncio.IncompleteReadError):
+            if not reused:
+                raise
+            # The server dropped the idle connection; retry on a fresh one.
+            await self.close()
+            await self._connect()
+            self._writer.write(payload)
+            await self._writer.drain()
+            response = await self._read()
+
+        self._store_cookies(response)
+        if (response.header("connection") or "").lower() == "close":
+            await self.close()
+        return response
+
+    async def _read(self):
+        status_line = await self._reader.readuntil(b"\r\n")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise HttpError(f"Bad status line {status_line!r}")
+        headers = []
+        while True:
+            line = await self._reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip().lower(), value.strip()))
+        response = Response(status, headers)
+
+        if (response.header("transfer-encoding") or "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            response.body = b"".join(chunks)
+        elif response.header("content-length") is not None:
+            response.body = await self._reader.readexactly(
+                int(response.header("content-length"))
+            )
+        elif status >= 200 and status not in (204, 304):
+            response.body = await self._reader.read()
+            await self.close()
+        return response
+
+    def _store_cookies(self, response):
+        if self.cookies is None:
+            return
+        for name, value in response.headers:
+            if name != "set-cookie":
+                continue
+            for morsel in SimpleCookie(value).values():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(morsel.key, None)
+                else:
+                    self.cookies[morsel.key] = morsel.value
@@ -0,0 +1,175 @@
+"""Per-worker iCalendar feeds of assigned task deadlines.
+
+Calendar apps poll a feed every few minutes without a session, so its URL
+carries a signed token naming the worker. The feed lists the worker's open
+tasks that have a deadline, streamed straight from the assignment and
+deadline indexes.
+
+With a shared cache each worker has a version in the cache that is
+replaced whenever one of their assignments, or the deadline, name,
+description, status or priority of an assigned task, changes (see
+``tasks.signals``). The version is the feed's ETag and keys its cached
+body, so a poll that finds nothing new is answered ``304 Not Modified``
+from a single cache read. Without a shared cache the versions could not be
+kept in step between processes; the feed is then rendered on every poll
+and its ETag is a hash of the body.
+"""
+
+import hashlib
+import secrets
+from datetime import timezone as dt_timezone
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from tasks.models import CLOSED_STATUSES, Priority, Status, Task
+
+SALT = "tasks.ical"
+
+TRACKED_FIELDS = ("name", "description", "deadline", "status", "priority")
+
+CHUNK_SIZE = 500
+
+
+def enabled():
+    return settings.CALENDAR_CACHE_SECONDS > 0
+
+
+def make_token(worker_id):
+    return signing.Signer(salt=SALT).sign(str(worker_id))
+
+
+def worker_for_token(token):
+    """The worker id a feed token was signed for, or None if it is forged."""
+    try:
+        return int(signing.Signer(salt=SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def version_key(worker_id):
+    return f"ical:{worker_id}:version"
+
+
+def body_key(worker_id, version):
+    return f"ical:{worker_id}:{version}"
+
+
+def version(worker_id):
+    """The worker's current feed version, starting a new one if it expired."""
+    key = version_key(worker_id)
+    current = cache.get(key)
+    if current is None:
+        # Random rather than counted, so a version that fell out of the
+        # cache is never reused for different content.
+        cache.add(key, secrets.token_hex(8), None)
+        current = cache.get(key) or secrets.token_hex(8)
+    return current
+
+
+def invalidate(*worker_ids):
+    if not enabled() or not worker_ids:
+        return
+    cache.set_many(
+        {version_key(worker_id): secrets.token_hex(8) for worker_id in worker_ids},
+        None,
+    )
+
+
+def etag(worker_id, version):
+    return f'"{worker_id}-{version}"'
+
+
+def body_etag(body):
+    return f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+def escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Split ``line`` into content lines of at most 75 octets (RFC 5545)."""
+    parts = []
+    current, size, limit = [], 0, 75
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            parts.append("".join(current))
+            # Continuation lines start with a space, which counts.
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def feed_tasks(worker_id):
+    return (
+        Task.objects.filter(assignee=worker_id, deadline__isnull=False)
+        .exclude(status__in=CLOSED_STATUSES)
+        .order_by("deadline", "pk")
+        .values_list(
+            "pk", "name", "description", "deadline", "status", "priority", "updated_at"
+        )
+    )
+
+
+def event(row, site_url, host):
+    pk, name, description, deadline, status, priority, updated_at = row
+    url = site_url + Task(pk=pk).get_absolute_url()
+    details = f"{Status(status).label}, {Priority(priority).label} priority."
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:task-{pk}@{host}",
+        f"DTSTAMP:{stamp(updated_at)}",
+        f"DTSTART:{stamp(deadline)}",
+        f"DTEND:{stamp(deadline)}",
+        f"SUMMARY:{escape(name)}",
+        f"DESCRIPTION:{escape(f'{details} {description}'.strip())}",
+        f"URL:{url}",
+        "END:VEVENT",
+    ]
+    return "".join(fold(line) for line in lines)
+
+
+def stream(worker_id):
+    """The worker's feed as encoded chunks, one per task."""
+    site_url = settings.SITE_URL.rstrip("/")
+    host = urlsplit(site_url).hostname or "localhost"
+    yield "".join(
+        fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:-//{host}//Task deadlines//EN",
+            "CALSCALE:GREGORIAN",
+            "X-WR-CALNAME:Task deadlines",
+        )
+    ).encode()
+    for row in feed_tasks(worker_id).iterator(chunk_size=CHUNK_SIZE):
+        yield event(row, site_url, host).encode()
+    yield fold("END:VCALENDAR").encode()
+
+
+def cached_stream(worker_id, version):
+    """``stream``, saving the whole feed under ``version`` once it is sent."""
+    chunks = []
+    for chunk in stream(worker_id):
+        chunks.append(chunk)
+        yield chunk
+    cache.set(
+        body_key(worker_id, version), b"".join(chunks), settings.CALENDAR_CACHE_SECONDS
+    )
@@ -0,0 +1,443 @@
+"""A background job queue kept in the database.
+
+Functions decorated with ``@job`` can be queued with ``func.enqueue(...)``,
+optionally with a priority or a delay. The job row is written in the
+caller's transaction, so work queued by a request that rolls back is never
+run. ``manage.py run_jobs`` claims due jobs, highest priority first, and
+runs them on a thread or process pool:
+
+- On PostgreSQL a claim is ``SELECT ... FOR UPDATE SKIP LOCKED``, so any
+  number of runners take disjoint jobs without waiting on each other.
+- Elsewhere (SQLite) a claim is a compare-and-set ``UPDATE`` of the
+  status column, which only one runner can win. SQLite locks whole tables
+  and may fail a statement that meets another runner's write instead of
+  waiting for it, so those statements are retried after a short pause.
+
+Either way the claim is a lease: the runner extends ``locked_until`` while
+a job runs, and jobs whose runner died are queued again once it lapses. A
+job that raises is retried with exponential backoff until its
+``max_attempts``. Every job records when it was due, started and finished,
+so ``manage.py job_stats`` can report throughput per runner and queue
+latency from the table alone.
+"""
+
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import timedelta
+from functools import partial
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.db import (
+    OperationalError,
+    close_old_connections,
+    connections,
+    router,
+    transaction,
+)
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from tasks import digests, rollups, saved_filters, snapshots
+from tasks.models import Job, JobStatus
+from tasks.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+PRUNE_INTERVAL = timedelta(hours=1)
+
+# Tries, and the first pause in seconds, for statements SQLite refuses
+# because another runner holds the table.
+LOCKED_TRIES = 8
+LOCKED_PAUSE = 0.005
+
+
+def job(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` as a job and give it an ``enqueue`` method.
+
+    Arguments must be JSON-serializable. Jobs defined outside this module
+    must be imported before the runner starts, e.g. from an app's
+    ``ready()``.
+    """
+    if func is None:
+        return partial(job, name=name, max_attempts=max_attempts)
+    job_name = name or f"{func.__module__}.{func.__qualname__}"
+    registry[job_name] = func
+    func.job_name = job_name
+    func.enqueue = partial(enqueue, job_name, max_attempts=max_attempts)
+    return func
+
+
+def enqueue(
+    name,
+    args=(),
+    kwargs=None,
+    *,
+    priority=0,
+    delay=None,
+    run_at=None,
+    max_attempts=None,
+):
+    """Queue the job ``name``; it runs once due and a runner is free."""
+    if name not in registry:
+        raise ValueError(f"Unknown job {name!r}.")
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    return Job.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def when_unlocked(statement):
+    """Run ``statement()``, again while SQLite reports the job table locked."""
+    if connections[router.db_for_write(Job)].vendor != "sqlite":
+        return statement()
+    for attempt in range(LOCKED_TRIES):
+        try:
+            return statement()
+        except OperationalError as error:
+            if "locked" not in str(error) or attempt == LOCKED_TRIES - 1:
+                raise
+        time.sleep(LOCKED_PAUSE * 2**attempt * random.uniform(1, 2))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_expiry(now=None):
+    return (now or timezone.now()) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+def claim(worker, limit):
+    """Claim up to ``limit`` due jobs for ``worker``; their ids, in order."""
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now)
+        .order_by("-priority", "run_at", "pk")
+        .values_list("pk", flat=True)
+    )
+    claimed = {
+        "status": JobStatus.RUNNING,
+        "worker": worker,
+        "locked_until": lease_expiry(now),
+        "started_at": now,
+        "attempts": F("attempts") + 1,
+    }
+    db = router.db_for_write(Job)
+    if connections[db].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=db):
+            ids = list(due.using(db).select_for_update(skip_locked=True)[:limit])
+            Job.objects.using(db).filter(pk__in=ids).update(**claimed)
+        return ids
+    ids = []
+    for pk in when_unlocked(lambda: list(due.using(db)[:limit])):
+        # Only one runner's update still finds the job queued.
+        queued = Job.objects.filter(pk=pk, status=JobStatus.QUEUED)
+        if when_unlocked(partial(queued.update, **claimed)):
+            ids.append(pk)
+    return ids
+
+
+def extend(worker, ids):
+    """Renew the leases ``worker`` holds on the running jobs ``ids``."""
+    held = Job.objects.filter(pk__in=ids, worker=worker, status=JobStatus.RUNNING)
+    return when_unlocked(partial(held.update, locked_until=lease_expiry()))
+
+
+def recover(now=None):
+    """Queue again the running jobs whose runner let the lease lapse."""
+    now = now or timezone.now()
+    lapsed = Job.objects.filter(status=JobStatus.RUNNING, locked_until__lt=now)
+    error = "The runner stopped renewing its lease."
+    failed = when_unlocked(
+        partial(
+            lapsed.filter(attempts__gte=F("max_attempts")).update,
+            status=JobStatus.FAILED,
+            locked_until=None,
+            finished_at=now,
+            last_error=error,
+        )
+    )
+    retried = when_unlocked(
+        partial(
+            lapsed.update,
+            status=JobStatus.QUEUED,
+            locked_until=None,
+            run_at=now,
+            last_error=error,
+        )
+    )
+    return retried + failed
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``, doubling with jitter."""
+    delay = min(
+        settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def execute(job_id, worker):
+    """Run a claimed job and record how it went.
+
+    Returns ``(succeeded, queue latency, run time)`` in seconds.
+    """
+    job = when_unlocked(partial(Job.objects.get, pk=job_id))
+    error = None
+    try:
+        handler = registry.get(job.name)
+        if handler is None:
+            raise LookupError(f"Unknown job {job.name!r}.")
+        handler(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s failed.", job)
+    now = timezone.now()
+    mine = Job.objects.filter(pk=job.pk, worker=worker, status=JobStatus.RUNNING)
+    if error is None:
+        outcome = dict(
+            status=JobStatus.DONE, locked_until=None, finished_at=now, last_error=""
+        )
+    elif job.attempts >= job.max_attempts:
+        outcome = dict(
+            status=JobStatus.FAILED,
+            locked_until=None,
+            finished_at=now,
+            last_error=error,
+        )
+    else:
+        outcome = dict(
+            status=JobStatus.QUEUED,
+            locked_until=None,
+            run_at=now + timedelta(seconds=backoff(job.attempts)),
+            last_error=error,
+        )
+    when_unlocked(partial(mine.update, **outcome))
+    return (
+        error is None,
+        (job.started_at - job.run_at).total_seconds(),
+        (now - job.started_at).total_seconds(),
+    )
+
+
+def execute_in_pool(job_id, worker):
+    """``execute`` on a pool thread or process, which has its own connection."""
+    close_old_connections()
+    try:
+        return execute(job_id, worker)
+    finally:
+        close_old_connections()
+
+
+def prune(now=None):
+    """Delete finished jobs older than JOB_RETENTION_DAYS."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(
+        status__in=[JobStatus.DONE, JobStatus.FAILED], finished_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def depth(now=None):
+    """Jobs queued now, the number of them delayed, and the oldest due one's wait."""
+    now = now or timezone.now()
+    queued = Job.objects.filter(status=JobStatus.QUEUED)
+    due = queued.filter(run_at__lte=now).aggregate(
+        count=Count("pk"), oldest=Min("run_at")
+    )
+    return {
+        "due": due["count"],
+        "delayed": queued.filter(run_at__gt=now).count(),
+        "running": Job.objects.filter(status=JobStatus.RUNNING).count(),
+        "oldest_wait_s": (
+            round((now - due["oldest"]).total_seconds(), 3) if due["oldest"] else 0
+        ),
+    }
+
+
+def stats(since, now=None):
+    """Per-runner throughput and latency of the jobs finished since ``since``."""
+    now = now or timezone.now()
+    rows = (
+        Job.objects.filter(finished_at__gte=since, finished_at__lte=now)
+        .values_list("worker", "status", "run_at", "started_at", "finished_at")
+        .order_by("worker")
+    )
+    minutes = max((now - since).total_seconds() / 60, 1 / 60)
+    runners = {}
+    for worker, status, run_at, started_at, finished_at in rows.iterator():
+        runner = runners.setdefault(
+            worker, {"done": 0, "failed": 0, "waits": [], "runs": []}
+        )
+        runner["done" if status == JobStatus.DONE else "failed"] += 1
+        runner["waits"].append((started_at - run_at).total_seconds())
+        runner["runs"].append((finished_at - started_at).total_seconds())
+    return {worker: summarize(runner, minutes) for worker, runner in runners.items()}
+
+
+def summarize(runner, minutes):
+    waits, runs = sorted(runner["waits"]), sorted(runner["runs"])
+    return {
+        "done": runner["done"],
+        "failed": runner["failed"],
+        "per_minute": round((runner["done"] + runner["failed"]) / minutes, 2),
+        "wait_p50_ms": round(percentile(waits, 0.5) * 1000, 1),
+        "wait_p95_ms": round(percentile(waits, 0.95) * 1000, 1),
+        "run_p95_ms": round(percentile(runs, 0.95) * 1000, 1),
+    }
+
+
+class Runner:
+    """Claims jobs and runs ``concurrency`` of them at a time on a pool.
+
+    Threads suit jobs that wait on the database or the network; processes
+    suit CPU-bound jobs and start Django afresh in every child.
+    """
+
+    def __init__(self, concurrency=1, pool="thread", interval=1.0, worker=None):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.interval = interval
+        self.worker = worker or worker_name()
+        self.stopping = False
+        self.done = self.failed = 0
+        self.waits, self.runs = [], []
+        self._recovered_at = self._pruned_at = None
+
+    def executor(self):
+        if self.pool == "process":
+            return ProcessPoolExecutor(
+                self.concurrency,
+                mp_context=get_context("spawn"),
+                # Children unpickle ``execute_in_pool`` by importing this
+                # module, which needs the app registry ready.
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self, until_idle=False, report=None, report_every=60):
+        """Run jobs until ``stop()``, or until none are due with ``until_idle``.
+
+        ``report`` is called with ``self.report()`` every ``report_every``
+        seconds and once more at the end.
+        """
+        in_flight = {}
+        renew_every = settings.JOB_LEASE_SECONDS / 3
+        renewed_at = reported_at = time.monotonic()
+        with self.executor() as executor:
+            while not self.stopping or in_flight:
+                if not self.stopping:
+                    self.maintain()
+                    free = self.concurrency - len(in_flight)
+                    for pk in claim(self.worker, free) if free else ():
+                        future = executor.submit(execute_in_pool, pk, self.worker)
+                        in_flight[future] = pk
+                if not in_flight:
+                    if until_idle:
+                        break
+                    time.sleep(self.interval)
+                    continue
+                finished, _ = wait(
+                    in_flight, timeout=self.interval, return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    self.record(in_flight.pop(future), future)
+                if time.monotonic() - renewed_at >= renew_every and in_flight:
+                    extend(self.worker, list(in_flight.values()))
+                    renewed_at = time.monotonic()
+                if report and time.monotonic() - reported_at >= report_every:
+                    report(self.report(time.monotonic() - reported_at))
+                    reported_at = time.monotonic()
+        if report:
+            report(self.report(time.monotonic() - reported_at))
+
+    def maintain(self):
+        now = timezone.now()
+        every = timedelta(seconds=settings.JOB_LEASE_SECONDS / 3)
+        if self._recovered_at is None or now - self._recovered_at >= every:
+            recover(now)
+            self._recovered_at = now
+        if self._pruned_at is None or now - self._pruned_at >= PRUNE_INTERVAL:
+            prune(now)
+            self._pruned_at = now
+
+    def record(self, job_id, future):
+        try:
+            succeeded, wait_s, run_s = future.result()
+        except Exception:
+            # The pool itself failed, e.g. a process died; the lease will
+            # lapse and the job run again.
+            logger.exception("Job #%s was lost by the pool.", job_id)
+            self.failed += 1
+            return
+        self.done += succeeded
+        self.failed += not succeeded
+        self.waits.append(wait_s)
+        self.runs.append(run_s)
+
+    def report(self, seconds):
+        """Throughput and latency since the last report; resets the counters."""
+        waits, runs = sorted(self.waits), sorted(self.runs)
+        finished = self.done + self.failed
+        line = (
+            f"{self.worker}: {finished / seconds if seconds else 0:.2f} jobs/s "
+            f"({self.done} done, {self.failed} raised)"
+        )
+        if waits:
+            line += (
+                f", queue latency p50 {percentile(waits, 0.5) * 1000:.0f} ms"
+                f" p95 {percentile(waits, 0.95) * 1000:.0f} ms"
+                f", run time p95 {percentile(runs, 0.95) * 1000:.0f} ms"
+            )
+        self.done = self.failed = 0
+        self.waits, self.runs = [], []
+        return line + "."
+
+
+# Jobs of this app.
+
+
+@job
+def reconcile_rollups():
+    rollups.reconcile()
+
+
+@job
+def snapshot_tasks(backfill_days=365):
+    snapshots.take()
+    snapshots.backfill(backfill_days)
+
+
+@job
+def update_saved_filters(task_ids, fields=None):
+    """Re-check changed tasks against the saved filters; see tasks.saved_filters."""
+    saved_filters.tasks_changed(task_ids, None if fields is None else set(fields))
+
+
+@job
+def send_digests(first_id=1, end_id=None):
+    digests.send(timezone.localdate(), first_id=first_id, end_id=end_id)
@@ -0,0 +1,290 @@
+"""Load-test scenario for ``manage.py loadtest``.
+
+A pool of synthetic workers, each logged in over its own keep-alive
+connection, loops over a weighted mix of the main pages until the run
+ends: the index, the task list with random filters, task details, comment
+posts, and task creates and updates. Every request is recorded under its
+URL name, and the run is summarized as throughput, latency percentiles
+and error rates.
+"""
+
+import asyncio
+import math
+import random
+import re
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.urls import reverse
+
+from tasks.filters import TaskFilter
+from tasks.http_client import HttpClient, HttpError
+from tasks.models import Position, Priority, Status, Task, TaskType
+from tasks.stats import percentile
+
+USERNAME_PREFIX = "loadtest-"
+
+TASK_TYPES = ("Bug", "Feature", "Chore", "Research")
+
+WORDS = ("login", "crash", "report", "cache", "deploy", "export", "search", "page")
+
+# Relative weights of the actions each synthetic worker picks from.
+MIX = {
+    "index": 10,
+    "task-list": 35,
+    "task-detail": 25,
+    "comment": 10,
+    "task-create": 10,
+    "task-update": 10,
+}
+
+# ``TaskListView.paginate_by``; page numbers past the end are a 404.
+TASK_LIST_PAGE_SIZE = 10
+
+CSRF_FIELD = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def seed(tasks, users, password):
+    """Make sure the load-test workers and at least ``tasks`` tasks exist."""
+    task_types = [TaskType.objects.get_or_create(name=name)[0] for name in TASK_TYPES]
+    position, _ = Position.objects.get_or_create(name="Load tester")
+    workers = get_user_model().objects
+    usernames = [f"{USERNAME_PREFIX}{n}" for n in range(1, users + 1)]
+    existing = set(
+        workers.filter(username__in=usernames).values_list("username", flat=True)
+    )
+    hashed = make_password(password)
+    for username in usernames:
+        if username not in existing:
+            workers.create(username=username, password=hashed, position=position)
+
+    missing = tasks - Task.objects.count()
+    with transaction.atomic():
+        for n in range(max(missing, 0)):
+            Task.objects.create(
+                name=f"Load test task {n}",
+                description=" ".join(random.choices(WORDS, k=8)),
+                priority=random.choice(Priority.values),
+                status=random.choice(Status.values),
+                task_type=random.choice(task_types),
+            )
+    return usernames
+
+
+def filter_params(task_type_ids, pages=1):
+    """Random task list filters, about as varied as real use."""
+    params = {}
+    if random.random() < 0.3:
+        params["q"] = random.choice(WORDS)
+    if random.random() < 0.4:
+        params["status"] = random.choice(Status.values)
+    if random.random() < 0.3:
+        params["priority"] = random.choice(Priority.values)
+    if task_type_ids and random.random() < 0.3:
+        params["task_type"] = random.choice(task_type_ids)
+    if random.random() < 0.2:
+        params["deadline_filter"] = random.choice(
+            [value for value, _ in TaskFilter.DEADLINE_CHOICES]
+        )
+    if random.random() < 0.1:
+        params["active_filter"] = random.choice(
+            [value for value, _ in TaskFilter.STATUS_CHOICES]
+        )
+    if not params and pages > 1 and random.random() < 0.3:
+        params["page"] = random.randint(2, min(pages, 3))
+    return params
+
+
+def task_form(task_type_ids, name):
+    return {
+        "name": name,
+        "description": " ".join(random.choices(WORDS, k=6)),
+        "priority": random.choice(Priority.values),
+        "status": random.choice(Status.values),
+        "task_type": random.choice(task_type_ids),
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def add(self, name, seconds, error=None):
+        self.latencies[name].append(seconds)
+        if error is not None:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, error)
+
+    def summary(self, duration):
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "error_rate": self.errors[name] / len(values),
+                **{
+                    f"p{p}_ms": round(percentile(values, p / 100) * 1000, 2)
+                    for p in (50, 95, 99)
+                },
+            }
+            if name in self.error_samples:
+                endpoints[name]["first_error"] = self.error_samples[name]
+        total = sum(len(values) for values in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total,
+            "throughput_rps": round(total / duration, 2) if duration else 0,
+            "errors": errors,
+            "error_rate": errors / total if total else 0,
+            "endpoints": endpoints,
+        }
+
+
+class SyntheticWorker:
+    def __init__(self, base_url, username, password, task_ids, task_type_ids, recorder):
+        self.client = HttpClient(base_url)
+        self.username = username
+        self.password = password
+        self.task_ids = task_ids
+        self.task_type_ids = task_type_ids
+        self.recorder = recorder
+        self.created = []
+
+    async def call(self, name, method, path, data=None, params=None, ok=(200,)):
+        started = time.perf_counter()
+        error = None
+        try:
+            if method == "POST":
+                data = {**data, "csrfmiddlewaretoken": self.csrf_token()}
+                response = await self.client.post(
+                    path, data, headers={"Referer": self.client_origin + path}
+                )
+            else:
+                response = await self.client.get(path, params)
+            if response.status not in ok:
+                error = f"HTTP {response.status}"
+        except HttpError as failure:
+            response, error = None, str(failure)
+        self.recorder.add(name, time.perf_counter() - started, error)
+        return response
+
+    @property
+    def client_origin(self):
+        scheme = "https" if self.client.secure else "http"
+        return f"{scheme}://{self.client.host_header}"
+
+    def csrf_token(self):
+        return self.client.cookies.get("csrftoken", "")
+
+    async def log_in(self):
+        path = reverse("login")
+        response = await self.call("login-form", "GET", path)
+        if response is None or not CSRF_FIELD.search(response.body):
+            raise HttpError(f"No login form at {path}.")
+        response = await self.call(
+            "login",
+            "POST",
+            path,
+            {"username": self.username, "password": self.password},
+            ok=(302,),
+        )
+        if response is None or "sessionid" not in self.client.cookies:
+            raise HttpError(f"Could not log in as {self.username}.")
+
+    async def step(self):
+        action = random.choices(list(MIX), weights=list(MIX.values()))[0]
+        known = self.task_ids + self.created
+        task_id = random.choice(known) if known else None
+        if action == "index":
+            await self.call("index", "GET", reverse("index"))
+        elif action == "task-list":
+            await self.call(
+                "task-list",
+                "GET",
+                reverse("task-list"),
+                params=filter_params(
+                    self.task_type_ids, math.ceil(len(known) / TASK_LIST_PAGE_SIZE)
+                ),
+            )
+        elif action == "task-detail" and task_id:
+            await self.call(
+                "task-detail", "GET", reverse("task-detail", kwargs={"pk": task_id})
+            )
+        elif action == "comment" and task_id:
+            await self.call(
+                "task-detail (comment)",
+                "POST",
+                reverse("task-detail", kwargs={"pk": task_id}),
+                {"content": " ".join(random.choices(WORDS, k=5))},
+                ok=(200, 302),
+            )
+        elif action == "task-create":
+            name = f"Load test {random.getrandbits(64):016x}"
+            response = await self.call(
+                "task-create",
+                "POST",
+                reverse("task-create"),
+                task_form(self.task_type_ids, name),
+                ok=(302,),
+            )
+            # The form redirects to the task list, so the new task is found
+            # by its name, which no other task has.
+            if response is not None and response.status == 302:
+                task_id = await created_task_id(name)
+                if task_id is not None:
+                    self.created.append(task_id)
+        elif action == "task-update" and task_id:
+            await self.call(
+                "task-update",
+                "POST",
+                reverse("task-update", kwargs={"pk": task_id}),
+                task_form(self.task_type_ids, f"Load test task {task_id}"),
+                ok=(302,),
+            )
+
+    async def run(self, deadline):
+        try:
+            await self.log_in()
+            while time.monotonic() < deadline:
+                await self.step()
+        finally:
+            await self.client.close()
+
+
+@sync_to_async
+def created_task_id(name):
+    return Task.objects.filter(name=name).values_list("pk", flat=True).first()
+
+
+def targets():
+    """Ids of the tasks and task types the synthetic workers use."""
+    task_ids = list(Task.objects.order_by("-pk").values_list("pk", flat=True)[:1000])
+    task_type_ids = list(TaskType.objects.values_list("pk", flat=True))
+    return task_ids, task_type_ids
+
+
+async def run(base_url, usernames, password, duration, task_ids, task_type_ids):
+    """Drive the site with one synthetic worker per username; the summary."""
+    recorder = Recorder()
+    started = time.monotonic()
+    workers = [
+        SyntheticWorker(base_url, username, password, task_ids, task_type_ids, recorder)
+        for username in usernames
+    ]
+    results = await asyncio.gather(
+        *(worker.run(started + duration) for worker in workers),
+        return_exceptions=True,
+    )
+    summary = recorder.summary(time.monotonic() - started)
+    summary["failed_workers"] = [
+        str(result) for result in results if isinstance(result, Exception)
+    ]
+    return summary
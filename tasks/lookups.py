@@ -0,0 +1,223 @@
+"""Two-tier cache for small, rarely changed lookup tables.
+
+Task types and positions are read on almost every page but change a few
+times a year, so each one is cached whole: a per-process LRU sits in front
+of the shared Django cache, and both are keyed by a per-model generation
+number kept in the shared cache. Every save or delete of a row bumps the
+generation once it commits (see ``tasks.signals``), so stale copies are
+never read again and simply age out. Each process re-reads a generation
+at most every ``LOOKUP_GENERATION_CHECK_SECONDS``, so a dereference is
+usually served without a cache round trip; other processes see a change
+once their copy of the generation expires.
+
+Foreign keys declared as ``CachedForeignKey`` dereference through the
+cache, and their form dropdowns list the table from it. Bulk ``update()``
+calls bypass the signals and must call ``invalidate`` themselves. The cache
+is off while ``LOOKUP_CACHE_SECONDS`` is 0.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django import forms
+from django.forms.models import ModelChoiceIterator
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+LOCAL_SIZE = 16
+
+
+def enabled():
+    return settings.LOOKUP_CACHE_SECONDS > 0
+
+
+def generation_key(model):
+    return f"lookups:{model._meta.label_lower}:generation"
+
+
+class LookupCache:
+    """Whole lookup tables, one entry per model and generation."""
+
+    def __init__(self, size=LOCAL_SIZE):
+        self._lock = threading.Lock()
+        self._size = size
+        self._local = OrderedDict()
+        self._generations = {}
+
+    def _generation(self, model):
+        """``model``'s generation, re-read from the shared cache when due."""
+        label = model._meta.label_lower
+        now = time.monotonic()
+        with self._lock:
+            known = self._generations.get(label)
+        if known is not None and now < known[1]:
+            return known[0]
+        generation = cache.get(generation_key(model), 0)
+        with self._lock:
+            self._generations[label] = (
+                generation,
+                now + settings.LOOKUP_GENERATION_CHECK_SECONDS,
+            )
+        return generation
+
+    def _table(self, model):
+        generation = self._generation(model)
+        key = f"lookups:{model._meta.label_lower}:{generation}"
+        with self._lock:
+            table = self._local.get(key)
+            if table is not None:
+                self._local.move_to_end(key)
+                return table
+        rows = cache.get(key)
+        if rows is None:
+            rows = list(model._default_manager.all())
+            cache.set(key, rows, settings.LOOKUP_CACHE_SECONDS)
+        table = (rows, {row.pk: row for row in rows})
+        with self._lock:
+            self._local[key] = table
+            while len(self._local) > self._size:
+                self._local.popitem(last=False)
+        return table
+
+    def all(self, model):
+        """Copies of every row of ``model`` in its default order."""
+        rows, _ = self._table(model)
+        return [copy.copy(row) for row in rows]
+
+    def get(self, model, pk):
+        """A copy of the ``model`` row ``pk``, or None if there is none."""
+        _, by_pk = self._table(model)
+        row = by_pk.get(pk)
+        return copy.copy(row) if row is not None else None
+
+    def invalidate(self, model):
+        try:
+            cache.incr(generation_key(model))
+        except ValueError:
+            cache.set(generation_key(model), 1, None)
+        prefix = f"lookups:{model._meta.label_lower}:"
+        with self._lock:
+            self._generations.pop(model._meta.label_lower, None)
+            for key in [key for key in self._local if key.startswith(prefix)]:
+                del self._local[key]
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+            self._generations.clear()
+
+
+tables = LookupCache()
+
+
+def serves(queryset):
+    """Whether ``queryset`` is a whole cached table in its default order."""
+    query = queryset.query
+    return (
+        enabled()
+        and queryset.model in CachedForeignKey.targets
+        and not query.where
+        and not query.order_by
+        and not query.is_sliced
+        and not query.annotations
+        and not query.extra
+    )
+
+
+class CachedForwardDescriptor(ForwardManyToOneDescriptor):
+    def get_object(self, instance):
+        if enabled() and self.field.target_field.primary_key:
+            value = getattr(instance, self.field.attname)
+            row = tables.get(self.field.remote_field.model, value)
+            if row is not None:
+                return row
+        return super().get_object(instance)
+
+
+class CachedChoicesMixin:
+    """For ModelChoiceIterator subclasses: list a cached table without a query."""
+
+    def __iter__(self):
+        if not serves(self.queryset):
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        if getattr(self.field, "null_label", None) is not None:
+            yield (self.field.null_value, self.field.null_label)
+        for row in tables.all(self.queryset.model):
+            yield self.choice(row)
+
+    def __len__(self):
+        if not serves(self.queryset):
+            return super().__len__()
+        extra = sum(
+            getattr(self.field, label, None) is not None
+            for label in ("empty_label", "null_label")
+        )
+        return len(tables.all(self.queryset.model)) + extra
+
+    def __bool__(self):
+        if not serves(self.queryset):
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(
+            tables.all(self.queryset.model)
+        )
+
+
+class CachedChoiceFieldMixin:
+    """For ModelChoiceField subclasses: validate against a cached table."""
+
+    def to_python(self, value):
+        model = self.queryset.model
+        if (
+            value in self.empty_values
+            or self.to_field_name
+            or not serves(self.queryset)
+        ):
+            return super().to_python(value)
+        try:
+            pk = model._meta.pk.to_python(
+                value.pk if isinstance(value, model) else value
+            )
+        except ValidationError:
+            pk = None
+        row = tables.get(model, pk) if pk is not None else None
+        # Unknown values get the usual lookup and its error message.
+        return row if row is not None else super().to_python(value)
+
+
+class CachedModelChoiceIterator(CachedChoicesMixin, ModelChoiceIterator):
+    pass
+
+
+class CachedModelChoiceField(CachedChoiceFieldMixin, forms.ModelChoiceField):
+    iterator = CachedModelChoiceIterator
+
+
+class CachedForeignKey(models.ForeignKey):
+    """ForeignKey to a lookup table, dereferenced through ``tables``.
+
+    It deconstructs as a plain ForeignKey, so switching to it needs no
+    migration.
+    """
+
+    forward_related_accessor_class = CachedForwardDescriptor
+
+    targets = set()
+
+    def contribute_to_related_class(self, cls, related):
+        super().contribute_to_related_class(cls, related)
+        CachedForeignKey.targets.add(cls)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, "django.db.models.ForeignKey", args, kwargs
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": CachedModelChoiceField, **kwargs})
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks closed for longer than TASK_ARCHIVE_AFTER_DAYS, with their "
+        "comments and assignees, into the archive tables. Safe to interrupt "
+        "and rerun: every batch is moved in its own transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive tasks closed for longer than this many days "
+            "(default: TASK_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Tasks moved per transaction.",
+        )
+        parser.add_argument(
+            "--restore",
+            nargs="+",
+            type=int,
+            metavar="TASK_ID",
+            help="Move these archived tasks back instead of archiving.",
+        )
+
+    def handle(self, *args, **options):
+        if options["restore"]:
+            restored = archive.restore(options["restore"])
+            self.stdout.write(f"Restored {restored} task(s).")
+            return
+        days = options["days"]
+        if days is None:
+            days = settings.TASK_ARCHIVE_AFTER_DAYS
+        archived = archive.archive(days, options["batch_size"])
+        self.stdout.write(f"Archived {archived} task(s) closed for over {days} days.")
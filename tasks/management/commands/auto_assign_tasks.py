@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from tasks import assignment
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign open tasks nobody is assigned to, balancing them over the "
+        "least-loaded eligible workers in one pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--task-type",
+            type=int,
+            metavar="TASK_TYPE_ID",
+            help="Only assign tasks of this type.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Assign at most this many tasks, oldest first.",
+        )
+
+    def handle(self, *args, **options):
+        tasks = assignment.unassigned_tasks()
+        if options["task_type"] is not None:
+            tasks = tasks.filter(task_type_id=options["task_type"])
+        if options["limit"] is not None:
+            tasks = tasks[: options["limit"]]
+        plan = assignment.balancer.assign_many(tasks.iterator())
+        assigned = sum(len(task_ids) for task_ids in plan.values())
+        self.stdout.write(f"Assigned {assigned} task(s) to {len(plan)} worker(s).")
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from tasks.lookups import tables
+from tasks.models import Position, Task, TaskType
+
+
+def pages(worker):
+    yield "index", reverse("index")
+    yield "task list", reverse("task-list")
+    yield "new task", reverse("task-create")
+    task = Task.objects.order_by("-pk").first()
+    if task is not None:
+        yield "task detail", task.get_absolute_url()
+    yield "task types", reverse("task-type-list")
+    yield "workers", reverse("worker-list")
+    yield "worker detail", reverse("worker-detail", kwargs={"pk": worker.pk})
+    yield "positions", reverse("position-list")
+    position = Position.objects.first()
+    if position is not None:
+        yield "position detail", position.get_absolute_url()
+    task_type = TaskType.objects.first()
+    if task_type is not None:
+        yield "task type detail", task_type.get_absolute_url()
+
+
+class Command(BaseCommand):
+    help = (
+        "Count the queries the main pages make with and without the lookup "
+        "table cache, and print how many each request saves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            help="Render the pages as this worker; defaults to the first superuser.",
+        )
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"GET {url} returned {response.status_code}.")
+        return len(queries)
+
+    def handle(self, *args, **options):
+        workers = get_user_model().objects
+        if options["username"]:
+            worker = workers.filter(username=options["username"]).first()
+        else:
+            worker = workers.filter(is_superuser=True).first()
+        if worker is None:
+            raise CommandError("No worker to render the pages as.")
+
+        client = Client()
+        client.force_login(worker)
+        timeout = settings.LOOKUP_CACHE_SECONDS or 60
+        rows = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, url in pages(worker):
+                # The first request of each pair warms every other cache.
+                with override_settings(LOOKUP_CACHE_SECONDS=0):
+                    self.count_queries(client, url)
+                    without = self.count_queries(client, url)
+                with override_settings(LOOKUP_CACHE_SECONDS=timeout):
+                    tables.clear()
+                    self.count_queries(client, url)
+                    cached = self.count_queries(client, url)
+                rows.append((name, without, cached))
+
+        width = max(len(name) for name, _, _ in rows)
+        self.stdout.write(f"{'page':<{width}}  without  cached  saved")
+        for name, without, cached in rows:
+            self.stdout.write(
+                f"{name:<{width}}  {without:>7}  {cached:>6}  {without - cached:>5}"
+            )
+        saved = sum(without - cached for _, without, cached in rows)
+        self.stdout.write(
+            f"Saved {saved} quer{'y' if saved == 1 else 'ies'} over "
+            f"{len(rows)} page(s), {saved / len(rows):.1f} per request."
+        )
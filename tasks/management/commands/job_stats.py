@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the job queue's depth and, per runner, the throughput and "
+        "queue latency of the jobs finished recently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=float,
+            default=15,
+            help="How far back to look at finished jobs.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        depth = jobs.depth(now)
+        self.stdout.write(
+            f"{depth['due']} due ({depth['delayed']} delayed), {depth['running']} "
+            f"running; the oldest due job has waited {depth['oldest_wait_s']}s."
+        )
+        runners = jobs.stats(now - timedelta(minutes=options["minutes"]), now)
+        if not runners:
+            self.stdout.write(
+                f"No jobs finished in the last {options['minutes']:g} min."
+            )
+            return
+        width = max(len(worker) for worker in runners)
+        self.stdout.write(
+            f"{'runner':<{width}}    done  failed  per min  wait p50 ms  "
+            "wait p95 ms  run p95 ms"
+        )
+        for worker, row in runners.items():
+            self.stdout.write(
+                f"{worker:<{width}}  {row['done']:>6}  {row['failed']:>6}"
+                f"  {row['per_minute']:>7}  {row['wait_p50_ms']:>11}"
+                f"  {row['wait_p95_ms']:>11}  {row['run_p95_ms']:>10}"
+            )
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import loadtest
+from tasks.health import READY_PATH
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the site with a pool of logged-in synthetic workers and "
+        "report throughput, latency percentiles and error rates per URL name. "
+        "Starts a local gunicorn server unless --url is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", help="Test a running server instead of starting one."
+        )
+        parser.add_argument(
+            "--users", type=int, default=10, help="Synthetic workers to log in."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds to run for."
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=200,
+            metavar="TASKS",
+            help="Create tasks until at least this many exist.",
+        )
+        parser.add_argument(
+            "--password",
+            default="loadtest-password",
+            help="Password of the synthetic workers.",
+        )
+        parser.add_argument(
+            "--server-workers",
+            type=int,
+            default=2,
+            help="Gunicorn workers of the local server.",
+        )
+        parser.add_argument(
+            "--output",
+            default="loadtest.json",
+            help="Write the results here as JSON.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Compare against the results of an earlier run.",
+        )
+
+    def handle(self, *args, **options):
+        usernames = loadtest.seed(
+            options["seed"], options["users"], options["password"]
+        )
+        task_ids, task_type_ids = loadtest.targets()
+        if not task_type_ids:
+            raise CommandError("Task creates need at least one task type.")
+
+        server = None
+        url = options["url"]
+        if url is None:
+            server, url = self.start_server(options["server_workers"])
+        try:
+            summary = asyncio.run(
+                loadtest.run(
+                    url,
+                    usernames,
+                    options["password"],
+                    options["duration"],
+                    task_ids,
+                    task_type_ids,
+                )
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+        results = {
+            "commit": current_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "url": url,
+            "users": options["users"],
+            **summary,
+        }
+        Path(options["output"]).write_text(json.dumps(results, indent=2))
+        self.report(results)
+        if options["baseline"]:
+            self.compare(results, json.loads(Path(options["baseline"]).read_text()))
+        self.stdout.write(f"Results written to {options['output']}.")
+
+    def start_server(self, workers):
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "--config",
+                str(settings.BASE_DIR / "gunicorn.conf.py"),
+                "--bind",
+                f"127.0.0.1:{port}",
+                "--workers",
+                str(workers),
+            ],
+            cwd=settings.BASE_DIR,
+            # The access log would drown the report; errors still show.
+            stdout=subprocess.DEVNULL,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("The local server exited while starting.")
+            try:
+                with urllib.request.urlopen(url + READY_PATH, timeout=1):
+                    return server, url
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("The local server did not become ready within 60s.")
+
+    def report(self, results):
+        self.stdout.write(
+            f"{results['requests']} requests in {results['duration_s']}s: "
+            f"{results['throughput_rps']} req/s, "
+            f"{results['error_rate']:.2%} errors."
+        )
+        endpoints = results["endpoints"]
+        width = max((len(name) for name in endpoints), default=4)
+        self.stdout.write(
+            f"{'name':<{width}}  requests  errors    p50 ms    p95 ms    p99 ms"
+        )
+        for name, row in endpoints.items():
+            self.stdout.write(
+                f"{name:<{width}}  {row['requests']:>8}  {row['error_rate']:>6.1%}"
+                f"  {row['p50_ms']:>8.1f}  {row['p95_ms']:>8.1f}  {row['p99_ms']:>8.1f}"
+            )
+        for failure in results["failed_workers"]:
+            self.stderr.write(f"Synthetic worker failed: {failure}")
+
+    def compare(self, results, baseline):
+        self.stdout.write(
+            f"Against {baseline.get('commit') or 'the baseline'}: throughput "
+            f"{baseline['throughput_rps']} -> {results['throughput_rps']} req/s."
+        )
+        for name, row in results["endpoints"].items():
+            before = baseline["endpoints"].get(name)
+            if before:
+                change = row["p95_ms"] - before["p95_ms"]
+                self.stdout.write(
+                    f"  {name}: p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms"
+                    f" ({change:+.1f})"
+                )
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SETUP = "import django; django.setup()"
+
+WSGI = "from django.core.wsgi import get_wsgi_application; get_wsgi_application()"
+
+TIMED = "import time; start = time.perf_counter(); {code}; print(time.perf_counter() - start)"
+
+
+def run(code, importtime=False):
+    """Run ``code`` in a fresh interpreter; its stdout and stderr."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(f"Startup failed:\n{result.stderr}")
+    return result.stdout, result.stderr
+
+
+def imports(stderr):
+    """``(module, self microseconds)`` for each line of ``-X importtime`` output."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:") :].split("|")
+        yield name.strip(), int(own)
+
+
+def owner(module, packages):
+    """The installed app or project package ``module`` belongs to."""
+    for package in packages:
+        if module == package or module.startswith(package + "."):
+            return package
+    return module.partition(".")[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time django.setup() in fresh interpreters and break its import time "
+        "down by installed app and top-level package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--wsgi",
+            action="store_true",
+            help="Profile loading the WSGI application instead of django.setup().",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Time this many cold starts and report the fastest.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=15, help="Show this many packages."
+        )
+        parser.add_argument(
+            "--budget",
+            type=float,
+            metavar="MS",
+            help="Fail if the fastest start takes longer than this.",
+        )
+
+    def handle(self, *args, **options):
+        code = WSGI if options["wsgi"] else SETUP
+        best = min(
+            float(run(TIMED.format(code=code))[0]) * 1000
+            for _ in range(max(options["runs"], 1))
+        )
+
+        # Longest names first, so django.contrib.admin wins over django.
+        packages = sorted(
+            [*settings.INSTALLED_APPS, settings.SETTINGS_MODULE.partition(".")[0]],
+            key=len,
+            reverse=True,
+        )
+        totals = defaultdict(lambda: [0, 0])
+        for module, own in imports(run(code, importtime=True)[1]):
+            total = totals[owner(module, packages)]
+            total[0] += own
+            total[1] += 1
+        ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+
+        width = max((len(name) for name, _ in ranked[: options["limit"]]), default=7)
+        self.stdout.write(f"{'package':<{width}}  modules  self ms")
+        for name, (own, count) in ranked[: options["limit"]]:
+            self.stdout.write(f"{name:<{width}}  {count:>7}  {own / 1000:>7.1f}")
+        self.stdout.write(f"Startup took {best:.0f} ms (fastest of {options['runs']}).")
+
+        if options["budget"] is not None and best > options["budget"]:
+            raise CommandError(
+                f"Startup took {best:.0f} ms, over the {options['budget']:.0f} ms budget."
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks import dependencies
+
+
+class Command(BaseCommand):
+    help = "Recompute the task dependency closure table from the dependency edges."
+
+    def handle(self, *args, **options):
+        drifted = dependencies.rebuild()
+        self.stdout.write(f"Rebuilt dependency paths; {drifted} pair(s) had drifted.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the dashboard rollups from the task table. Run nightly to "
+        "correct drift, and once after deploying the rollup table."
+    )
+
+    def handle(self, *args, **options):
+        drifted = rollups.reconcile()
+        self.stdout.write(f"Reconciled task rollups; {drifted} key(s) had drifted.")
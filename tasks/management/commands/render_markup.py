@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks import markup
+from tasks.rerender import TARGETS, rerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the stored HTML of task descriptions and comments, archived "
+        "ones included, again. Run "
+        "after deploying a new Markdown renderer version; only rows rendered "
+        "under an older version are touched unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            choices=sorted(TARGETS),
+            action="append",
+            help="Render only these rows; may be repeated.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes to render on (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows read, rendered and written at a time.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render every row, not just those from older versions.",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["only"] or TARGETS:
+            started = time.monotonic()
+            stored = rerender(
+                TARGETS[name],
+                processes=options["processes"],
+                batch_size=options["batch_size"],
+                force=options["force"],
+            )
+            self.stdout.write(
+                f"Rendered {stored} {name.replace('-', ' ')} under version "
+                f"{markup.VERSION} "
+                f"in {time.monotonic() - started:.1f}s."
+            )
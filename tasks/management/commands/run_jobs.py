@@ -0,0 +1,68 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.jobs import Runner
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs. Start as many runners as needed; each "
+        "claims its own jobs. SIGTERM or Ctrl-C stops claiming and lets the "
+        "running jobs finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Jobs to run at a time.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs on threads (default) or, for CPU-bound jobs, processes.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds between polls of an empty queue.",
+        )
+        parser.add_argument(
+            "--report-every",
+            type=float,
+            default=60,
+            help="Seconds between throughput and latency reports.",
+        )
+        parser.add_argument(
+            "--until-idle",
+            action="store_true",
+            help="Exit once no job is due.",
+        )
+
+    def handle(self, *args, **options):
+        runner = Runner(
+            concurrency=options["concurrency"],
+            pool=options["pool"],
+            interval=options["interval"],
+        )
+        signal.signal(signal.SIGTERM, runner.stop)
+        self.stdout.write(
+            f"{runner.worker} running {runner.concurrency} job(s) at a time "
+            f"on a {runner.pool} pool."
+        )
+        while True:
+            try:
+                runner.run(
+                    until_idle=options["until_idle"],
+                    report=self.stdout.write,
+                    report_every=options["report_every"],
+                )
+                break
+            except KeyboardInterrupt:
+                # Finish what is running; a second Ctrl-C abandons it.
+                self.stdout.write("Stopping after the running jobs.")
+                runner.stop()
@@ -0,0 +1,70 @@
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import (
+    ReminderScheduler,
+    acquire_lease,
+    get_reminder_sender,
+    release_lease,
+)
+
+LEASE_NAME = "deadline-reminders"
+
+
+class Command(BaseCommand):
+    help = (
+        "Send deadline reminders. Run one process per replica; a database lease "
+        "makes sure only one of them dispatches at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Seconds between scheduler ticks.",
+        )
+        parser.add_argument(
+            "--lease-ttl",
+            type=float,
+            default=None,
+            help="Seconds a leader keeps the lease without renewing it "
+            "(default: three intervals).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single tick and exit.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        ttl = timedelta(seconds=options["lease_ttl"] or interval * 3)
+        holder = f"{socket.gethostname()}:{os.getpid()}"
+        sender = get_reminder_sender()
+        scheduler = None
+
+        try:
+            while True:
+                if acquire_lease(LEASE_NAME, holder, ttl):
+                    if scheduler is None:
+                        self.stdout.write(f"{holder} is now leading.")
+                        scheduler = ReminderScheduler(sender)
+                    sent = scheduler.run_once()
+                    if sent:
+                        self.stdout.write(f"Sent {sent} reminder(s).")
+                elif scheduler is not None:
+                    self.stdout.write(f"{holder} lost the lease.")
+                    scheduler = None
+                if options["once"]:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if scheduler is not None:
+                release_lease(LEASE_NAME, holder)
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks.webhook_stub import StubReceiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local webhook receiver that prints every batch it gets. Point a "
+        "webhook endpoint at the printed URL to try deliveries end to end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument(
+            "--status",
+            type=int,
+            default=200,
+            help="Status to answer with; use 500 to exercise retries.",
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=0,
+            help="Seconds to wait before answering, like a slow subscriber.",
+        )
+
+    def handle(self, *args, **options):
+        receiver = StubReceiver(
+            port=options["port"],
+            status=options["status"],
+            delay=options["delay"],
+            on_receive=self.show,
+        )
+        self.stdout.write(f"Listening on {receiver.url}")
+        try:
+            receiver.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            receiver.stop()
+
+    def show(self, received):
+        for delivery in received.json["deliveries"]:
+            self.stdout.write(
+                f"#{delivery['id']} {delivery['event']}: "
+                f"{json.dumps(delivery['data'], sort_keys=True)}"
+            )
@@ -0,0 +1,68 @@
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import acquire_lease, release_lease
+from tasks.webhooks import Deliverer
+
+LEASE_NAME = "webhooks"
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver webhook events from the outbox to their endpoints. Run one "
+        "process per replica; a database lease makes sure only one of them "
+        "delivers at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2,
+            help="Seconds between delivery cycles.",
+        )
+        parser.add_argument(
+            "--lease-ttl",
+            type=float,
+            default=60,
+            help="Seconds a leader keeps the lease without renewing it.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single delivery cycle and exit.",
+        )
+
+    def handle(self, *args, **options):
+        ttl = timedelta(seconds=options["lease_ttl"])
+        holder = f"{socket.gethostname()}:{os.getpid()}"
+        deliverer = None
+
+        try:
+            while True:
+                if acquire_lease(LEASE_NAME, holder, ttl):
+                    if deliverer is None:
+                        self.stdout.write(f"{holder} is now delivering.")
+                        deliverer = Deliverer()
+                    delivered, failed = deliverer.run_once()
+                    if delivered or failed:
+                        self.stdout.write(
+                            f"Delivered {delivered} event(s), {failed} to retry."
+                        )
+                elif deliverer is not None:
+                    self.stdout.write(f"{holder} lost the lease.")
+                    deliverer.close()
+                    deliverer = None
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if deliverer is not None:
+                deliverer.close()
+                release_lease(LEASE_NAME, holder)
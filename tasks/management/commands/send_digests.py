@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks import digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Email every worker a digest of their overdue, due-today and newly "
+        "assigned tasks. Split the workers into id ranges to run several "
+        "processes in parallel; an interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=int,
+            default=1,
+            metavar="WORKER_ID",
+            help="First worker id of the range (inclusive).",
+        )
+        parser.add_argument(
+            "--end",
+            type=int,
+            default=None,
+            metavar="WORKER_ID",
+            help="End of the range (exclusive); defaults to the last worker.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Workers per batch (default: DIGEST_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        if options["end"] is not None and options["end"] <= options["start"]:
+            raise CommandError("--end must be greater than --start.")
+        run = digests.send(
+            timezone.localdate(),
+            first_id=options["start"],
+            end_id=options["end"],
+            batch_size=options["batch_size"],
+        )
+        if run is None:
+            raise CommandError("Another process is sending digests for this range.")
+        self.stdout.write(
+            f"{run}: {run.sent} digest(s) sent"
+            f"{'' if run.finished_at else ', unfinished'}."
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from tasks import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Record today's task counts per status, priority, task type and "
+        "assignee, and rebuild any missing earlier days from the activity log. "
+        "Run once a day, shortly before midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backfill-days",
+            type=int,
+            default=365,
+            help="How many days before today to check for missing snapshots.",
+        )
+
+    def handle(self, *args, **options):
+        rows = snapshots.take()
+        self.stdout.write(f"Recorded today's snapshot ({rows} row(s)).")
+        days = snapshots.backfill(options["backfill_days"])
+        if days:
+            self.stdout.write(
+                f"Backfilled {len(days)} day(s) from {days[0]} to {days[-1]}."
+            )
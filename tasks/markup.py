@@ -0,0 +1,209 @@
+"""Markdown for task descriptions and comments, rendered once and stored.
+
+Text is rendered with Python-Markdown and sanitized with nh3, which drops
+any tag, attribute or URL scheme not on the lists below, so raw HTML in
+the source cannot script the page. Pages never render Markdown: the HTML
+is stored next to its source (``Task.description_html`` and
+``Comment.content_html``) together with a key made of ``VERSION`` and a
+hash of the source, and is rendered again on save only when the key no
+longer matches.
+
+Mentions are linked after conversion: their spans are swapped for
+placeholders that Markdown passes through untouched, and a tree processor
+turns the placeholders into links, except inside code and other links,
+where they become the mention's text again.
+
+Changing how text renders (extensions, allowed tags) means bumping
+``VERSION``; ``manage.py render_markup`` then re-renders the stored HTML
+across a pool of processes. This module does not touch the database, so
+the pool's processes only import it.
+"""
+
+import hashlib
+import re
+import threading
+from html import escape
+from xml.etree import ElementTree
+
+import markdown
+import nh3
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AtomicString
+
+VERSION = 2
+
+EXTENSIONS = ["fenced_code", "tables", "sane_lists", "nl2br"]
+
+TAGS = {
+    "a",
+    "blockquote",
+    "br",
+    "code",
+    "del",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "strong",
+    "table",
+    "tbody",
+    "td",
+    "th",
+    "thead",
+    "tr",
+    "ul",
+}
+
+ATTRIBUTES = {"a": {"href", "title"}}
+
+# Fenced code blocks and inline code spans, as far as mentions are concerned.
+CODE_RE = re.compile(
+    r"^(?P<fence>`{3,}|~{3,}).*?^(?P=fence)[ ]*$"
+    r"|(?<!\\)(?P<ticks>`+).+?(?<!`)(?P=ticks)(?!`)",
+    re.MULTILINE | re.DOTALL,
+)
+
+# Private use characters, which Markdown leaves alone.
+OPEN, CLOSE = "\ue000", "\ue001"
+PLACEHOLDER_RE = re.compile(f"{OPEN}(\\d+){CLOSE}")
+
+# Mentions in these stay text.
+UNLINKED_TAGS = {"a", "code", "pre"}
+
+_local = threading.local()
+
+_cleaner = nh3.Cleaner(
+    tags=TAGS,
+    attributes=ATTRIBUTES,
+    link_rel="noopener noreferrer nofollow",
+    url_schemes={"http", "https", "mailto"},
+    allowed_classes={"a": {"mention"}},
+)
+
+
+def key(text):
+    """What the HTML stored for ``text`` must have been rendered under."""
+    return f"{VERSION}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+
+def is_stale(stored_key, text):
+    return stored_key != key(text)
+
+
+def code_spans(text):
+    """``[(start, end)]`` of the code in ``text``, where nobody is mentioned."""
+    return [match.span() for match in CODE_RE.finditer(text)]
+
+
+class MentionLinker(Treeprocessor):
+    """Replace mention placeholders with links once the tree is built."""
+
+    def __init__(self, md):
+        super().__init__(md)
+        self.mentions = []
+
+    def run(self, root):
+        if self.mentions:
+            self.link(root)
+
+    def link(self, element):
+        if element.tag in UNLINKED_TAGS:
+            self.unlink(element)
+            return
+        if element.text:
+            element.text, anchors = self.split(element.text)
+            for position, anchor in enumerate(anchors):
+                element.insert(position, anchor)
+        for child in list(element):
+            self.link(child)
+            if child.tail:
+                child.tail, anchors = self.split(child.tail)
+                position = list(element).index(child) + 1
+                for offset, anchor in enumerate(anchors):
+                    element.insert(position + offset, anchor)
+
+    def split(self, text):
+        """``text`` up to the first placeholder, and a link for each one."""
+        head, *rest = PLACEHOLDER_RE.split(text)
+        anchors = []
+        for number, tail in zip(rest[::2], rest[1::2]):
+            name, url = self.mentions[int(number)]
+            anchor = ElementTree.Element("a", {"href": url, "class": "mention"})
+            anchor.text = AtomicString(name)
+            anchor.tail = tail
+            anchors.append(anchor)
+        return head, anchors
+
+    def unlink(self, element):
+        for node in element.iter():
+            if node.text:
+                node.text = type(node.text)(self.restore(node.text))
+            if node.tail and node is not element:
+                node.tail = type(node.tail)(self.restore(node.tail))
+
+    def restore(self, text):
+        return PLACEHOLDER_RE.sub(lambda match: self.mentions[int(match[1])][0], text)
+
+
+class MentionExtension(Extension):
+    def extendMarkdown(self, md):
+        # After inline patterns (20) have built the tree.
+        md.treeprocessors.register(MentionLinker(md), "mentions", 15)
+
+
+def converter():
+    # Markdown instances keep state between conversions and are not
+    # thread-safe, so each thread reuses its own.
+    if not hasattr(_local, "markdown"):
+        _local.markdown = markdown.Markdown(
+            extensions=[*EXTENSIONS, MentionExtension()]
+        )
+    return _local.markdown
+
+
+def unmark(text):
+    return text.replace(OPEN, "").replace(CLOSE, "")
+
+
+def render(text, links=()):
+    """Sanitized HTML of the Markdown ``text``.
+
+    ``links`` are ``(start, end, url)`` spans of ``text``, in order, to link
+    as mentions; see ``tasks.mentions``.
+    """
+    mentions = []
+    parts = []
+    last = 0
+    for start, end, url in links:
+        parts.append(unmark(text[last:start]))
+        parts.append(f"{OPEN}{len(mentions)}{CLOSE}")
+        mentions.append((text[start:end], url))
+        last = end
+    parts.append(unmark(text[last:]))
+    md = converter()
+    linker = md.treeprocessors["mentions"]
+    linker.mentions = mentions
+    try:
+        html = md.convert("".join(parts))
+    finally:
+        linker.mentions = []
+        md.reset()
+    # Placeholders Markdown kept out of the tree, as in fenced code blocks.
+    html = PLACEHOLDER_RE.sub(
+        lambda match: escape(mentions[int(match[1])][0], quote=False), html
+    )
+    return _cleaner.clean(html)
+
+
+def render_rows(rows):
+    """``[(pk, html, key)]`` for ``(pk, text, links)`` rows; a pool task."""
+    return [(pk, render(text, links), key(text)) for pk, text, links in rows]
@@ -0,0 +1,188 @@
+"""@mentions of workers in comments.
+
+Each process keeps a trie of the active workers' usernames, built from one
+query and then kept in step by the worker signals once changes commit, so
+the mentions in a comment are resolved in a single pass over its text
+however many workers there are: at each ``@`` that starts a word the trie
+is walked for the longest username that ends at a word boundary. Code
+spans and fenced code blocks mention nobody. Other
+processes add and rename workers too, so the trie is also rebuilt every
+``MENTION_INDEX_REBUILD_SECONDS``.
+
+Saving a comment renders it (see ``tasks.markup``) with the mentions linked
+to the workers' profiles, so pages show it without parsing it again.
+Workers it newly mentions get a ``Mention`` and a ``Notification``, each
+kind written with one bulk insert.
+"""
+
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from tasks import markup
+from tasks.models import Mention, Notification, NotificationKind, Worker
+
+# Key of a trie node's worker id; every other key is a single character.
+END = ""
+
+
+def is_word(char):
+    return char.isalnum() or char == "_"
+
+
+class MentionIndex:
+    """Per-process trie of active usernames, mapping each to its worker id."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._root = {}
+        self._usernames = {}
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_built(self):
+        if (
+            self._built_at is None
+            or time.monotonic() - self._built_at
+            > settings.MENTION_INDEX_REBUILD_SECONDS
+        ):
+            self._build()
+
+    def _build(self):
+        self._root = {}
+        self._usernames = {}
+        active = Worker.objects.filter(is_active=True).values_list("pk", "username")
+        for pk, username in active.iterator():
+            self._insert(pk, username)
+        self._built_at = time.monotonic()
+
+    def _insert(self, pk, username):
+        node = self._root
+        for char in username:
+            node = node.setdefault(char, {})
+        node[END] = pk
+        self._usernames[pk] = username
+
+    def _discard(self, pk):
+        username = self._usernames.pop(pk, None)
+        if username is None:
+            return
+        path = [self._root]
+        for char in username:
+            path.append(path[-1][char])
+        del path[-1][END]
+        # Drop the nodes no other username runs through.
+        for depth in range(len(username), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][username[depth - 1]]
+
+    def update(self, pk, username, is_active=True):
+        """Point ``username`` at worker ``pk``, or forget the worker."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._discard(pk)
+            if is_active and username:
+                self._insert(pk, username)
+
+    def update_on_commit(self, pk, username, is_active=True):
+        if self.is_built:
+            transaction.on_commit(partial(self.update, pk, username, is_active))
+
+    def find(self, text):
+        """``[(start, end, worker id)]`` of the mentions in ``text``, in order."""
+        found = []
+        if "@" not in text:
+            return found
+        code = iter(markup.code_spans(text))
+        code_start, code_end = next(code, (len(text), len(text)))
+        with self._lock:
+            self._ensure_built()
+            root = self._root
+            length = len(text)
+            start = text.find("@")
+            while start >= 0:
+                while start >= code_end:
+                    code_start, code_end = next(code, (length, length))
+                if start >= code_start:
+                    start = text.find("@", code_end)
+                    continue
+                match = None
+                # An @ inside a word, as in an email address, mentions nobody.
+                if not start or not is_word(text[start - 1]):
+                    node, end = root, start + 1
+                    while end < length:
+                        node = node.get(text[end])
+                        if node is None:
+                            break
+                        end += 1
+                        if END in node and (end == length or not is_word(text[end])):
+                            match = (end, node[END])
+                if match is None:
+                    start = text.find("@", start + 1)
+                else:
+                    found.append((start, *match))
+                    start = text.find("@", match[0])
+        return found
+
+
+index = MentionIndex()
+
+
+def links(found):
+    """``(start, end, profile url)`` of mentions ``find`` returned."""
+    return [
+        (start, end, reverse("worker-detail", kwargs={"pk": worker_id}))
+        for start, end, worker_id in found
+    ]
+
+
+def prepare(comment):
+    """Render ``comment.content_html`` and note who the comment mentions."""
+    found = index.find(comment.content)
+    comment.content_html = markup.render(comment.content, links(found))
+    comment.content_html_key = markup.key(comment.content)
+    comment._mentioned = {worker_id for _, _, worker_id in found}
+
+
+def record(comment, created):
+    """Save the mentions ``prepare`` found and notify the newly mentioned."""
+    mentioned = getattr(comment, "_mentioned", None)
+    if mentioned is None:
+        return
+    del comment._mentioned
+    mentioned.discard(comment.author_id)
+    existing = set()
+    if not created:
+        existing = set(comment.mentions.values_list("worker_id", flat=True))
+        if existing - mentioned:
+            comment.mentions.filter(worker_id__in=existing - mentioned).delete()
+    new = sorted(mentioned - existing)
+    if not new:
+        return
+    Mention.objects.bulk_create(
+        [Mention(comment=comment, worker_id=worker_id) for worker_id in new],
+        ignore_conflicts=True,
+    )
+    Notification.objects.bulk_create(
+        Notification(
+            recipient_id=worker_id,
+            actor_id=comment.author_id,
+            kind=NotificationKind.MENTION,
+            task_id=comment.task_id,
+            comment=comment,
+        )
+        for worker_id in new
+    )
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.http import HttpResponse
+
+from tasks import activity, health, routers
+
+
+class HealthCheckMiddleware:
+    """Answers load balancer probes before host validation, HTTPS redirects
+    and sessions, which would turn them into 400s and 301s."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == health.HEALTH_PATH:
+            return HttpResponse("ok", content_type="text/plain")
+        if request.path == health.READY_PATH:
+            if health.readiness.is_ready():
+                return HttpResponse("ready", content_type="text/plain")
+            health.readiness.start()
+            return HttpResponse("warming up", content_type="text/plain", status=503)
+        return self.get_response(request)
+
+
+class ActivityLogMiddleware:
+    """Attributes activity entries to the requesting worker and writes them
+    in one batch once the response is ready."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with activity.recording(actor=getattr(request, "user", None)):
+            return self.get_response(request)
+
+
+class ReplicaStickinessMiddleware:
+    """Keeps a client on the primary database for a while after it writes,
+    so replica lag never hides its own change."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                routers.STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_position_description"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="worker",
+            options={"ordering": ["username"]},
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="worker_comments",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["task", "created_at"], name="comment_task_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_comment_task_created_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("upcoming", "Upcoming"), ("overdue", "Overdue")],
+                        max_length=10,
+                    ),
+                ),
+                ("deadline", models.DateTimeField()),
+                ("sent_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Deadline Reminder",
+                "verbose_name_plural": "Deadline Reminders",
+            },
+        ),
+        migrations.CreateModel(
+            name="SchedulerLease",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("holder", models.CharField(max_length=255)),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["deadline"], name="task_deadline_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["updated_at"], name="task_updated_at_idx"),
+        ),
+        migrations.AddField(
+            model_name="deadlinereminder",
+            name="task",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deadline_reminders",
+                to="tasks.task",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="deadlinereminder",
+            constraint=models.UniqueConstraint(
+                fields=("task", "kind", "deadline"), name="unique_deadline_reminder"
+            ),
+        ),
+    ]
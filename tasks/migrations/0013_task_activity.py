@@ -0,0 +1,82 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0012_deadline_reminders"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_name", models.CharField(max_length=155)),
+                (
+                    "verb",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                            ("assigned", "Assigned"),
+                            ("unassigned", "Unassigned"),
+                            ("commented", "Commented"),
+                            ("comment_edited", "Edited a comment"),
+                            ("comment_deleted", "Deleted a comment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("changes", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="activities",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="activities",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task Activity",
+                "verbose_name_plural": "Task Activities",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["task", "created_at"], name="activity_task_created_idx"
+                    ),
+                    models.Index(
+                        fields=["actor", "created_at"],
+                        name="activity_actor_created_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
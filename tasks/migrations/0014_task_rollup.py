@@ -0,0 +1,55 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0013_task_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dimension", models.CharField(max_length=20)),
+                ("value", models.CharField(max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("in_progress", "In Progress"),
+                            ("paused", "Paused"),
+                            ("canceled", "Canceled"),
+                            ("completed", "Completed"),
+                            ("reviewing", "Reviewing"),
+                            ("blocked", "Blocked"),
+                        ],
+                        max_length=25,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Task Rollup",
+                "verbose_name_plural": "Task Rollups",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="taskrollup",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "value", "status"), name="unique_task_rollup"
+            ),
+        ),
+    ]
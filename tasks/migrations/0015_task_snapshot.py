@@ -0,0 +1,58 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0014_task_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("dimension", models.CharField(max_length=20)),
+                ("value", models.CharField(max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("in_progress", "In Progress"),
+                            ("paused", "Paused"),
+                            ("canceled", "Canceled"),
+                            ("completed", "Completed"),
+                            ("reviewing", "Reviewing"),
+                            ("blocked", "Blocked"),
+                        ],
+                        max_length=25,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField()),
+            ],
+            options={
+                "verbose_name": "Task Snapshot",
+                "verbose_name_plural": "Task Snapshots",
+                "indexes": [models.Index(fields=["date"], name="snapshot_date_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="tasksnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "date", "value", "status"),
+                name="unique_task_snapshot",
+            ),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0015_task_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=155)),
+                ("description", models.TextField()),
+                ("deadline", models.DateTimeField(blank=True, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("in_progress", "In Progress"),
+                            ("paused", "Paused"),
+                            ("canceled", "Canceled"),
+                            ("completed", "Completed"),
+                            ("reviewing", "Reviewing"),
+                            ("blocked", "Blocked"),
+                        ],
+                        max_length=25,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+                (
+                    "assignee",
+                    models.ManyToManyField(
+                        related_name="archived_tasks", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+                (
+                    "task_type",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_tasks",
+                        to="tasks.tasktype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Task",
+                "verbose_name_plural": "Archived Tasks",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("content", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_comments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="tasks.archivedtask",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Comment",
+                "verbose_name_plural": "Archived Comments",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = ("username", "first_name", "last_name")
+
+
+def index_name(column):
+    return f"worker_{column}_upper_like_idx"
+
+
+def create_indexes(apps, schema_editor):
+    # Prefix searches (``^field`` in search_fields) compile to
+    # UPPER(column::text) LIKE UPPER('term%') on PostgreSQL; these indexes
+    # serve them. Other databases fall back to a scan.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("tasks", "Worker")._meta.db_table
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{index_name(column)}" '
+            f'ON "{table}" (UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{index_name(column)}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0017_changelist_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0018_worker_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDependency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "depends_on",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependents",
+                        to="tasks.task",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependencies",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task Dependency",
+                "verbose_name_plural": "Task Dependencies",
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskDependencyPath",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("paths", models.PositiveIntegerField(default=1)),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_paths",
+                        to="tasks.task",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_paths",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task Dependency Path",
+                "verbose_name_plural": "Task Dependency Paths",
+                "indexes": [
+                    models.Index(
+                        fields=["descendant", "ancestor"],
+                        name="dependency_path_desc_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="taskdependencypath",
+            constraint=models.UniqueConstraint(
+                fields=("ancestor", "descendant"), name="unique_dependency_path"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskdependency",
+            constraint=models.UniqueConstraint(
+                fields=("task", "depends_on"), name="unique_task_dependency"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskdependency",
+            constraint=models.CheckConstraint(
+                check=models.Q(("task", models.F("depends_on")), _negated=True),
+                name="task_dependency_not_self",
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:52
+
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat, LPad
+import django.db.models.deletion
+
+
+def make_existing_tasks_roots(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.update(
+        path=Concat(
+            LPad(Cast("id", CharField()), 10, Value("0")),
+            Value("/"),
+            output_field=CharField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0019_task_dependency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="children",
+                to="tasks.task",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="path",
+            field=models.CharField(default="", editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="subtask_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="subtasks_done",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["path"], name="task_path_idx", opclasses=["varchar_pattern_ops"]
+            ),
+        ),
+        migrations.RunPython(make_existing_tasks_roots, migrations.RunPython.noop),
+    ]
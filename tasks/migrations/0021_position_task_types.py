@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0020_task_hierarchy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="position",
+            name="task_types",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Task types that can be assigned automatically to this position.",
+                related_name="positions",
+                to="tasks.tasktype",
+            ),
+        ),
+    ]
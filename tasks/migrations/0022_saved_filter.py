@@ -0,0 +1,62 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0021_position_task_types"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedFilter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("params", models.JSONField(blank=True, default=dict)),
+                ("task_ids", models.JSONField(default=list, editable=False)),
+                ("match_count", models.PositiveIntegerField(default=0, editable=False)),
+                (
+                    "refreshed_on",
+                    models.DateField(blank=True, editable=False, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_filters",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "position",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Share the filter with everyone in this position.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_filters",
+                        to="tasks.position",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Saved Filter",
+                "verbose_name_plural": "Saved Filters",
+                "ordering": ["name"],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0022_saved_filter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DigestRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("first_worker_id", models.PositiveBigIntegerField()),
+                (
+                    "last_worker_id",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "end_worker_id",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                ("since", models.DateTimeField()),
+                ("cutoff", models.DateTimeField()),
+                ("sent", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Digest Run",
+                "verbose_name_plural": "Digest Runs",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="digestrun",
+            constraint=models.UniqueConstraint(
+                fields=("day", "first_worker_id", "end_worker_id"),
+                name="digest_run_range_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0023_digest_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookEndpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=500)),
+                (
+                    "events",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text='Event names to deliver, e.g. ["task.created"]; empty for all.',
+                    ),
+                ),
+                (
+                    "secret",
+                    models.CharField(
+                        blank=True,
+                        help_text="Signs every request body with HMAC-SHA256 when set.",
+                        max_length=128,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Webhook Endpoint",
+                "verbose_name_plural": "Webhook Endpoints",
+                "ordering": ["url"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WebhookOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("task.created", "Task created"),
+                            ("task.updated", "Task updated"),
+                            ("task.completed", "Task completed"),
+                            ("comment.created", "Comment created"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("payload", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("dispatched", models.BooleanField(default=False)),
+            ],
+            options={
+                "verbose_name": "Webhook Outbox Entry",
+                "verbose_name_plural": "Webhook Outbox",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("dispatched", False)),
+                        fields=["id"],
+                        name="webhook_outbox_pending_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="WebhookDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("delivered", "Delivered"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "last_status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "last_duration_ms",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("delivered_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "endpoint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="tasks.webhookendpoint",
+                    ),
+                ),
+                (
+                    "outbox",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="tasks.webhookoutbox",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Webhook Delivery",
+                "verbose_name_plural": "Webhook Deliveries",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["endpoint", "next_attempt_at", "id"],
+                        name="webhook_delivery_due_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0026_mentions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="content_html_key",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=80
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="description_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="description_html_key",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=80
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="content_html_key",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=80
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="description_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="description_html_key",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=80
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0027_markup_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtask",
+            name="parent_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="ArchivedTaskDependency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("depends_on_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Archived Task Dependency",
+                "verbose_name_plural": "Archived Task Dependencies",
+                "indexes": [
+                    models.Index(
+                        fields=["depends_on_id"], name="archived_dependency_on_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="archivedtaskdependency",
+            constraint=models.UniqueConstraint(
+                fields=("task_id", "depends_on_id"),
+                name="unique_archived_task_dependency",
+            ),
+        ),
+    ]
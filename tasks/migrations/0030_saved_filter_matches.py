@@ -0,0 +1,68 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def recompute_matches_on_next_use(apps, schema_editor):
+    SavedFilter = apps.get_model("tasks", "SavedFilter")
+    SavedFilter.objects.update(refreshed_on=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0029_archive_mentions_notifications_reminders"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="savedfilter",
+            name="match_count",
+        ),
+        migrations.RemoveField(
+            model_name="savedfilter",
+            name="task_ids",
+        ),
+        migrations.CreateModel(
+            name="SavedFilterMatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "saved_filter",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="matches",
+                        to="tasks.savedfilter",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_filter_matches",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Saved Filter Match",
+                "verbose_name_plural": "Saved Filter Matches",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="savedfiltermatch",
+            constraint=models.UniqueConstraint(
+                fields=("saved_filter", "task"), name="unique_saved_filter_match"
+            ),
+        ),
+        migrations.RunPython(recompute_matches_on_next_use, migrations.RunPython.noop),
+    ]
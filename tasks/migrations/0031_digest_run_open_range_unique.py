@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+def drop_duplicate_open_ranges(apps, schema_editor):
+    # Keep the run that got furthest for each day and open-ended range.
+    DigestRun = apps.get_model("tasks", "DigestRun")
+    kept = set()
+    for run in DigestRun.objects.filter(end_worker_id__isnull=True).order_by(
+        "day",
+        "first_worker_id",
+        models.F("finished_at").desc(nulls_last=True),
+        models.F("last_worker_id").desc(nulls_last=True),
+        "pk",
+    ):
+        if (run.day, run.first_worker_id) in kept:
+            run.delete()
+        else:
+            kept.add((run.day, run.first_worker_id))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0030_saved_filter_matches"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_open_ranges, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="digestrun",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("end_worker_id__isnull", True)),
+                fields=("day", "first_worker_id"),
+                name="digest_run_open_range_unique",
+            ),
+        ),
+    ]
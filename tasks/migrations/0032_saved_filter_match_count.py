@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:21
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_stored_matches(apps, schema_editor):
+    SavedFilter = apps.get_model("tasks", "SavedFilter")
+    for saved in SavedFilter.objects.annotate(n=Count("matches")).filter(n__gt=0):
+        SavedFilter.objects.filter(pk=saved.pk).update(match_count=saved.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0031_digest_run_open_range_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedfilter",
+            name="match_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_stored_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0032_saved_filter_match_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskactivity",
+            index=models.Index(
+                condition=models.Q(("verb", "assigned")),
+                fields=["created_at"],
+                name="activity_assigned_created_idx",
+            ),
+        ),
+    ]
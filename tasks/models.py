@@ -4,6 +4,37 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.urls import reverse
 
+from tasks.lookups import CachedForeignKey
+
+
+class TrackedFieldsMixin:
+    """Remembers the column values an instance was loaded or last saved with."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def get_changes(self, field_names):
+        """Return ``{attname: (old, new)}`` for loaded fields that changed."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return {}
+        return {
+            name: (loaded[name], getattr(self, name))
+            for name in field_names
+            if name in loaded and loaded[name] != getattr(self, name)
+        }
+
 
 class TaskType(models.Model):
     name = models.CharField(max_length=155)
@@ -38,9 +69,20 @@ class Status(models.TextChoices):
     BLOCKED = "blocked", "Blocked"
 
 
-class Task(models.Model):
+CLOSED_STATUSES = (Status.COMPLETED, Status.CANCELED)
+
+
+class Task(TrackedFieldsMixin, models.Model):
+    is_archived = False
+
     name = models.CharField(max_length=155)
     description = models.TextField()
+    # ``description`` rendered by ``tasks.markup``, and the key it was
+    # rendered under.
+    description_html = models.TextField(blank=True, default="", editable=False)
+    description_html_key = models.CharField(
+        max_length=80, blank=True, default="", editable=False
+    )
     deadline = models.DateTimeField(null=True, blank=True, default=None)
     status = models.CharField(
         max_length=25, choices=Status.choices, default=Status.PENDING
@@ -48,16 +90,39 @@ class Task(models.Model):
     priority = models.CharField(
         max_length=10, choices=Priority.choices, default=Priority.LOW
     )
-    task_type = models.ForeignKey(TaskType, on_delete=models.SET_NULL, null=True)
+    task_type = CachedForeignKey(TaskType, on_delete=models.SET_NULL, null=True)
     assignee = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name="assigned_tasks"
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="children",
+    )
+    # Maintained by tasks.hierarchy with set-based updates; never written by
+    # save() on an existing task, so a stale instance cannot overwrite them.
+    path = models.CharField(max_length=255, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    subtask_count = models.PositiveIntegerField(default=0, editable=False)
+    subtasks_done = models.PositiveIntegerField(default=0, editable=False)
+
+    MAINTAINED_FIELDS = ("path", "depth", "subtask_count", "subtasks_done")
 
     class Meta:
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            models.Index(fields=["deadline"], name="task_deadline_idx"),
+            models.Index(fields=["updated_at"], name="task_updated_at_idx"),
+            models.Index(fields=["created_at", "id"], name="task_created_at_idx"),
+            models.Index(
+                fields=["path"], name="task_path_idx", opclasses=["varchar_pattern_ops"]
+            ),
+        ]
 
     def __str__(self):
         if self.deadline:
@@ -68,6 +133,25 @@ class Task(models.Model):
     def get_absolute_url(self):
         return reverse("task-detail", kwargs={"pk": self.pk})
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.MAINTAINED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def progress(self):
+        """Percentage of subtasks, at any depth, that are closed."""
+        if not self.subtask_count:
+            return None
+        return round(100 * self.subtasks_done / self.subtask_count)
+
     @property
     def time_left(self):
         if not self.deadline:
@@ -96,6 +180,12 @@ class Task(models.Model):
 class Position(models.Model):
     name = models.CharField(max_length=155)
     description = models.TextField(null=True, blank=True)
+    task_types = models.ManyToManyField(
+        TaskType,
+        blank=True,
+        related_name="positions",
+        help_text="Task types that can be assigned automatically to this position.",
+    )
 
     class Meta:
         verbose_name = "Position"
@@ -110,7 +200,7 @@ class Position(models.Model):
 
 
 class Worker(AbstractUser):
-    position = models.ForeignKey(Position, on_delete=models.SET_NULL, null=True)
+    position = CachedForeignKey(Position, on_delete=models.SET_NULL, null=True)
 
     class Meta:
         ordering = ["username"]
@@ -127,7 +217,7 @@ class Worker(AbstractUser):
         return reverse("worker-detail", kwargs={"pk": self.pk})
 
 
-class Comment(models.Model):
+class Comment(TrackedFieldsMixin, models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -135,6 +225,12 @@ class Comment(models.Model):
         related_name="worker_comments",
     )
     content = models.TextField()
+    # ``content`` rendered by ``tasks.markup`` with @mentions linked (see
+    # ``tasks.mentions``), and the key it was rendered under.
+    content_html = models.TextField(blank=True, default="", editable=False)
+    content_html_key = models.CharField(
+        max_length=80, blank=True, default="", editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -142,6 +238,742 @@ class Comment(models.Model):
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["task", "created_at"], name="comment_task_created_idx"
+            ),
+            models.Index(fields=["created_at", "id"], name="comment_created_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.author.username} on {self.task.name}"
+
+
+class ReminderKind(models.TextChoices):
+    UPCOMING = "upcoming", "Upcoming"
+    OVERDUE = "overdue", "Overdue"
+
+
+class DeadlineReminder(models.Model):
+    """Record of a dispatched reminder; its uniqueness makes dispatch idempotent."""
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="deadline_reminders"
+    )
+    kind = models.CharField(max_length=10, choices=ReminderKind.choices)
+    deadline = models.DateTimeField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Deadline Reminder"
+        verbose_name_plural = "Deadline Reminders"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "kind", "deadline"], name="unique_deadline_reminder"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for task {self.task_id}"
+
+
+class SchedulerLease(models.Model):
+    """Time-limited leadership lease shared by scheduler replicas."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    holder = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder}"
+
+
+class ActivityVerb(models.TextChoices):
+    CREATED = "created", "Created"
+    UPDATED = "updated", "Updated"
+    DELETED = "deleted", "Deleted"
+    ASSIGNED = "assigned", "Assigned"
+    UNASSIGNED = "unassigned", "Unassigned"
+    COMMENTED = "commented", "Commented"
+    COMMENT_EDITED = "comment_edited", "Edited a comment"
+    COMMENT_DELETED = "comment_deleted", "Deleted a comment"
+
+
+class TaskActivity(models.Model):
+    """Append-only audit entry describing one change to a task.
+
+    Entries outlive their task, so the task link carries no database
+    constraint and the task name is copied at write time.
+    """
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="activities",
+    )
+    task_name = models.CharField(max_length=155)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="activities",
+    )
+    verb = models.CharField(max_length=20, choices=ActivityVerb.choices)
+    changes = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=now)
+
+    class Meta:
+        verbose_name = "Task Activity"
+        verbose_name_plural = "Task Activities"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["task", "created_at"], name="activity_task_created_idx"
+            ),
+            models.Index(
+                fields=["actor", "created_at"], name="activity_actor_created_idx"
+            ),
+            # Assignments by time, for the daily digests.
+            models.Index(
+                fields=["created_at"],
+                name="activity_assigned_created_idx",
+                condition=models.Q(verb=ActivityVerb.ASSIGNED),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()} task {self.task_name}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Task activity entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Task activity entries are append-only.")
+
+    @property
+    def change_lines(self):
+        lines = []
+        for field, value in self.changes.items():
+            if isinstance(value, list) and len(value) == 2 and field != "assignee":
+                lines.append(f"{field}: {value[0] or '—'} → {value[1] or '—'}")
+            elif isinstance(value, list):
+                lines.append(f"{field}: {', '.join(map(str, value))}")
+            else:
+                lines.append(f"{field}: {value}")
+        return lines
+
+
+class TaskRollup(models.Model):
+    """Running count of tasks sharing one value of a dashboard dimension.
+
+    Rows are kept current by deltas from task signals; ``manage.py
+    reconcile_rollups`` rebuilds them from scratch.
+    """
+
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=64)
+    status = models.CharField(max_length=25, choices=Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Task Rollup"
+        verbose_name_plural = "Task Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "value", "status"], name="unique_task_rollup"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.value} [{self.status}]: {self.count}"
+
+
+class TaskSnapshot(models.Model):
+    """Number of tasks sharing one dimension value and status at the end of a day.
+
+    Written by ``manage.py snapshot_tasks``. The unique constraint leads with
+    the dimension and date so a chart reads its range straight off the index.
+    """
+
+    date = models.DateField()
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=64)
+    status = models.CharField(max_length=25, choices=Status.choices)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "Task Snapshot"
+        verbose_name_plural = "Task Snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "date", "value", "status"],
+                name="unique_task_snapshot",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="snapshot_date_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.date} {self.dimension}={self.value} [{self.status}]: {self.count}"
+        )
+
+
+class ArchivedTask(models.Model):
+    """A task closed long ago, moved out of the task table by ``archive_tasks``.
+
+    Columns mirror ``Task`` and keep the original primary key, so a task can
+    be restored as it was and its activity log still points at it.
+    """
+
+    is_archived = True
+
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=155)
+    description = models.TextField()
+    description_html = models.TextField(blank=True, default="", editable=False)
+    description_html_key = models.CharField(
+        max_length=80, blank=True, default="", editable=False
+    )
+    deadline = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=25, choices=Status.choices)
+    priority = models.CharField(max_length=10, choices=Priority.choices)
+    task_type = CachedForeignKey(
+        TaskType,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_tasks",
+    )
+    assignee = models.ManyToManyField(
+        settings.AUTH_USER_MODEL, related_name="archived_tasks"
+    )
+    # Not a foreign key: the parent may be live, archived too, or deleted.
+    parent_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Task"
+        verbose_name_plural = "Archived Tasks"
+
+    __str__ = Task.__str__
+    time_left = Task.time_left
+
+    def get_absolute_url(self):
+        return reverse("archived-task-detail", kwargs={"pk": self.pk})
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="comments"
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_comments",
+    )
+    content = models.TextField()
+    content_html = models.TextField(blank=True, default="", editable=False)
+    content_html_key = models.CharField(
+        max_length=80, blank=True, default="", editable=False
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Comment"
+        verbose_name_plural = "Archived Comments"
+        ordering = ["-created_at"]
 
     def __str__(self):
         return f"Comment by {self.author.username} on {self.task.name}"
+
+
+class ArchivedTaskDependency(models.Model):
+    """A ``TaskDependency`` with at least one end in the archive.
+
+    Plain ids rather than foreign keys, since either end may be live or
+    archived; the edge goes back into ``TaskDependency`` once both are live.
+    """
+
+    task_id = models.BigIntegerField()
+    depends_on_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Task Dependency"
+        verbose_name_plural = "Archived Task Dependencies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task_id", "depends_on_id"],
+                name="unique_archived_task_dependency",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["depends_on_id"], name="archived_dependency_on_idx"),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} depends on task {self.depends_on_id}"
+
+
+class TaskDependency(models.Model):
+    """``task`` cannot be finished before ``depends_on``."""
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="dependencies"
+    )
+    depends_on = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="dependents"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Task Dependency"
+        verbose_name_plural = "Task Dependencies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "depends_on"], name="unique_task_dependency"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(task=models.F("depends_on")),
+                name="task_dependency_not_self",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} depends on task {self.depends_on_id}"
+
+
+class TaskDependencyPath(models.Model):
+    """Closure of ``TaskDependency``: ``ancestor`` blocks ``descendant``.
+
+    One row per connected pair, however long the chain. ``paths`` counts
+    the direct blockers of ``descendant`` that are, or are blocked by,
+    ``ancestor``, so it never exceeds the descendant's edges.
+    """
+
+    ancestor = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="descendant_paths"
+    )
+    descendant = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="ancestor_paths"
+    )
+    paths = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Task Dependency Path"
+        verbose_name_plural = "Task Dependency Paths"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="unique_dependency_path"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["descendant", "ancestor"], name="dependency_path_desc_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Task {self.ancestor_id} blocks task {self.descendant_id}"
+
+
+class SavedFilter(models.Model):
+    """A named ``TaskFilter`` query and the live tasks it matches.
+
+    The matches (``SavedFilterMatch``) and their ``match_count`` are kept
+    current by ``tasks.saved_filters`` as tasks change, and recomputed in
+    full on the first use of each day.
+    """
+
+    name = models.CharField(max_length=100)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="saved_filters",
+    )
+    position = models.ForeignKey(
+        Position,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="saved_filters",
+        help_text="Share the filter with everyone in this position.",
+    )
+    params = models.JSONField(default=dict, blank=True)
+    match_count = models.PositiveIntegerField(default=0, editable=False)
+    refreshed_on = models.DateField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Saved Filter"
+        verbose_name_plural = "Saved Filters"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse("saved-filter-detail", kwargs={"pk": self.pk})
+
+
+class SavedFilterMatch(models.Model):
+    """A live task ``saved_filter`` matches."""
+
+    saved_filter = models.ForeignKey(
+        SavedFilter, on_delete=models.CASCADE, related_name="matches"
+    )
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="saved_filter_matches"
+    )
+
+    class Meta:
+        verbose_name = "Saved Filter Match"
+        verbose_name_plural = "Saved Filter Matches"
+        constraints = [
+            # Also the index a filter's matches are paged over, newest first.
+            models.UniqueConstraint(
+                fields=["saved_filter", "task"], name="unique_saved_filter_match"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} in saved filter {self.saved_filter_id}"
+
+
+class DigestRun(models.Model):
+    """Progress of one day's digests for one range of worker ids.
+
+    ``last_worker_id`` is the highest worker id whose digest the mail
+    backend has accepted, so a run that crashed resumes after it.
+    """
+
+    day = models.DateField()
+    first_worker_id = models.PositiveBigIntegerField()
+    last_worker_id = models.PositiveBigIntegerField(null=True, blank=True)
+    end_worker_id = models.PositiveBigIntegerField(null=True, blank=True)
+    since = models.DateTimeField()
+    cutoff = models.DateTimeField()
+    sent = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Digest Run"
+        verbose_name_plural = "Digest Runs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "first_worker_id", "end_worker_id"],
+                name="digest_run_range_unique",
+            ),
+            # NULLs are distinct in the constraint above.
+            models.UniqueConstraint(
+                fields=["day", "first_worker_id"],
+                condition=models.Q(end_worker_id__isnull=True),
+                name="digest_run_open_range_unique",
+            ),
+        ]
+
+    def __str__(self):
+        end = self.end_worker_id if self.end_worker_id is not None else "end"
+        return f"Digests for {self.day}, workers {self.first_worker_id}-{end}"
+
+
+class WebhookEvent(models.TextChoices):
+    TASK_CREATED = "task.created", "Task created"
+    TASK_UPDATED = "task.updated", "Task updated"
+    TASK_COMPLETED = "task.completed", "Task completed"
+    COMMENT_CREATED = "comment.created", "Comment created"
+
+
+class WebhookEndpoint(models.Model):
+    url = models.URLField(max_length=500)
+    events = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Event names to deliver, e.g. ["task.created"]; empty for all.',
+    )
+    secret = models.CharField(
+        max_length=128,
+        blank=True,
+        help_text="Signs every request body with HMAC-SHA256 when set.",
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Webhook Endpoint"
+        verbose_name_plural = "Webhook Endpoints"
+        ordering = ["url"]
+
+    def __str__(self):
+        return self.url
+
+    def wants(self, event):
+        return not self.events or event in self.events
+
+
+class WebhookOutbox(models.Model):
+    """An event written in the transaction that caused it.
+
+    ``tasks.webhooks`` fans undispatched events out into deliveries, one
+    per subscribed endpoint, and marks them dispatched.
+    """
+
+    event = models.CharField(max_length=50, choices=WebhookEvent.choices)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Webhook Outbox Entry"
+        verbose_name_plural = "Webhook Outbox"
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(dispatched=False),
+                name="webhook_outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk}"
+
+
+class DeliveryStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    DELIVERED = "delivered", "Delivered"
+    FAILED = "failed", "Failed"
+
+
+class WebhookDelivery(models.Model):
+    endpoint = models.ForeignKey(
+        WebhookEndpoint, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    outbox = models.ForeignKey(
+        WebhookOutbox, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    status = models.CharField(
+        max_length=10, choices=DeliveryStatus.choices, default=DeliveryStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    last_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Webhook Delivery"
+        verbose_name_plural = "Webhook Deliveries"
+        indexes = [
+            models.Index(
+                fields=["endpoint", "next_attempt_at", "id"],
+                condition=models.Q(status=DeliveryStatus.PENDING),
+                name="webhook_delivery_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.outbox} to {self.endpoint}: {self.get_status_display()}"
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class Job(models.Model):
+    """Deferred work for ``manage.py run_jobs``; see ``tasks.jobs``.
+
+    ``worker`` is the runner that claimed the job last; while it runs, the
+    claim holds until ``locked_until``, which the runner keeps extending.
+    """
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    run_at = models.DateTimeField(default=now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    worker = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_at", "id"],
+                condition=models.Q(status=JobStatus.QUEUED),
+                name="job_queue_idx",
+            ),
+            models.Index(
+                fields=["locked_until"],
+                condition=models.Q(status=JobStatus.RUNNING),
+                name="job_lease_idx",
+            ),
+            models.Index(fields=["finished_at"], name="job_finished_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class Mention(models.Model):
+    """A worker @mentioned in a comment."""
+
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, related_name="mentions"
+    )
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="mentions"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Mention"
+        verbose_name_plural = "Mentions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["comment", "worker"], name="unique_comment_mention"
+            )
+        ]
+
+    def __str__(self):
+        return f"@{self.worker.username} in comment #{self.comment_id}"
+
+
+class NotificationKind(models.TextChoices):
+    MENTION = "mention", "Mentioned you"
+
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    kind = models.CharField(max_length=20, choices=NotificationKind.choices)
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="notifications"
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at"],
+                name="notification_recipient_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.recipient.username})"
+
+
+class ArchivedMention(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    comment = models.ForeignKey(
+        ArchivedComment, on_delete=models.CASCADE, related_name="mentions"
+    )
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_mentions",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Mention"
+        verbose_name_plural = "Archived Mentions"
+
+    __str__ = Mention.__str__
+
+
+class ArchivedNotification(models.Model):
+    """A notification about an archived task, shown again once it is restored."""
+
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    kind = models.CharField(max_length=20, choices=NotificationKind.choices)
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="notifications"
+    )
+    comment = models.ForeignKey(
+        ArchivedComment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications",
+    )
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Archived Notification"
+        verbose_name_plural = "Archived Notifications"
+
+    __str__ = Notification.__str__
+
+
+class ArchivedDeadlineReminder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="deadline_reminders"
+    )
+    kind = models.CharField(max_length=10, choices=ReminderKind.choices)
+    deadline = models.DateTimeField()
+    sent_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Archived Deadline Reminder"
+        verbose_name_plural = "Archived Deadline Reminders"
+
+    __str__ = DeadlineReminder.__str__
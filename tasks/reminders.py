@@ -0,0 +1,213 @@
+"""Deadline reminders: an in-memory heap of upcoming deadlines.
+
+The scheduler loads tasks whose deadlines fall inside a sliding horizon
+once, then keeps up with changes by reading only tasks updated since its
+last refresh. Heap entries are invalidated lazily: when a task's deadline
+moves, the old entries stay in the heap and are skipped when they surface.
+"""
+
+import heapq
+import json
+import logging
+import sys
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tasks.models import (
+    CLOSED_STATUSES,
+    DeadlineReminder,
+    ReminderKind,
+    SchedulerLease,
+    Task,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = timedelta(minutes=1)
+
+
+def acquire_lease(name, holder, ttl):
+    """Take or renew the lease ``name`` for ``holder``; return True when leading."""
+    now = timezone.now()
+    expires_at = now + ttl
+    renewed = (
+        SchedulerLease.objects.filter(name=name)
+        .filter(Q(holder=holder) | Q(expires_at__lt=now))
+        .update(holder=holder, expires_at=expires_at)
+    )
+    if renewed:
+        return True
+    try:
+        with transaction.atomic():
+            SchedulerLease.objects.create(
+                name=name, holder=holder, expires_at=expires_at
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_lease(name, holder):
+    SchedulerLease.objects.filter(name=name, holder=holder).delete()
+
+
+class BaseReminderSender:
+    """Delivers a reminder about ``task`` to its assignees."""
+
+    def send(self, task, kind):
+        raise NotImplementedError
+
+    def describe(self, task, kind):
+        return {
+            "kind": kind,
+            "task": task.pk,
+            "name": task.name,
+            "deadline": task.deadline.isoformat(),
+            "assignees": [worker.username for worker in task.assignee.all()],
+        }
+
+
+class ConsoleReminderSender(BaseReminderSender):
+    """Writes reminders to stdout; the local stand-in for a real channel."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, task, kind):
+        reminder = self.describe(task, kind)
+        self.stream.write(
+            f"[{kind}] Task #{task.pk} {task.name} due {reminder['deadline']}"
+            f" -> {', '.join(reminder['assignees']) or 'unassigned'}\n"
+        )
+
+
+class FileReminderSender(BaseReminderSender):
+    """Appends reminders as JSON lines to ``REMINDER_FILE_PATH``."""
+
+    def send(self, task, kind):
+        with open(settings.REMINDER_FILE_PATH, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(self.describe(task, kind)) + "\n")
+
+
+def get_reminder_sender():
+    return import_string(settings.REMINDER_SENDER)()
+
+
+class ReminderScheduler:
+    """Plans and dispatches upcoming and overdue reminders."""
+
+    def __init__(self, sender, lead_time=None, horizon=None):
+        self.sender = sender
+        self.lead_time = lead_time or timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+        self.horizon = horizon or timedelta(hours=settings.REMINDER_HORIZON_HOURS)
+        self.heap = []
+        self.planned = {}
+        self.loaded_until = None
+        self.watermark = None
+
+    def plan(self, task_id, deadline, status):
+        if deadline is None or status in CLOSED_STATUSES:
+            self.planned.pop(task_id, None)
+            return
+        if self.planned.get(task_id) == deadline:
+            return
+        self.planned[task_id] = deadline
+        self.push(deadline - self.lead_time, task_id, ReminderKind.UPCOMING, deadline)
+        self.push(deadline, task_id, ReminderKind.OVERDUE, deadline)
+
+    def push(self, fire_at, task_id, kind, deadline):
+        heapq.heappush(self.heap, (fire_at, task_id, kind, deadline))
+
+    def refresh(self, now):
+        """Load the newly exposed slice of the horizon and any updated tasks."""
+        fields = ("pk", "deadline", "status", "updated_at")
+        until = now + self.horizon
+        if self.loaded_until is None:
+            window = Task.objects.filter(deadline__gte=now - self.horizon)
+        else:
+            window = Task.objects.filter(deadline__gt=self.loaded_until)
+        rows = list(
+            window.filter(deadline__lte=until)
+            .exclude(status__in=CLOSED_STATUSES)
+            .values_list(*fields)
+        )
+        if self.watermark is not None:
+            rows += Task.objects.filter(updated_at__gte=self.watermark).values_list(
+                *fields
+            )
+        for task_id, deadline, status, updated_at in rows:
+            if deadline is not None and deadline > until:
+                self.planned.pop(task_id, None)
+                continue
+            self.plan(task_id, deadline, status)
+            if self.watermark is not None and updated_at > self.watermark:
+                self.watermark = updated_at
+        self.loaded_until = until
+        if self.watermark is None:
+            # The first window's rows may be long unchanged; scan changes
+            # from when it was read.
+            self.watermark = now
+
+    def due(self, now):
+        """Pop every heap entry whose time has come and that is still current."""
+        entries = []
+        while self.heap and self.heap[0][0] <= now:
+            _, task_id, kind, deadline = heapq.heappop(self.heap)
+            if self.planned.get(task_id) == deadline:
+                entries.append((task_id, kind, deadline))
+        return entries
+
+    def dispatch(self, now):
+        entries = self.due(now)
+        if not entries:
+            return 0
+        tasks = Task.objects.prefetch_related("assignee").in_bulk(
+            {task_id for task_id, _, _ in entries}
+        )
+        sent = 0
+        for task_id, kind, deadline in entries:
+            task = tasks.get(task_id)
+            if task is None or task.deadline != deadline:
+                continue
+            if task.status in CLOSED_STATUSES:
+                continue
+            if kind == ReminderKind.UPCOMING and now >= deadline:
+                # Missed while down; the overdue reminder covers it.
+                continue
+            if self.send(task, kind):
+                sent += 1
+        return sent
+
+    def send(self, task, kind):
+        """Claim the reminder in the database, then hand it to the sender."""
+        try:
+            with transaction.atomic():
+                claim = DeadlineReminder.objects.create(
+                    task=task, kind=kind, deadline=task.deadline
+                )
+        except IntegrityError:
+            self.forget(task, kind)
+            return False
+        try:
+            self.sender.send(task, kind)
+        except Exception:
+            logger.exception("Failed to send %s reminder for task %s", kind, task.pk)
+            claim.delete()
+            self.push(timezone.now() + RETRY_DELAY, task.pk, kind, task.deadline)
+            return False
+        self.forget(task, kind)
+        return True
+
+    def forget(self, task, kind):
+        if kind == ReminderKind.OVERDUE:
+            self.planned.pop(task.pk, None)
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.refresh(now)
+        return self.dispatch(now)
@@ -0,0 +1,115 @@
+"""Bulk re-rendering of stored Markdown HTML for ``manage.py render_markup``.
+
+Rows whose HTML was rendered under an older ``tasks.markup.VERSION`` (or
+never) are read in primary key order, a batch at a time, and rendered in
+a pool of processes while the next batches are read. Each rendered batch
+is written back with one bulk update, skipping rows whose text was edited
+since they were read; the save that edited them rendered them already.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+
+from django.db import transaction
+
+from tasks import markup, mentions
+from tasks.models import ArchivedComment, ArchivedTask, Comment, Task
+
+
+@dataclass(frozen=True)
+class Target:
+    model: type
+    text_field: str
+    html_field: str
+    key_field: str
+    with_mentions: bool = False
+
+
+TARGETS = {
+    "tasks": Target(Task, "description", "description_html", "description_html_key"),
+    "comments": Target(
+        Comment, "content", "content_html", "content_html_key", with_mentions=True
+    ),
+    "archived-tasks": Target(
+        ArchivedTask, "description", "description_html", "description_html_key"
+    ),
+    "archived-comments": Target(
+        ArchivedComment,
+        "content",
+        "content_html",
+        "content_html_key",
+        with_mentions=True,
+    ),
+}
+
+
+def stale(target, force=False):
+    rows = target.model.objects.all()
+    if not force:
+        rows = rows.exclude(**{f"{target.key_field}__startswith": f"{markup.VERSION}:"})
+    return rows
+
+
+def batches(target, batch_size, force=False):
+    """``(pk, text, links)`` rows to render, ``batch_size`` at a time."""
+    rows = stale(target, force).order_by("pk").values_list("pk", target.text_field)
+    last = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return
+        last = batch[-1][0]
+        yield [
+            (
+                pk,
+                text,
+                (
+                    mentions.links(mentions.index.find(text))
+                    if target.with_mentions
+                    else ()
+                ),
+            )
+            for pk, text in batch
+        ]
+
+
+def save(target, batch, rendered):
+    """Store ``rendered`` rows of ``batch``; the number stored."""
+    sources = {pk: text for pk, text, _ in batch}
+    with transaction.atomic():
+        current = dict(
+            target.model.objects.select_for_update()
+            .filter(pk__in=sources)
+            .values_list("pk", target.text_field)
+        )
+        rows = [
+            target.model(pk=pk, **{target.html_field: html, target.key_field: key})
+            for pk, html, key in rendered
+            if pk in current and current[pk] == sources[pk]
+        ]
+        target.model.objects.bulk_update(rows, [target.html_field, target.key_field])
+    return len(rows)
+
+
+def rerender(target, processes=1, batch_size=500, force=False):
+    """Render ``target``'s stale rows again; the number of rows stored."""
+    if processes <= 1:
+        return sum(
+            save(target, batch, markup.render_rows(batch))
+            for batch in batches(target, batch_size, force)
+        )
+    stored = 0
+    pending = deque()
+    with ProcessPoolExecutor(processes, mp_context=get_context("spawn")) as pool:
+        for batch in batches(target, batch_size, force):
+            pending.append((batch, pool.submit(markup.render_rows, batch)))
+            # Keep every process busy without reading the whole table ahead.
+            if len(pending) >= 2 * processes:
+                batch, future = pending.popleft()
+                stored += save(target, batch, future.result())
+        while pending:
+            batch, future = pending.popleft()
+            stored += save(target, batch, future.result())
+    return stored
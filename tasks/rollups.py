@@ -0,0 +1,242 @@
+"""Dashboard rollups maintained by deltas.
+
+Every task contributes one to a ``TaskRollup`` row per dimension: its
+status, priority, task type, deadline date and each of its assignees, all
+split by the task's status. Signal handlers move those contributions inside
+the transaction that changes the task, so the dashboard never has to group
+the task table itself.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from tasks.models import CLOSED_STATUSES, ArchivedTask, Task, TaskRollup
+
+logger = logging.getLogger(__name__)
+
+STATUS = "status"
+PRIORITY = "priority"
+TASK_TYPE = "task_type"
+DEADLINE = "deadline"
+ASSIGNEE = "assignee"
+
+TASK_FIELDS = ("status", "priority", "task_type_id", "deadline")
+
+
+def deadline_value(deadline):
+    if deadline is None:
+        return None
+    if not isinstance(deadline, datetime):
+        return deadline.isoformat()
+    if timezone.is_naive(deadline):
+        deadline = timezone.make_aware(deadline)
+    return timezone.localtime(deadline).date().isoformat()
+
+
+def task_keys(state):
+    """Rollup keys one task contributes to, given its field values."""
+    status = state["status"]
+    keys = [
+        (STATUS, status, status),
+        (PRIORITY, state["priority"], status),
+    ]
+    if state["task_type_id"] is not None:
+        keys.append((TASK_TYPE, str(state["task_type_id"]), status))
+    deadline = deadline_value(state["deadline"])
+    if deadline is not None:
+        keys.append((DEADLINE, deadline, status))
+    return keys
+
+
+def assignee_keys(worker_ids, status):
+    return [(ASSIGNEE, str(worker_id), status) for worker_id in worker_ids]
+
+
+def current_state(task):
+    return {name: getattr(task, name) for name in TASK_FIELDS}
+
+
+def task_saving(task):
+    """Read the stored values of tracked fields ``task`` was not loaded with.
+
+    Only tasks loaded with ``only()`` or ``defer()``, or built by hand, need
+    the query; ``loaded_state`` uses its result once the save is done.
+    """
+    if task._state.adding:
+        return
+    loaded = getattr(task, "_loaded_values", None) or {}
+    missing = [name for name in TASK_FIELDS if name not in loaded]
+    if missing:
+        task._rollup_stored = (
+            Task.objects.filter(pk=task.pk).values(*missing).first() or {}
+        )
+
+
+def loaded_state(task):
+    """Field values ``task`` had before the save now in progress, if known."""
+    loaded = {
+        **(getattr(task, "_loaded_values", None) or {}),
+        **task.__dict__.pop("_rollup_stored", {}),
+    }
+    if any(name not in loaded for name in TASK_FIELDS):
+        return None
+    return {name: loaded[name] for name in TASK_FIELDS}
+
+
+def apply(deltas):
+    """Add ``deltas`` (``{(dimension, value, status): n}``) to the rollup table."""
+    for (dimension, value, status), delta in deltas.items():
+        if not delta:
+            continue
+        rows = TaskRollup.objects.filter(
+            dimension=dimension, value=value, status=status
+        )
+        if rows.update(count=F("count") + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                TaskRollup.objects.create(
+                    dimension=dimension, value=value, status=status, count=delta
+                )
+        except IntegrityError:
+            rows.update(count=F("count") + delta)
+
+
+def task_saved(task, created):
+    deltas = Counter()
+    if created:
+        deltas.update(task_keys(current_state(task)))
+        apply(deltas)
+        return
+    old = loaded_state(task)
+    if old is None:
+        logger.warning(
+            "Task %s was saved without its old values; rollups need a reconcile.",
+            task.pk,
+        )
+        return
+    # Fields still deferred were not written, so they keep their old values.
+    deferred = task.get_deferred_fields()
+    new = {
+        name: old[name] if name in deferred else getattr(task, name)
+        for name in TASK_FIELDS
+    }
+    if old == new:
+        return
+    deltas.update(task_keys(new))
+    deltas.subtract(task_keys(old))
+    if old["status"] != new["status"]:
+        worker_ids = list(task.assignee.values_list("pk", flat=True))
+        deltas.update(assignee_keys(worker_ids, new["status"]))
+        deltas.subtract(assignee_keys(worker_ids, old["status"]))
+    apply(deltas)
+
+
+def task_deleted(task, worker_ids):
+    deltas = Counter()
+    deltas.subtract(task_keys(current_state(task)))
+    deltas.subtract(assignee_keys(worker_ids, task.status))
+    apply(deltas)
+
+
+def assignees_changed(task_statuses, worker_ids, sign):
+    """Move assignee contributions for ``{task_id: status}`` by ``sign``."""
+    deltas = Counter()
+    for status in task_statuses.values():
+        for key in assignee_keys(worker_ids, status):
+            deltas[key] += sign
+    apply(deltas)
+
+
+def compute():
+    """Count every rollup key from scratch, over live and archived tasks.
+
+    Archiving moves tasks without touching their rollup contributions, so
+    both tables are counted, with two grouped queries each.
+    """
+    counts = Counter()
+    for model in (Task, ArchivedTask):
+        rows = model.objects.values(
+            "status", "priority", "task_type_id", deadline_date=TruncDate("deadline")
+        ).annotate(n=Count("pk"))
+        for row in rows:
+            status = row["status"]
+            counts[(STATUS, status, status)] += row["n"]
+            counts[(PRIORITY, row["priority"], status)] += row["n"]
+            if row["task_type_id"] is not None:
+                counts[(TASK_TYPE, str(row["task_type_id"]), status)] += row["n"]
+            if row["deadline_date"] is not None:
+                counts[(DEADLINE, row["deadline_date"].isoformat(), status)] += row["n"]
+        status_field = f"{model._meta.model_name}__status"
+        links = model.assignee.through.objects.values(
+            "worker_id", status_field
+        ).annotate(n=Count("id"))
+        for row in links:
+            counts[(ASSIGNEE, str(row["worker_id"]), row[status_field])] += row["n"]
+    return counts
+
+
+def reconcile():
+    """Replace the rollup table with freshly computed counts.
+
+    Returns the number of keys whose stored count had drifted.
+    """
+    with transaction.atomic():
+        expected = compute()
+        stored = {
+            (row.dimension, row.value, row.status): row.count
+            for row in TaskRollup.objects.select_for_update()
+        }
+        drifted = sum(
+            1
+            for key in set(expected) | set(stored)
+            if expected.get(key, 0) != stored.get(key, 0)
+        )
+        TaskRollup.objects.all().delete()
+        TaskRollup.objects.bulk_create(
+            TaskRollup(dimension=dimension, value=value, status=status, count=n)
+            for (dimension, value, status), n in expected.items()
+            if n
+        )
+    return drifted
+
+
+def open_counts(dimension, values=None):
+    """``{value: {status: count}}`` of open tasks for one dimension."""
+    table = {}
+    rows = TaskRollup.objects.filter(dimension=dimension, count__gt=0).exclude(
+        status__in=CLOSED_STATUSES
+    )
+    if values is not None:
+        rows = rows.filter(value__in=values)
+    rows = rows.values_list("value", "status", "count")
+    for value, status, count in rows:
+        table.setdefault(value, {})[status] = count
+    return table
+
+
+def top_open_assignees(limit):
+    return list(
+        TaskRollup.objects.filter(dimension=ASSIGNEE)
+        .exclude(status__in=CLOSED_STATUSES)
+        .values("value")
+        .annotate(total=Sum("count"))
+        .filter(total__gt=0)
+        .order_by("-total")[:limit]
+    )
+
+
+def overdue_count(today=None):
+    today = today or timezone.localdate()
+    total = (
+        TaskRollup.objects.filter(dimension=DEADLINE, value__lt=today.isoformat())
+        .exclude(status__in=CLOSED_STATUSES)
+        .aggregate(total=Sum("count"))["total"]
+    )
+    return total or 0
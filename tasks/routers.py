@@ -0,0 +1,131 @@
+"""Routing reads of read-only views to database replicas.
+
+Views wrapped in ``reading()`` (see ``ReplicaReadMixin``) read from one
+healthy replica, chosen once per request; everything else, all writes and
+the admin use the primary. A replica is healthy when it answers and, on
+PostgreSQL, replays within ``REPLICA_MAX_LAG_SECONDS`` of the primary; each
+process re-checks a replica at most every ``REPLICA_CHECK_SECONDS``. After a
+user's own write ``ReplicaStickinessMiddleware`` keeps them on the primary
+for ``REPLICA_STICKY_SECONDS`` so they see their change.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "db_primary"
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_replica = ContextVar("replica_alias", default=None)
+
+
+def lag(alias):
+    """Seconds ``alias`` is behind the primary; 0 where it cannot tell."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+        cursor.execute("SELECT 1")
+    return 0.0
+
+
+def check(alias):
+    try:
+        behind = lag(alias)
+    except DatabaseError:
+        logger.warning("Replica %s is unreachable.", alias, exc_info=True)
+        return False
+    if behind > settings.REPLICA_MAX_LAG_SECONDS:
+        logger.warning("Replica %s is %.1f seconds behind.", alias, behind)
+        return False
+    return True
+
+
+class ReplicaHealth:
+    """Per-process health of each replica, re-checked once it is stale."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}
+
+    def record(self, alias, healthy):
+        with self._lock:
+            self._checked[alias] = (time.monotonic(), healthy)
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+    def is_healthy(self, alias):
+        with self._lock:
+            checked = self._checked.get(alias)
+        if checked and time.monotonic() - checked[0] < settings.REPLICA_CHECK_SECONDS:
+            return checked[1]
+        healthy = check(alias)
+        self.record(alias, healthy)
+        return healthy
+
+
+health = ReplicaHealth()
+
+
+def choose_replica():
+    healthy = [
+        alias for alias in settings.DATABASE_REPLICAS if health.is_healthy(alias)
+    ]
+    return random.choice(healthy) if healthy else None
+
+
+def current_replica():
+    return _replica.get()
+
+
+@contextmanager
+def reading():
+    """Send reads to one healthy replica, if any, until the block exits."""
+    token = _replica.set(choose_replica())
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def wants_primary(request):
+    """Whether ``request`` must not be served from a replica."""
+    return (
+        not settings.DATABASE_REPLICAS
+        or request.method not in ("GET", "HEAD")
+        or STICKY_COOKIE in request.COOKIES
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
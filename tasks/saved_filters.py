@@ -0,0 +1,163 @@
+"""Saved task filters with their matches stored in ``SavedFilterMatch``.
+
+Opening a saved filter pages over its stored matches and loads one page of
+tasks by primary key; sidebar badges read the stored ``match_count``. When
+tasks change in a way some saved filter reads, a background job
+(``tasks.jobs.update_saved_filters``) re-checks just those tasks against
+the saved filters whose parameters read one of the changed fields, one
+query per distinct set of parameters, inserts and deletes the affected
+matches and updates the counts. Deleted and archived tasks take
+their matches with them. Searches also match task type names and assignee
+usernames, and deadline filters are relative to today, so every filter is
+recomputed in full when first opened each day; filters not opened yet
+today are skipped by the job and keep the count of their last refresh.
+"""
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.filters import TaskFilter
+from tasks.models import SavedFilter, SavedFilterMatch, Task
+
+# Task fields each filter parameter reads; assignee stands for the m2m.
+PARAM_FIELDS = {
+    "q": {"name", "description", "task_type_id", "assignee"},
+    "task_type": {"task_type_id"},
+    "assignee": {"assignee"},
+    "priority": {"priority"},
+    "status": {"status"},
+    "active_filter": {"status"},
+    "deadline_filter": {"deadline"},
+}
+
+TRACKED_FIELDS = (
+    "name",
+    "description",
+    "status",
+    "priority",
+    "task_type_id",
+    "deadline",
+)
+
+
+def clean_params(data):
+    """The filter parameters of a query dict, without paging or blanks."""
+    return {
+        name: value
+        for name, value in data.items()
+        if name in TaskFilter.base_filters and value
+    }
+
+
+def visible_to(user):
+    """Saved filters ``user`` owns or that are shared with their position."""
+    visible = Q(owner=user)
+    if user.position_id is not None:
+        visible |= Q(position_id=user.position_id)
+    return SavedFilter.objects.filter(visible)
+
+
+def matching_ids(params, task_ids=None):
+    """Ids of live tasks matching ``params``, newest first."""
+    queryset = Task.objects.all()
+    if task_ids is not None:
+        queryset = queryset.filter(pk__in=task_ids)
+    filterset = TaskFilter(params, queryset=queryset)
+    filterset.is_valid()
+    matches = filterset.filter_queryset(queryset)
+    return list(matches.order_by("-pk").values_list("pk", flat=True).distinct())
+
+
+def matched_ids(saved):
+    """Ids of the tasks ``saved`` matches, newest first, for paging."""
+    return saved.matches.order_by("-task_id").values_list("task_id", flat=True)
+
+
+def refresh(saved):
+    ids = matching_ids(saved.params)
+    saved.refreshed_on = timezone.localdate()
+    saved.match_count = len(ids)
+    with transaction.atomic():
+        saved.matches.all().delete()
+        SavedFilterMatch.objects.bulk_create(
+            (SavedFilterMatch(saved_filter=saved, task_id=pk) for pk in ids),
+            batch_size=1000,
+        )
+        SavedFilter.objects.filter(pk=saved.pk).update(
+            refreshed_on=saved.refreshed_on, match_count=saved.match_count
+        )
+
+
+def refresh_if_stale(saved):
+    """Recompute ``saved`` unless it was today; whether it was recomputed."""
+    if saved.refreshed_on == timezone.localdate():
+        return False
+    refresh(saved)
+    return True
+
+
+def sidebar(user):
+    """Saved filters for the sidebar, with the count of their last refresh."""
+    return list(visible_to(user).only("name", "match_count"))
+
+
+def reads_any(params, fields):
+    return any(fields & PARAM_FIELDS.get(name, set()) for name in params)
+
+
+def is_read(fields):
+    """Whether a filter refreshed today reads ``fields``; see ``affected``."""
+    current = SavedFilter.objects.filter(refreshed_on=timezone.localdate())
+    if fields is None:
+        return current.exists()
+    return any(
+        reads_any(params, set(fields))
+        for params in current.values_list("params", flat=True)
+    )
+
+
+def affected(fields):
+    """Saved filters that may change with ``fields``, grouped by parameters.
+
+    ``fields`` is None for new tasks, which every filter has to check.
+    Filters not refreshed today are recomputed on their next use anyway.
+    """
+    groups = {}
+    current = SavedFilter.objects.filter(refreshed_on=timezone.localdate())
+    for pk, params in current.values_list("pk", "params"):
+        if fields is None or reads_any(params, fields):
+            key = tuple(sorted((name, str(value)) for name, value in params.items()))
+            groups.setdefault(key, (params, []))[1].append(pk)
+    return groups.values()
+
+
+def tasks_changed(task_ids, fields=None):
+    """Re-check ``task_ids`` against the saved filters that read ``fields``."""
+    task_ids = set(task_ids)
+    for params, filter_ids in affected(fields):
+        matched = set(matching_ids(params, task_ids))
+        with transaction.atomic():
+            SavedFilterMatch.objects.filter(
+                saved_filter_id__in=filter_ids, task_id__in=task_ids - matched
+            ).delete()
+            SavedFilterMatch.objects.bulk_create(
+                (
+                    SavedFilterMatch(saved_filter_id=pk, task_id=task_id)
+                    for pk in filter_ids
+                    for task_id in matched
+                ),
+                ignore_conflicts=True,
+            )
+            SavedFilter.objects.filter(pk__in=filter_ids).update(
+                match_count=Coalesce(
+                    Subquery(
+                        SavedFilterMatch.objects.filter(saved_filter=OuterRef("pk"))
+                        .values("saved_filter")
+                        .annotate(n=Count("pk"))
+                        .values("n")
+                    ),
+                    0,
+                )
+            )
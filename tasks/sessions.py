@@ -0,0 +1,41 @@
+"""Cache-first session store that writes back to the database lazily."""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class SessionStore(CachedDBStore):
+    """Serve sessions from the cache and defer database writes.
+
+    New sessions are written through so their keys are reserved in the
+    database. Later changes only go to the cache until
+    ``SESSION_DB_WRITE_INTERVAL`` seconds have passed since the last database
+    write, so a busy session costs at most one ``django_session`` write per
+    interval. Requires a cache shared by every process.
+    """
+
+    @property
+    def synced_key(self):
+        return self.cache_key + ":synced"
+
+    def _db_write_due(self):
+        interval = settings.SESSION_DB_WRITE_INTERVAL
+        if not interval:
+            return True
+        synced_at = self._cache.get(self.synced_key)
+        return synced_at is None or time.time() - synced_at >= interval
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None or self._db_write_due():
+            super().save(must_create)
+            self._cache.set(self.synced_key, time.time(), self.get_expiry_age())
+        else:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            self._cache.delete(self.cache_key_prefix + key + ":synced")
+        super().delete(session_key)
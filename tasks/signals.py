@@ -0,0 +1,432 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from tasks import (
+    activity,
+    archive,
+    assignment,
+    dependencies,
+    facets,
+    hierarchy,
+    ical,
+    jobs,
+    lookups,
+    markup,
+    mentions,
+    rollups,
+    saved_filters,
+    webhooks,
+)
+from tasks.backends import invalidate_cached_workers
+from tasks.comment_stream import (
+    EVENT_CREATED,
+    EVENT_UPDATED,
+    publish_comment_deleted,
+    publish_comment_event,
+)
+from tasks.models import (
+    CLOSED_STATUSES,
+    ActivityVerb,
+    Comment,
+    Position,
+    Status,
+    Task,
+    TaskType,
+    WebhookEndpoint,
+    WebhookEvent,
+    Worker,
+)
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_save(sender, instance, created, **kwargs):
+    kind = EVENT_CREATED if created else EVENT_UPDATED
+    transaction.on_commit(partial(publish_comment_event, kind, instance))
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    # Django clears instance.pk once the delete returns.
+    transaction.on_commit(
+        partial(publish_comment_deleted, instance.task_id, instance.pk)
+    )
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def invalidate_worker_cache(sender, instance, **kwargs):
+    # After the commit, so a concurrent request cannot cache the old row again.
+    transaction.on_commit(partial(invalidate_cached_workers, instance.pk))
+
+
+@receiver(post_save, sender=Position)
+@receiver(pre_delete, sender=Position)
+def invalidate_position_workers_cache(sender, instance, **kwargs):
+    # Read now: once a position is deleted its workers no longer point at it.
+    worker_ids = Worker.objects.filter(position=instance).values_list("pk", flat=True)
+    transaction.on_commit(partial(invalidate_cached_workers, *worker_ids))
+
+
+@receiver(post_save, sender=TaskType)
+@receiver(post_delete, sender=TaskType)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+@receiver(post_save, sender=WebhookEndpoint)
+@receiver(post_delete, sender=WebhookEndpoint)
+def invalidate_lookup_cache(sender, instance, **kwargs):
+    transaction.on_commit(partial(lookups.tables.invalidate, sender))
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def remember_cleared_assignees(sender, instance, action, reverse, **kwargs):
+    """``clear()`` reports no primary keys, so capture them beforehand."""
+    if action == "pre_clear":
+        related = instance.assigned_tasks if reverse else instance.assignee
+        instance._cleared_pks = set(related.values_list("pk", flat=True))
+
+
+def changed_assignee_pks(instance, action, pk_set):
+    if action == "post_clear":
+        return getattr(instance, "_cleared_pks", set())
+    return pk_set
+
+
+@receiver(post_save, sender=Task)
+def record_task_save(sender, instance, created, **kwargs):
+    if created:
+        activity.record(instance, ActivityVerb.CREATED)
+        return
+    changes = activity.task_changes(instance)
+    if changes:
+        activity.record(instance, ActivityVerb.UPDATED, changes)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    activity.record(instance, ActivityVerb.DELETED)
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def record_assignee_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    pks = changed_assignee_pks(instance, action, pk_set)
+    if not pks:
+        return
+    verb = ActivityVerb.ASSIGNED if action == "post_add" else ActivityVerb.UNASSIGNED
+    if reverse:
+        for task in Task.objects.filter(pk__in=pks).only("pk", "name"):
+            activity.record(task, verb, {"assignee": [instance.username]})
+    else:
+        usernames = Worker.objects.filter(pk__in=pks).values_list("username", flat=True)
+        activity.record(instance, verb, {"assignee": sorted(usernames)})
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_save(sender, instance, created, **kwargs):
+    if created:
+        activity.record(instance.task, ActivityVerb.COMMENTED, {"comment": instance.pk})
+        return
+    changes = instance.get_changes(["content"])
+    if changes:
+        old, new = changes["content"]
+        activity.record(
+            instance.task,
+            ActivityVerb.COMMENT_EDITED,
+            {"comment": instance.pk, "content": [old, new]},
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    activity.record(
+        instance.task, ActivityVerb.COMMENT_DELETED, {"comment": instance.pk}
+    )
+
+
+@receiver(pre_save, sender=Task)
+def read_rollup_state_before_save(sender, instance, **kwargs):
+    rollups.task_saving(instance)
+
+
+@receiver(post_save, sender=Task)
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    rollups.task_saved(instance, created)
+
+
+@receiver(pre_delete, sender=Task)
+def remember_assignees_before_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    instance._deleted_assignee_pks = list(
+        instance.assignee.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        # Archived tasks still count; see ``rollups.compute``.
+        return
+    rollups.task_deleted(instance, getattr(instance, "_deleted_assignee_pks", []))
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def update_rollups_on_assignee_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    pks = changed_assignee_pks(instance, action, pk_set)
+    if not pks:
+        return
+    sign = 1 if action == "post_add" else -1
+    if reverse:
+        statuses = dict(Task.objects.filter(pk__in=pks).values_list("pk", "status"))
+        rollups.assignees_changed(statuses, [instance.pk], sign)
+    else:
+        rollups.assignees_changed({instance.pk: instance.status}, pks, sign)
+
+
+@receiver(pre_delete, sender=Task)
+def detach_dependencies_before_delete(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    dependencies.detach(instance)
+
+
+@receiver(post_save, sender=Task)
+def release_or_block_dependents(sender, instance, created, **kwargs):
+    change = instance.get_changes(["status"]).get("status")
+    if change and (change[0] in CLOSED_STATUSES) != (change[1] in CLOSED_STATUSES):
+        dependencies.blocker_status_changed(instance)
+
+
+@receiver(pre_save, sender=Task)
+def check_task_parent(sender, instance, **kwargs):
+    if instance._state.adding:
+        hierarchy.check_parent(None, instance.parent_id)
+    elif "parent_id" in instance.get_changes(["parent_id"]):
+        hierarchy.check_parent(instance.pk, instance.parent_id)
+
+
+@receiver(post_save, sender=Task)
+def update_task_hierarchy(sender, instance, created, **kwargs):
+    if created:
+        hierarchy.placed(instance)
+        return
+    changes = instance.get_changes(["status", "parent_id"])
+    if "status" in changes:
+        hierarchy.status_changed(instance, *changes["status"])
+    if "parent_id" in changes:
+        hierarchy.move(instance)
+
+
+@receiver(pre_delete, sender=Task)
+def hand_subtasks_to_parent(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    hierarchy.removed(instance)
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def update_worker_load_on_assignee_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if assignment.planned() or not assignment.balancer.is_built:
+        return
+    pks = changed_assignee_pks(instance, action, pk_set)
+    if not pks:
+        return
+    sign = 1 if action == "post_add" else -1
+    if reverse:
+        tasks = Task.objects.filter(pk__in=pks).only("status", "priority", "deadline")
+        load = sum(assignment.task_weight(task) for task in tasks)
+        assignment.balancer.adjust_on_commit([instance.pk], sign * load)
+    else:
+        load = assignment.task_weight(instance)
+        assignment.balancer.adjust_on_commit(pks, sign * load)
+
+
+@receiver(post_save, sender=Task)
+def update_worker_load_on_save(sender, instance, created, **kwargs):
+    if created or not assignment.balancer.is_built:
+        return
+    changes = instance.get_changes(["status", "priority", "deadline"])
+    if not changes:
+        return
+    old = {name: change[0] for name, change in changes.items()}
+    delta = assignment.task_weight(instance) - assignment.weight(
+        old.get("status", instance.status),
+        old.get("priority", instance.priority),
+        old.get("deadline", instance.deadline),
+    )
+    if delta:
+        assignment.balancer.adjust_on_commit(
+            instance.assignee.values_list("pk", flat=True), delta
+        )
+
+
+@receiver(post_delete, sender=Task)
+def update_worker_load_on_delete(sender, instance, **kwargs):
+    assignment.balancer.adjust_on_commit(
+        getattr(instance, "_deleted_assignee_pks", []),
+        -assignment.task_weight(instance),
+    )
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+@receiver(post_delete, sender=Position)
+def rebuild_worker_loads(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(assignment.balancer.invalidate)
+
+
+@receiver(m2m_changed, sender=Position.task_types.through)
+def rebuild_worker_loads_on_eligibility_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(assignment.balancer.invalidate)
+
+
+@receiver(post_save, sender=Task)
+def update_saved_filters_on_save(sender, instance, created, **kwargs):
+    if created:
+        fields = None
+    else:
+        fields = sorted(instance.get_changes(saved_filters.TRACKED_FIELDS))
+        if not fields:
+            return
+    if saved_filters.is_read(fields):
+        jobs.update_saved_filters.enqueue([[instance.pk], fields])
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def update_saved_filters_on_assignee_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    pks = changed_assignee_pks(instance, action, pk_set)
+    if not pks:
+        return
+    task_ids = sorted(pks) if reverse else [instance.pk]
+    if saved_filters.is_read(["assignee"]):
+        jobs.update_saved_filters.enqueue([task_ids, ["assignee"]])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(m2m_changed, sender=Task.assignee.through)
+def invalidate_facet_counts(sender, action=None, **kwargs):
+    if action is None or action.startswith("post_"):
+        transaction.on_commit(facets.invalidate)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_calendars_on_save(sender, instance, created, **kwargs):
+    if created or not ical.enabled():
+        return
+    if not instance.get_changes(ical.TRACKED_FIELDS):
+        return
+    worker_ids = list(instance.assignee.values_list("pk", flat=True))
+    transaction.on_commit(partial(ical.invalidate, *worker_ids))
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_calendars_on_delete(sender, instance, **kwargs):
+    worker_ids = getattr(instance, "_deleted_assignee_pks", [])
+    transaction.on_commit(partial(ical.invalidate, *worker_ids))
+
+
+@receiver(m2m_changed, sender=Task.assignee.through)
+def invalidate_calendars_on_assignee_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    worker_ids = (
+        [instance.pk] if reverse else changed_assignee_pks(instance, action, pk_set)
+    )
+    transaction.on_commit(partial(ical.invalidate, *worker_ids))
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def invalidate_worker_calendar(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    # The next poll misses the cache and checks the worker is still active.
+    transaction.on_commit(partial(ical.invalidate, instance.pk))
+
+
+@receiver(post_save, sender=Task)
+def emit_task_webhooks(sender, instance, created, **kwargs):
+    if created:
+        webhooks.emit(WebhookEvent.TASK_CREATED, webhooks.task_payload(instance))
+        return
+    changes = instance.get_changes(webhooks.TASK_FIELDS)
+    if not changes:
+        return
+    payload = webhooks.task_payload(instance, changes)
+    webhooks.emit(WebhookEvent.TASK_UPDATED, payload)
+    if changes.get("status", (None, None))[1] == Status.COMPLETED:
+        webhooks.emit(WebhookEvent.TASK_COMPLETED, payload)
+
+
+@receiver(post_save, sender=Comment)
+def emit_comment_webhook(sender, instance, created, **kwargs):
+    if created:
+        webhooks.emit(WebhookEvent.COMMENT_CREATED, webhooks.comment_payload(instance))
+
+
+@receiver(pre_save, sender=Task)
+def render_task_description(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "description" not in update_fields:
+        return
+    if markup.is_stale(instance.description_html_key, instance.description):
+        instance.description_html = markup.render(instance.description)
+        instance.description_html_key = markup.key(instance.description)
+
+
+@receiver(pre_save, sender=Comment)
+def render_comment(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "content" not in update_fields:
+        return
+    if markup.is_stale(instance.content_html_key, instance.content):
+        mentions.prepare(instance)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_mentions(sender, instance, created, **kwargs):
+    mentions.record(instance, created)
+
+
+@receiver(post_save, sender=Worker)
+def update_mention_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    mentions.index.update_on_commit(instance.pk, instance.username, instance.is_active)
+
+
+@receiver(post_delete, sender=Worker)
+def remove_from_mention_index(sender, instance, **kwargs):
+    mentions.index.update_on_commit(instance.pk, None, False)
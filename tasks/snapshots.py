@@ -0,0 +1,231 @@
+"""Daily task snapshots for burndown and trend charts.
+
+A snapshot stores, for one day, how many tasks shared each status, priority,
+task type and assignee, split by status. Today's snapshot is counted from
+the task and archive tables in one grouped pass each. Missing earlier days
+are rebuilt in one backwards pass: starting from every task's current state
+and its counts, the activity log is undone newest first while the counts
+follow each change, and the counts are written out as the pass crosses the
+end of each missing day. Tasks deleted since then left no state behind and
+are missing from rebuilt days.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from tasks import rollups
+from tasks.models import (
+    ActivityVerb,
+    ArchivedTask,
+    Task,
+    TaskActivity,
+    TaskSnapshot,
+    Worker,
+)
+
+DIMENSIONS = (rollups.STATUS, rollups.PRIORITY, rollups.TASK_TYPE, rollups.ASSIGNEE)
+
+REPLAYED_VERBS = (
+    ActivityVerb.CREATED,
+    ActivityVerb.UPDATED,
+    ActivityVerb.ASSIGNED,
+    ActivityVerb.UNASSIGNED,
+)
+
+BATCH_SIZE = 1000
+
+
+def day_end(day):
+    """The first moment after ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def snapshot_rows(day, counts):
+    return [
+        TaskSnapshot(date=day, dimension=dimension, value=value, status=status, count=n)
+        for (dimension, value, status), n in counts.items()
+        if n > 0
+    ]
+
+
+def take(day=None):
+    """Replace the snapshot of ``day`` (today) with the current counts."""
+    day = day or timezone.localdate()
+    counts = Counter(
+        {key: n for key, n in rollups.compute().items() if key[0] in DIMENSIONS}
+    )
+    rows = snapshot_rows(day, counts)
+    with transaction.atomic():
+        TaskSnapshot.objects.filter(date=day).delete()
+        TaskSnapshot.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def load_states():
+    states = {}
+    for model in (Task, ArchivedTask):
+        rows = model.objects.values_list(
+            "pk", "status", "priority", "task_type_id", "created_at"
+        )
+        for pk, status, priority, task_type_id, created_at in rows.iterator(
+            chunk_size=BATCH_SIZE
+        ):
+            states[pk] = {
+                "status": status,
+                "priority": priority,
+                "task_type_id": task_type_id,
+                "created_at": created_at,
+                "assignees": set(),
+            }
+        links = model.assignee.through.objects.values_list(
+            f"{model._meta.model_name}_id", "worker_id"
+        )
+        for task_id, worker_id in links.iterator(chunk_size=BATCH_SIZE):
+            states[task_id]["assignees"].add(worker_id)
+    return states
+
+
+def state_keys(state):
+    status = state["status"]
+    keys = [
+        (rollups.STATUS, status, status),
+        (rollups.PRIORITY, state["priority"], status),
+    ]
+    if state["task_type_id"] is not None:
+        keys.append((rollups.TASK_TYPE, str(state["task_type_id"]), status))
+    keys.extend(rollups.assignee_keys(state["assignees"], status))
+    return keys
+
+
+def undo(states, entry, worker_ids):
+    """Roll ``states`` back to just before ``entry`` happened."""
+    if entry.verb == ActivityVerb.CREATED:
+        states.pop(entry.task_id, None)
+        return
+    state = states.get(entry.task_id)
+    if state is None:
+        return
+    changes = entry.changes
+    if entry.verb == ActivityVerb.UPDATED:
+        for field, attname in (
+            ("status", "status"),
+            ("priority", "priority"),
+            ("task_type", "task_type_id"),
+        ):
+            if field in changes:
+                state[attname] = changes[field][0]
+        return
+    workers = {
+        worker_ids[username]
+        for username in changes.get("assignee", [])
+        if username in worker_ids
+    }
+    if entry.verb == ActivityVerb.ASSIGNED:
+        state["assignees"] -= workers
+    else:
+        state["assignees"] |= workers
+
+
+def missing_days(days, today):
+    """Days in the ``days`` before ``today`` that have tasks but no snapshot."""
+    firsts = [
+        model.objects.aggregate(first=Min("created_at"))["first"]
+        for model in (Task, ArchivedTask)
+    ]
+    firsts = [first for first in firsts if first is not None]
+    if not firsts:
+        return []
+    start = max(today - timedelta(days=days), timezone.localtime(min(firsts)).date())
+    taken = set(
+        TaskSnapshot.objects.filter(date__gte=start, date__lt=today)
+        .values_list("date", flat=True)
+        .distinct()
+    )
+    return [
+        start + timedelta(days=n)
+        for n in range((today - start).days)
+        if start + timedelta(days=n) not in taken
+    ]
+
+
+def backfill(days, today=None):
+    """Rebuild missing snapshots of the ``days`` days before ``today``.
+
+    Returns the dates that were written.
+    """
+    today = today or timezone.localdate()
+    missing = missing_days(days, today)
+    if not missing:
+        return []
+    states = load_states()
+    counts = Counter()
+    for state in states.values():
+        counts.update(state_keys(state))
+    # Popped newest first, dropping the tasks created after each day.
+    by_creation = sorted((state["created_at"], pk) for pk, state in states.items())
+    entries = (
+        TaskActivity.objects.filter(
+            verb__in=REPLAYED_VERBS, created_at__gte=day_end(missing[0])
+        )
+        .order_by("-created_at", "-pk")
+        .only("task_id", "verb", "changes", "created_at")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    entry = next(entries, None)
+    worker_ids = dict(Worker.objects.values_list("username", "pk"))
+    wanted = set(missing)
+    written = []
+    day = today - timedelta(days=1)
+    while day >= missing[0]:
+        end = day_end(day)
+        while entry is not None and entry.created_at >= end:
+            state = states.get(entry.task_id)
+            if state is not None:
+                counts.subtract(state_keys(state))
+                undo(states, entry, worker_ids)
+                if entry.task_id in states:
+                    counts.update(state_keys(state))
+            entry = next(entries, None)
+        while by_creation and by_creation[-1][0] >= end:
+            state = states.pop(by_creation.pop()[1], None)
+            if state is not None:
+                counts.subtract(state_keys(state))
+        if day in wanted:
+            TaskSnapshot.objects.bulk_create(
+                snapshot_rows(day, counts),
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            written.append(day)
+        day -= timedelta(days=1)
+    return sorted(written)
+
+
+def series(dimension, start, end, statuses=None):
+    """Daily totals per value of ``dimension`` between ``start`` and ``end``.
+
+    Returns ``(dates, {value: [count per date]})`` from one range read of the
+    snapshot index.
+    """
+    rows = TaskSnapshot.objects.filter(dimension=dimension, date__range=(start, end))
+    if statuses:
+        rows = rows.filter(status__in=statuses)
+    rows = (
+        rows.values_list("date", "value")
+        .annotate(total=Sum("count"))
+        .order_by("date", "value")
+    )
+    dates = []
+    totals = {}
+    for date, value, total in rows:
+        if not dates or dates[-1] != date:
+            dates.append(date)
+        totals.setdefault(value, {})[date] = total
+    return dates, {
+        value: [by_date.get(date, 0) for date in dates]
+        for value, by_date in totals.items()
+    }
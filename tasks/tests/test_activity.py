@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks import activity
+from tasks.models import ActivityVerb, Comment, Status, Task, TaskActivity
+
+
+class ActivityLogTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="auditor", password="password123"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(name="Audit me", description="...")
+
+    def test_field_level_diff_is_recorded(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = Status.IN_PROGRESS
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+
+        entry = TaskActivity.objects.get(verb=ActivityVerb.UPDATED)
+        self.assertEqual(entry.changes, {"status": ["pending", "in_progress"]})
+
+    def test_save_without_changes_records_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(pk=self.task.pk).save()
+        self.assertFalse(TaskActivity.objects.filter(verb=ActivityVerb.UPDATED))
+
+    def test_assignee_changes_from_both_sides(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.assignee.add(self.user)
+            self.user.assigned_tasks.clear()
+
+        verbs = list(TaskActivity.objects.order_by("id").values_list("verb", "changes"))
+        self.assertIn((ActivityVerb.ASSIGNED, {"assignee": ["auditor"]}), verbs)
+        self.assertIn((ActivityVerb.UNASSIGNED, {"assignee": ["auditor"]}), verbs)
+
+    def test_entries_within_a_request_are_flushed_together(self):
+        with activity.recording(actor=self.user):
+            with self.captureOnCommitCallbacks(execute=True):
+                Comment.objects.create(task=self.task, author=self.user, content="x")
+                task = Task.objects.get(pk=self.task.pk)
+                task.name = "Renamed"
+                task.save()
+            self.assertEqual(len(activity.buffer), 2)
+        self.assertEqual(len(activity.buffer), 0)
+        self.assertEqual(TaskActivity.objects.filter(actor=self.user).count(), 2)
+
+    @override_settings(ACTIVITY_LOG_BUFFER_SIZE=1)
+    def test_full_buffer_flushes_early(self):
+        with activity.recording():
+            with self.captureOnCommitCallbacks(execute=True):
+                Task.objects.create(name="Second")
+            self.assertEqual(len(activity.buffer), 0)
+
+    def test_entries_are_append_only(self):
+        entry = TaskActivity.objects.get()
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+    def test_history_survives_task_deletion(self):
+        task_id = self.task.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertEqual(TaskActivity.objects.filter(task_id=task_id).count(), 2)
+
+
+class ActivityViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="viewer", password="password123"
+        )
+        self.client.login(username="viewer", password="password123")
+        self.task = Task.objects.create(name="Tracked")
+
+    def test_task_activity_is_attributed_and_paginated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("task-detail", kwargs={"pk": self.task.pk}),
+                {"content": "hello"},
+            )
+        response = self.client.get(
+            reverse("task-activity", kwargs={"pk": self.task.pk})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["activities"][0].actor, self.user)
+
+        response = self.client.get(
+            reverse("worker-activity", kwargs={"pk": self.user.pk})
+        )
+        self.assertContains(response, "Commented")
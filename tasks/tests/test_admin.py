@@ -0,0 +1,137 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from tasks.admin import EstimatedCountPaginator, ScalableAdminMixin
+from tasks.models import Comment, Position, Task
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def test_counts_exactly_below_the_limit(self):
+        for n in range(3):
+            Task.objects.create(name=f"Task {n}")
+        paginator = EstimatedCountPaginator(Task.objects.order_by("pk"), 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_falls_back_to_exact_count_without_an_estimate(self):
+        for n in range(3):
+            Task.objects.create(name=f"Task {n}")
+        paginator = EstimatedCountPaginator(Task.objects.order_by("pk"), 2)
+        paginator.exact_limit = 1
+        self.assertEqual(paginator.count, 3)
+
+
+class CommentAdminTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="root", password="pass12345"
+        )
+        self.other = get_user_model().objects.create_user(username="other")
+        self.client.login(username="root", password="pass12345")
+        self.url = reverse("admin:tasks_comment_changelist")
+
+    def add_comments(self, count):
+        for n in range(count):
+            task = Task.objects.create(name=f"Task {n}")
+            Comment.objects.create(task=task, author=self.admin, content="Hi")
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_comments(1)
+        few = self.changelist_queries()
+        self.add_comments(5)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_autocomplete_filter_renders_only_the_selected_author(self):
+        self.add_comments(2)
+        Comment.objects.create(
+            task=Task.objects.first(), author=self.other, content="Other"
+        )
+        response = self.client.get(self.url, {"author__id__exact": self.other.pk})
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertContains(response, 'class="admin-autocomplete')
+        self.assertContains(response, f'<option value="{self.other.pk}" selected>')
+
+    def test_every_changelist_opens(self):
+        self.add_comments(1)
+        Task.objects.first().assignee.add(self.other)
+        for model in (
+            "task",
+            "tasktype",
+            "position",
+            "worker",
+            "comment",
+            "webhookendpoint",
+            "webhookdelivery",
+            "job",
+        ):
+            response = self.client.get(reverse(f"admin:tasks_{model}_changelist"))
+            self.assertEqual(response.status_code, 200, model)
+
+    def test_every_admin_of_the_app_scales(self):
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label == "tasks":
+                self.assertIsInstance(model_admin, ScalableAdminMixin, model)
+
+
+class TaskAdminAssigneeTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_superuser(username="root", password="pass12345")
+        self.client.login(username="root", password="pass12345")
+        self.position = Position.objects.create(name="Engineer")
+        self.task = Task.objects.create(name="Deploy")
+        self.task.assignee.add(
+            get_user_model().objects.create_user(
+                username="alice", position=self.position
+            ),
+            get_user_model().objects.create_user(
+                username="bob", position=self.position
+            ),
+        )
+        self.url = reverse("admin:tasks_task_change", args=[self.task.pk])
+
+    def add_workers(self, count, prefix):
+        for n in range(count):
+            get_user_model().objects.create_user(
+                username=f"{prefix}{n}", position=self.position
+            )
+
+    def change_page_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response
+
+    def test_change_page_cost_does_not_depend_on_worker_count(self):
+        self.add_workers(2, "early")
+        self.change_page_queries()
+        before, _ = self.change_page_queries()
+        self.add_workers(20, "late")
+        after, response = self.change_page_queries()
+        self.assertEqual(after, before)
+        self.assertNotContains(response, "late1")
+        self.assertContains(response, "alice (Engineer")
+
+    def test_autocomplete_searches_workers_by_prefix(self):
+        self.add_workers(3, "dev")
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "tasks",
+                "model_name": "task",
+                "field_name": "assignee",
+                "term": "DEV",
+            },
+        )
+        labels = [result["text"] for result in response.json()["results"]]
+        self.assertEqual(
+            labels, ["dev0 (Engineer  )", "dev1 (Engineer  )", "dev2 (Engineer  )"]
+        )
@@ -0,0 +1,236 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import archive, dependencies, mentions, rollups
+from tasks.filters import TaskFilter
+from tasks.models import (
+    ArchivedComment,
+    ArchivedMention,
+    ArchivedNotification,
+    ArchivedTask,
+    ArchivedTaskDependency,
+    Comment,
+    DeadlineReminder,
+    Mention,
+    Notification,
+    ReminderKind,
+    Status,
+    Task,
+    TaskActivity,
+    TaskDependency,
+    TaskDependencyPath,
+    TaskRollup,
+)
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="archivist", password="pass12345"
+        )
+        self.old = Task.objects.create(name="Old release", status=Status.COMPLETED)
+        self.old.assignee.add(self.user)
+        self.comment = Comment.objects.create(
+            task=self.old, author=self.user, content="Shipped"
+        )
+        Task.objects.filter(pk=self.old.pk).update(
+            updated_at=timezone.now() - timedelta(days=120)
+        )
+        self.recent = Task.objects.create(name="Hotfix", status=Status.COMPLETED)
+        self.open = Task.objects.create(name="Next release")
+
+    def test_archive_moves_long_closed_tasks_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive.archive(90, batch_size=1), 1)
+
+        self.assertFalse(Task.objects.filter(pk=self.old.pk).exists())
+        archived = ArchivedTask.objects.get(pk=self.old.pk)
+        self.assertEqual(list(archived.assignee.all()), [self.user])
+        self.assertEqual(
+            ArchivedComment.objects.get(pk=self.comment.pk).content, "Shipped"
+        )
+        self.assertFalse(TaskActivity.objects.exists())
+        self.assertEqual(
+            {
+                (row.dimension, row.value, row.status): row.count
+                for row in TaskRollup.objects.exclude(count=0)
+            },
+            dict(+rollups.compute()),
+        )
+
+    def test_restore_brings_back_task_links_and_comments(self):
+        archive.archive(90)
+        created_at = ArchivedTask.objects.get(pk=self.old.pk).created_at
+        call_command(
+            "archive_tasks", restore=[self.old.pk], stdout=open("/dev/null", "w")
+        )
+
+        task = Task.objects.get(pk=self.old.pk)
+        self.assertEqual(task.created_at, created_at)
+        self.assertEqual(list(task.assignee.all()), [self.user])
+        self.assertEqual(
+            list(task.comments.values_list("pk", flat=True)), [self.comment.pk]
+        )
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(archive.archive(90), 0)
+
+    def test_restore_brings_back_mentions_notifications_and_reminders(self):
+        get_user_model().objects.create_user(username="bob")
+        mentions.index.invalidate()
+        self.addCleanup(mentions.index.invalidate)
+        comment = Comment.objects.create(
+            task=self.old, author=self.user, content="@bob shipped"
+        )
+        mention = Mention.objects.get()
+        notification = Notification.objects.get()
+        Notification.objects.update(read_at=timezone.now())
+        reminder = DeadlineReminder.objects.create(
+            task=self.old, kind=ReminderKind.OVERDUE, deadline=timezone.now()
+        )
+        Task.objects.filter(pk=self.old.pk).update(
+            updated_at=timezone.now() - timedelta(days=120)
+        )
+
+        archive.archive(90)
+        self.assertFalse(Mention.objects.exists())
+        self.assertEqual(ArchivedMention.objects.get().comment_id, comment.pk)
+        self.assertEqual(ArchivedNotification.objects.get().task_id, self.old.pk)
+
+        archive.restore([self.old.pk])
+        self.assertEqual(Mention.objects.get(), mention)
+        restored = Notification.objects.get()
+        self.assertEqual(restored, notification)
+        self.assertEqual(restored.comment_id, comment.pk)
+        self.assertIsNotNone(restored.read_at)
+        self.assertEqual(DeadlineReminder.objects.get().sent_at, reminder.sent_at)
+        self.assertFalse(ArchivedMention.objects.exists())
+
+    def test_filter_unions_archive_for_closed_tasks(self):
+        archive.archive(90)
+        active = TaskFilter({"active_filter": "active"}, queryset=Task.objects.all())
+        self.assertEqual(list(active.qs), [self.open])
+
+        closed = TaskFilter(
+            {"active_filter": "deactive", "q": "release"},
+            queryset=Task.objects.all(),
+        ).qs
+        self.assertEqual(closed.count(), 1)
+        self.assertEqual(closed[0].pk, self.old.pk)
+        self.assertTrue(closed[0].is_archived)
+
+        everything = TaskFilter({"active_filter": "all"}, queryset=Task.objects.all())
+        self.assertEqual(len(everything.qs[1:3]), 2)
+        self.assertEqual(everything.qs.count(), 3)
+
+    def test_task_list_and_detail_reach_archived_tasks(self):
+        archive.archive(90)
+        self.client.login(username="archivist", password="pass12345")
+
+        response = self.client.get(reverse("task-list"), {"active_filter": "all"})
+        self.assertContains(response, "archived")
+        response = self.client.get(reverse("task-detail", kwargs={"pk": self.old.pk}))
+        self.assertRedirects(
+            response, reverse("archived-task-detail", kwargs={"pk": self.old.pk})
+        )
+
+        self.client.post(reverse("archived-task-restore", kwargs={"pk": self.old.pk}))
+        self.assertTrue(Task.objects.filter(pk=self.old.pk).exists())
+
+
+class ArchiveTreeTest(TestCase):
+    def setUp(self):
+        self.release = Task.objects.create(name="Release")
+        self.build = self.subtask("Build", self.release)
+        self.compile = self.subtask("Compile", self.build)
+        self.docs = self.subtask("Docs", self.release)
+        self.design = Task.objects.create(name="Design", status=Status.COMPLETED)
+        self.deploy = Task.objects.create(name="Deploy")
+        dependencies.add(self.build, self.design)
+        dependencies.add(self.deploy, self.build)
+        Task.objects.exclude(pk=self.docs.pk).update(
+            updated_at=timezone.now() - timedelta(days=120)
+        )
+        self.edge_created = TaskDependency.objects.get(task=self.deploy).created_at
+
+    def subtask(self, name, parent):
+        return Task.objects.create(name=name, status=Status.COMPLETED, parent=parent)
+
+    def counters(self, task):
+        return Task.objects.values_list("subtask_count", "subtasks_done").get(
+            pk=task.pk
+        )
+
+    def paths(self):
+        return dict(
+            ((ancestor, descendant), n)
+            for ancestor, descendant, n in TaskDependencyPath.objects.values_list(
+                "ancestor_id", "descendant_id", "paths"
+            )
+        )
+
+    def test_archive_keeps_parents_and_dependencies_aside(self):
+        self.assertEqual(archive.archive(90, batch_size=1), 3)
+
+        self.assertEqual(
+            set(ArchivedTask.objects.values_list("pk", "parent_id")),
+            {
+                (self.build.pk, self.release.pk),
+                (self.compile.pk, self.build.pk),
+                (self.design.pk, None),
+            },
+        )
+        self.assertEqual(self.counters(self.release), (1, 1))
+        self.assertEqual(Task.objects.get(pk=self.docs.pk).parent, self.release)
+        self.assertEqual(
+            set(ArchivedTaskDependency.objects.values_list("task_id", "depends_on_id")),
+            {(self.build.pk, self.design.pk), (self.deploy.pk, self.build.pk)},
+        )
+        self.assertEqual(self.paths(), {})
+
+    def test_subtask_closed_recently_holds_back_its_ancestors(self):
+        Task.objects.filter(pk=self.compile.pk).update(updated_at=timezone.now())
+        archive.archive(90)
+        self.assertEqual(
+            list(ArchivedTask.objects.values_list("pk", flat=True)), [self.design.pk]
+        )
+        self.assertEqual(self.counters(self.release), (3, 3))
+
+    def test_restore_puts_tasks_back_under_parents_and_dependencies(self):
+        archive.archive(90)
+        archive.restore([self.build.pk, self.compile.pk])
+
+        build = Task.objects.get(pk=self.build.pk)
+        compile_ = Task.objects.get(pk=self.compile.pk)
+        self.assertEqual(build.parent, self.release)
+        self.assertEqual(compile_.parent, build)
+        self.assertEqual(compile_.depth, 2)
+        self.assertEqual(self.counters(self.release), (3, 3))
+        self.assertEqual(self.counters(build), (1, 1))
+        self.assertEqual(
+            list(TaskDependency.objects.values_list("task_id", "created_at")),
+            [(self.deploy.pk, self.edge_created)],
+        )
+        self.assertEqual(self.paths(), dependencies.compute())
+        # The edge to the design waits for it to be restored too.
+        archive.restore([self.design.pk])
+        self.assertEqual(
+            self.paths(),
+            {
+                (self.design.pk, self.build.pk): 1,
+                (self.design.pk, self.deploy.pk): 1,
+                (self.build.pk, self.deploy.pk): 1,
+            },
+        )
+        self.assertFalse(ArchivedTaskDependency.objects.exists())
+
+    def test_restored_subtask_of_archived_parent_becomes_root(self):
+        archive.archive(90)
+        archive.restore([self.compile.pk])
+        compile_ = Task.objects.get(pk=self.compile.pk)
+        self.assertIsNone(compile_.parent)
+        self.assertEqual((compile_.path, compile_.depth), (f"{compile_.pk:010d}/", 0))
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import assignment
+from tasks.models import Position, Priority, Status, Task, TaskType
+
+
+class LoadBalancerTest(TestCase):
+    def setUp(self):
+        assignment.balancer.invalidate()
+        self.addCleanup(assignment.balancer.invalidate)
+        self.bug = TaskType.objects.create(name="Bug")
+        self.chore = TaskType.objects.create(name="Chore")
+        developer = Position.objects.create(name="Developer")
+        developer.task_types.add(self.bug)
+        designer = Position.objects.create(name="Designer")
+        workers = get_user_model().objects
+        self.ann = workers.create_user(username="ann", position=developer)
+        self.bob = workers.create_user(username="bob", position=developer)
+        self.cid = workers.create_user(username="cid", position=designer)
+
+    def assertInSync(self):
+        fresh = assignment.LoadBalancer()
+        fresh.pick(None)
+        self.assertEqual(assignment.balancer._loads, fresh._loads)
+
+    def test_weight_grows_with_priority_and_deadline(self):
+        soon = timezone.now() + timedelta(hours=3)
+        later = timezone.now() + timedelta(days=30)
+        self.assertGreater(
+            assignment.weight(Status.PENDING, Priority.HIGH, later),
+            assignment.weight(Status.PENDING, Priority.LOW, later),
+        )
+        self.assertGreater(
+            assignment.weight(Status.PENDING, Priority.LOW, soon),
+            assignment.weight(Status.PENDING, Priority.LOW, later),
+        )
+        self.assertEqual(assignment.weight(Status.COMPLETED, Priority.HIGH, soon), 0)
+
+    def test_picks_the_least_loaded_eligible_worker(self):
+        busy = Task.objects.create(name="Outage", priority=Priority.CRITICAL)
+        busy.assignee.add(self.ann)
+        self.assertEqual(assignment.balancer.pick(self.bug.pk), self.bob.pk)
+        # Nobody handles chores explicitly, so every worker is eligible.
+        self.assertIn(
+            assignment.balancer.pick(self.chore.pk), {self.bob.pk, self.cid.pk}
+        )
+
+    def test_task_events_move_loads(self):
+        task = Task.objects.create(name="Crash", task_type=self.bug)
+        assignment.balancer.pick(self.bug.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignee.add(self.ann)
+        self.assertInSync()
+
+        task = Task.objects.get(pk=task.pk)
+        task.priority = Priority.CRITICAL
+        task.deadline = timezone.now() + timedelta(hours=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertInSync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.assigned_tasks.remove(task)
+        self.assertInSync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignee.add(self.bob)
+            Task.objects.get(pk=task.pk).delete()
+        self.assertInSync()
+
+    def test_bulk_assignment_balances_in_one_pass(self):
+        tasks = [
+            Task.objects.create(name=f"Bug {n}", task_type=self.bug) for n in range(10)
+        ]
+        plan = assignment.balancer.assign_many(tasks)
+        self.assertEqual(
+            {pk: len(task_ids) for pk, task_ids in plan.items()},
+            {self.ann.pk: 5, self.bob.pk: 5},
+        )
+        self.assertFalse(assignment.unassigned_tasks().exists())
+        self.assertInSync()
+
+
+class AutoAssignViewTest(TestCase):
+    def setUp(self):
+        assignment.balancer.invalidate()
+        self.addCleanup(assignment.balancer.invalidate)
+        bug = TaskType.objects.create(name="Bug")
+        support = Position.objects.create(name="Support")
+        support.task_types.add(bug)
+        lead = get_user_model().objects.create_user(username="lead")
+        self.worker = get_user_model().objects.create_user(
+            username="worker", position=support
+        )
+        self.client.force_login(lead)
+        self.payload = {
+            "name": "Triage",
+            "description": "...",
+            "priority": "low",
+            "status": "pending",
+            "task_type": bug.pk,
+        }
+
+    def test_create_without_assignees_auto_assigns(self):
+        response = self.client.post(
+            reverse("task-create"), {**self.payload, "auto_assign": "on"}, follow=True
+        )
+        self.assertContains(response, "Assigned to worker.")
+        self.assertEqual(
+            list(Task.objects.get(name="Triage").assignee.all()), [self.worker]
+        )
+
+    def test_auto_assign_can_be_turned_off(self):
+        self.client.post(reverse("task-create"), self.payload)
+        self.assertFalse(Task.objects.get(name="Triage").assignee.exists())
+
+    def test_auto_assign_starts_unchecked(self):
+        response = self.client.get(reverse("task-create"))
+        self.assertFalse(response.context["form"]["auto_assign"].value())
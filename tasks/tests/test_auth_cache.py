@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.backends import CachedModelBackend, worker_cache_key
+from tasks.models import Position
+from tasks.sessions import SessionStore
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+class CachedModelBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.position = Position.objects.create(name="Developer")
+        self.user = get_user_model().objects.create_user(
+            username="cached", password="password123", position=self.position
+        )
+        self.backend = CachedModelBackend()
+
+    def test_second_lookup_hits_no_database(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertIn("Developer", str(user))
+
+    def test_worker_save_invalidates_once_committed(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.set_password("another-password")
+            self.user.save()
+            # Evicting before the commit would let a concurrent request cache
+            # the old row again.
+            self.assertIsNotNone(cache.get(worker_cache_key(self.user.pk)))
+        self.assertTrue(callbacks)
+        user = self.backend.get_user(self.user.pk)
+        self.assertEqual(user.password, self.user.password)
+
+    def test_position_change_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.position.name = "Lead"
+            self.position.save()
+        self.assertIn("Lead", str(self.backend.get_user(self.user.pk)))
+
+    def test_position_delete_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.position.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk).position)
+
+    def test_inactive_worker_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+@override_settings(SESSION_DB_WRITE_INTERVAL=300)
+class WriteBehindSessionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_updates_within_interval_stay_in_cache(self):
+        session = SessionStore()
+        session["step"] = 1
+        session.save(must_create=True)
+        key = session.session_key
+
+        session["step"] = 2
+        session.save()
+
+        stored = Session.objects.get(session_key=key).get_decoded()
+        self.assertEqual(stored["step"], 1)
+        self.assertEqual(SessionStore(key)["step"], 2)
+
+    def test_delete_removes_session_everywhere(self):
+        session = SessionStore()
+        session["step"] = 1
+        session.save(must_create=True)
+        key = session.session_key
+        session.delete()
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertNotIn("step", SessionStore(key))
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60, SESSION_DB_WRITE_INTERVAL=300)
+class CachedPageViewTest(TestCase):
+    def test_warm_page_view_makes_no_auth_queries(self):
+        cache.clear()
+        get_user_model().objects.create_user(username="viewer", password="pass12345")
+        self.client.login(username="viewer", password="pass12345")
+        self.client.get(reverse("position-list"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("position-list"))
+        self.assertEqual(response.status_code, 200)
+        auth_queries = [
+            q["sql"]
+            for q in queries.captured_queries
+            if "django_session" in q["sql"] or '"tasks_worker"' in q["sql"]
+        ]
+        self.assertEqual(auth_queries, [])
@@ -0,0 +1,199 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from tasks.comment_stream import (
+    EVENT_CREATED,
+    EVENT_DELETED,
+    EVENT_UPDATED,
+    CommentBroker,
+    CommentEvent,
+    CommentStream,
+    broker,
+    parse_last_event_id,
+)
+from tasks.models import Task, TaskType, Comment
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        fields = dict(
+            line.split(": ", 1) for line in chunk.strip().splitlines() if ": " in line
+        )
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class CommentBrokerTest(TestCase):
+    def test_publish_reaches_subscribers_of_the_task_only(self):
+        local_broker = CommentBroker()
+        received = []
+        local_broker.subscribe(1, received.append)
+        local_broker.publish(1, "first")
+        local_broker.publish(2, "other task")
+        self.assertEqual(received, ["first"])
+
+    def test_unsubscribe_forgets_empty_tasks(self):
+        local_broker = CommentBroker()
+        callback = local_broker.subscribe(1, print)
+        local_broker.unsubscribe(1, callback)
+        self.assertFalse(local_broker.has_subscribers(1))
+
+
+@override_settings(COMMENT_STREAM_POLL_INTERVAL=0.01, COMMENT_STREAM_MAX_DURATION=0.05)
+class CommentStreamTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="streamer", password="password123"
+        )
+        self.task = Task.objects.create(
+            name="Incident", task_type=TaskType.objects.create(name="Bug")
+        )
+        self.since = timezone.now() - timedelta(minutes=1)
+
+    def test_poll_returns_comments_after_high_water_mark_once(self):
+        Comment.objects.create(task=self.task, author=self.user, content="Hi")
+        stream = CommentStream(self.task.pk, self.since)
+
+        events = parse_events(stream.poll())
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][0], EVENT_CREATED)
+        self.assertIn("Hi", events[0][1]["html"])
+        self.assertEqual(stream.poll(), [])
+
+    def test_published_events_are_deduplicated_against_poll(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, content="A")
+        stream = CommentStream(self.task.pk, self.since)
+        event = CommentEvent.from_comment(EVENT_CREATED, comment)
+
+        self.assertTrue(stream.accept(event))
+        self.assertFalse(stream.accept(event))
+        self.assertEqual(stream.poll(), [])
+
+    def test_poll_picks_up_edits_and_deletes_from_other_processes(self):
+        edited = Comment.objects.create(task=self.task, author=self.user, content="A")
+        doomed = Comment.objects.create(task=self.task, author=self.user, content="B")
+        stream = CommentStream(self.task.pk, self.since)
+        stream.poll()
+        stream.changes_since = timezone.now()
+
+        doomed_id = doomed.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.content = "A, edited"
+            edited.save()
+            doomed.delete()
+        events = parse_events(stream.poll())
+        self.assertEqual(
+            [(kind, data["id"]) for kind, data in events],
+            [(EVENT_UPDATED, edited.pk), (EVENT_DELETED, doomed_id)],
+        )
+        self.assertIn("A, edited", events[0][1]["html"])
+        self.assertEqual(stream.poll(), [])
+
+    def test_last_event_id_from_the_client_is_checked(self):
+        self.assertEqual(parse_last_event_id(self.since.isoformat()), self.since)
+        before = timezone.now()
+        self.assertGreaterEqual(parse_last_event_id("2024-13-45T99:00:00"), before)
+        self.assertGreaterEqual(parse_last_event_id("not a date"), before)
+        naive = parse_last_event_id("2024-05-01T12:00:00")
+        self.assertTrue(timezone.is_aware(naive))
+        stream = CommentStream(self.task.pk, naive)
+        self.assertEqual(len(stream.poll()), 0)
+
+    def test_deleted_event_carries_no_html(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, content="A")
+        payload = CommentEvent.from_comment(EVENT_DELETED, comment).encode()
+        self.assertEqual(parse_events([payload]), [("deleted", {"id": comment.pk})])
+
+    def test_delete_inside_a_transaction_publishes_the_comment_id(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, content="A")
+        comment_id = comment.pk
+        received = []
+        callback = broker.subscribe(self.task.pk, received.append)
+        self.addCleanup(broker.unsubscribe, self.task.pk, callback)
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            comment.delete()
+        self.assertEqual(
+            [(event.kind, event.comment_id) for event in received],
+            [(EVENT_DELETED, comment_id)],
+        )
+
+    def test_stream_view_resumes_from_last_event_id(self):
+        Comment.objects.create(task=self.task, author=self.user, content="Missed")
+        self.client.login(username="streamer", password="password123")
+
+        response = self.client.get(
+            reverse("task-comment-stream", kwargs={"pk": self.task.pk}),
+            HTTP_LAST_EVENT_ID=self.since.isoformat(),
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertTrue(chunks[0].startswith("retry:"))
+        self.assertEqual(parse_events(chunks)[0][0], EVENT_CREATED)
+
+
+@override_settings(COMMENT_STREAM_POLL_INTERVAL=0.01, COMMENT_STREAM_MAX_DURATION=0.05)
+class AsyncCommentStreamTest(TransactionTestCase):
+    """Polls run on pool threads, with their own connections."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="streamer")
+        self.task = Task.objects.create(name="Incident")
+
+    def test_async_stream_receives_published_events(self):
+        since = timezone.now() - timedelta(minutes=1)
+        comment = Comment.objects.create(task=self.task, author=self.user, content="A")
+        stream = CommentStream(self.task.pk, since)
+
+        async def consume():
+            chunks = []
+            async for chunk in stream.aevents():
+                chunks.append(chunk)
+                if len(chunks) == 1:
+                    broker.publish(self.task.pk, CommentEvent(EVENT_DELETED, 42))
+            return chunks
+
+        chunks = async_to_sync(consume)()
+        events = parse_events(chunks)
+        self.assertEqual(
+            (events[0][0], events[0][1]["id"]), (EVENT_CREATED, comment.pk)
+        )
+        self.assertIn(("deleted", {"id": 42}), events)
+        self.assertFalse(broker.has_subscribers(self.task.pk))
+
+
+class AsyncCommentPostTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username="poster", password="pass12345")
+        self.task = Task.objects.create(name="Task")
+        self.client.login(username="poster", password="pass12345")
+        self.url = reverse("task-detail", kwargs={"pk": self.task.pk})
+
+    def test_ajax_post_returns_comment_fragment(self):
+        response = self.client.post(
+            self.url,
+            {"content": "Async hello"},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        comment = Comment.objects.get(content="Async hello")
+        self.assertEqual(response.status_code, 201)
+        self.assertTemplateUsed(response, "includes/comment.html")
+        self.assertContains(
+            response, f'data-comment-id="{comment.pk}"', status_code=201
+        )
+        self.assertContains(response, "Edit", status_code=201)
+
+    def test_ajax_post_invalid_returns_errors(self):
+        response = self.client.post(
+            self.url, {"content": ""}, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("content", response.json()["errors"])
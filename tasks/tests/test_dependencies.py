@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks import dependencies
+from tasks.models import Status, Task, TaskDependencyPath
+
+
+def stored_paths():
+    return {
+        (row.ancestor_id, row.descendant_id): row.paths
+        for row in TaskDependencyPath.objects.all()
+    }
+
+
+class DependencyClosureTest(TestCase):
+    def setUp(self):
+        self.design, self.api, self.ui, self.release = (
+            Task.objects.create(name=name)
+            for name in ("Design", "API", "UI", "Release")
+        )
+
+    def assertInSync(self):
+        self.assertEqual(stored_paths(), dependencies.compute())
+
+    def build_diamond(self):
+        dependencies.add(self.api, self.design)
+        dependencies.add(self.ui, self.design)
+        dependencies.add(self.release, self.api)
+        dependencies.add(self.release, self.ui)
+
+    def test_diamond_counts_both_routes(self):
+        self.build_diamond()
+        self.assertInSync()
+        self.assertEqual(stored_paths()[(self.design.pk, self.release.pk)], 2)
+
+        dependencies.remove(self.release.pk, self.api.pk)
+        self.assertInSync()
+        self.assertEqual(stored_paths()[(self.design.pk, self.release.pk)], 1)
+        dependencies.remove(self.release.pk, self.ui.pk)
+        self.assertInSync()
+        self.assertNotIn((self.design.pk, self.release.pk), stored_paths())
+
+    def test_counts_stay_small_across_deep_diamonds(self):
+        # 40 diamonds in a row: 2**40 chains from the first task to the last.
+        top = first = self.design
+        diamonds = []
+        for n in range(40):
+            left, right, join = (
+                Task.objects.create(name=f"{side} {n}")
+                for side in ("Left", "Right", "Join")
+            )
+            for side in (left, right):
+                dependencies.add(side, top)
+                dependencies.add(join, side)
+            diamonds.append((top, left, right, join))
+            top = join
+        self.assertInSync()
+        self.assertEqual(max(stored_paths().values()), 2)
+        self.assertEqual(stored_paths()[(first.pk, top.pk)], 2)
+
+        start, left, right, join = diamonds[0]
+        dependencies.remove(left.pk, start.pk)
+        self.assertInSync()
+        self.assertIn((first.pk, top.pk), stored_paths())
+        dependencies.remove(join.pk, right.pk)
+        self.assertInSync()
+        self.assertNotIn((first.pk, top.pk), stored_paths())
+        self.assertFalse(dependencies.blocked_by(first).filter(pk=top.pk).exists())
+
+    def test_transitive_lookups_are_single_queries(self):
+        self.build_diamond()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(dependencies.blocked_by(self.design)),
+                {self.api, self.ui, self.release},
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(dependencies.blockers(self.release)),
+                {self.design, self.api, self.ui},
+            )
+
+    def test_cycles_are_refused(self):
+        self.build_diamond()
+        self.assertTrue(dependencies.creates_cycle(self.design.pk, self.release.pk))
+        with self.assertRaises(ValueError):
+            dependencies.add(self.design, self.release)
+        self.assertInSync()
+
+    def test_deleting_a_middle_task_disconnects_its_chains(self):
+        dependencies.add(self.api, self.design)
+        dependencies.add(self.release, self.api)
+        self.api.delete()
+        self.assertInSync()
+        self.assertFalse(dependencies.blocked_by(self.design).exists())
+
+    def test_rebuild_repairs_drift(self):
+        self.build_diamond()
+        TaskDependencyPath.objects.update(paths=7)
+        self.assertGreater(dependencies.rebuild(), 0)
+        self.assertInSync()
+
+    @override_settings(TASK_DEPENDENCIES_AUTO_BLOCK=True)
+    def test_auto_block_follows_blocker_status(self):
+        dependencies.add(self.api, self.design)
+        self.api.refresh_from_db()
+        self.assertEqual(self.api.status, Status.BLOCKED)
+
+        design = Task.objects.get(pk=self.design.pk)
+        design.status = Status.COMPLETED
+        design.save()
+        self.api.refresh_from_db()
+        self.assertEqual(self.api.status, Status.PENDING)
+
+        design.status = Status.IN_PROGRESS
+        design.save()
+        self.api.refresh_from_db()
+        self.assertEqual(self.api.status, Status.BLOCKED)
+
+
+class DependencyViewTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username="planner", password="pass12345")
+        self.client.login(username="planner", password="pass12345")
+        self.first = Task.objects.create(name="First")
+        self.second = Task.objects.create(name="Second")
+
+    def add(self, task, depends_on):
+        return self.client.post(
+            reverse("task-dependency-create", kwargs={"pk": task.pk}),
+            {"depends_on": depends_on.pk},
+            follow=True,
+        )
+
+    def test_add_show_and_remove(self):
+        self.add(self.second, self.first)
+        response = self.client.get(reverse("task-detail", kwargs={"pk": self.first.pk}))
+        self.assertContains(response, "Waiting on this (1 in total)")
+
+        self.client.post(
+            reverse(
+                "task-dependency-delete",
+                kwargs={"pk": self.second.pk, "depends_on_pk": self.first.pk},
+            )
+        )
+        self.assertFalse(self.second.dependencies.exists())
+
+    def test_cycle_is_reported(self):
+        self.add(self.second, self.first)
+        response = self.add(self.first, self.second)
+        self.assertContains(response, "already waits on this one")
+        self.assertFalse(self.first.dependencies.exists())
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks import digests
+from tasks.models import DigestRun, Status, Task
+
+
+class FlakyBackend(EmailBackend):
+    """Accepts ``budget`` batches, then fails like a dropped SMTP connection."""
+
+    def __init__(self, budget, **kwargs):
+        super().__init__(**kwargs)
+        self.budget = budget
+
+    def send_messages(self, messages):
+        if self.budget == 0:
+            raise ConnectionError("SMTP connection dropped")
+        self.budget -= 1
+        return super().send_messages(messages)
+
+
+class DigestTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        workers = get_user_model().objects
+        self.ann = workers.create_user(username="ann", email="ann@example.com")
+        self.bob = workers.create_user(username="bob", email="bob@example.com")
+        self.cid = workers.create_user(username="cid")
+        self.today = timezone.localdate()
+        late = Task.objects.create(name="Late report", deadline=now - timedelta(days=2))
+        today = Task.objects.create(
+            name="Standup notes",
+            deadline=timezone.make_aware(
+                timezone.datetime.combine(self.today, timezone.datetime.max.time())
+            ),
+        )
+        done = Task.objects.create(
+            name="Old bug", deadline=now - timedelta(days=1), status=Status.COMPLETED
+        )
+        self.new = Task.objects.create(
+            name="Fresh feature", deadline=now + timedelta(days=9)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            late.assignee.add(self.ann)
+            today.assignee.add(self.ann)
+            done.assignee.add(self.ann, self.bob)
+            self.new.assignee.add(self.bob, self.cid)
+
+    def send(self, **kwargs):
+        return digests.send(self.today, **kwargs)
+
+    def test_digest_lists_overdue_due_today_and_new_tasks(self):
+        run = self.send()
+        self.assertEqual(run.sent, 2)
+        self.assertIsNotNone(run.finished_at)
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(by_recipient), {"ann@example.com", "bob@example.com"})
+        ann = by_recipient["ann@example.com"].body
+        self.assertIn("Overdue\n  - Late report", ann)
+        self.assertIn("Due today\n  - Standup notes", ann)
+        self.assertNotIn("Old bug", ann)
+        bob = by_recipient["bob@example.com"]
+        self.assertIn("Newly assigned to you\n  - Fresh feature", bob.body)
+        self.assertIn(f"/tasks/{self.new.pk}/", bob.body)
+        self.assertIn("0 overdue, 0 due today, 1 new", bob.subject)
+
+    def test_batch_costs_the_same_queries_for_any_number_of_workers(self):
+        assigned = digests.assigned_since(
+            timezone.now() - timedelta(days=1), timezone.now()
+        )
+        workers = digests.workers_after(1, None, None, 100)
+        with self.assertNumQueries(2):
+            collected = digests.collect(
+                workers, self.today, None, None, assigned=assigned
+            )
+        self.assertEqual(len(collected[self.ann.pk].due_today), 1)
+
+    def test_runs_cover_disjoint_ranges(self):
+        self.send(end_id=self.bob.pk)
+        self.send(first_id=self.bob.pk)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["ann@example.com", "bob@example.com"],
+        )
+
+    def test_one_run_per_day_for_an_open_ended_range(self):
+        self.send()
+        self.send()
+        self.assertEqual(DigestRun.objects.count(), 1)
+        run = DigestRun.objects.get()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DigestRun.objects.create(
+                day=run.day,
+                first_worker_id=run.first_worker_id,
+                since=run.since,
+                cutoff=run.cutoff,
+            )
+
+    def test_crashed_run_resumes_after_the_last_accepted_batch(self):
+        with self.assertRaises(ConnectionError):
+            self.send(batch_size=1, connection=FlakyBackend(budget=1))
+        run = DigestRun.objects.get()
+        self.assertEqual(run.last_worker_id, self.ann.pk)
+        self.assertIsNone(run.finished_at)
+
+        run = self.send(batch_size=1)
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            [
+                "ann@example.com",
+                "bob@example.com",
+            ],
+        )
+        self.assertEqual(run.sent, 2)
+        self.assertIsNotNone(run.finished_at)
+
+        # A finished run sends nothing more.
+        self.send()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_command_reports_the_run(self):
+        out = StringIO()
+        call_command("send_digests", "--batch-size", "1", stdout=out)
+        self.assertIn("2 digest(s) sent.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
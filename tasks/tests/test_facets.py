@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import facets
+from tasks.filters import TaskFilter
+from tasks.models import Priority, Status, Task, TaskType
+
+
+class FacetCountTest(TestCase):
+    def setUp(self):
+        self.bug = TaskType.objects.create(name="Bug")
+        self.ann = get_user_model().objects.create_user(username="ann")
+        tomorrow = timezone.now() + timedelta(days=1)
+        Task.objects.create(
+            name="Crash", task_type=self.bug, priority=Priority.HIGH, deadline=tomorrow
+        ).assignee.add(self.ann)
+        Task.objects.create(name="Leak", task_type=self.bug, priority=Priority.HIGH)
+        Task.objects.create(
+            name="Typo", priority=Priority.LOW, status=Status.IN_PROGRESS
+        )
+        Task.objects.create(name="Old", priority=Priority.HIGH, status=Status.COMPLETED)
+
+    def filterset(self, **params):
+        filterset = TaskFilter(
+            {"active_filter": "active", **params}, queryset=Task.objects.all()
+        )
+        self.assertTrue(filterset.is_valid())
+        return filterset
+
+    def test_each_facet_ignores_only_its_own_filter(self):
+        counts = facets.compute(self.filterset(priority=Priority.HIGH))
+        self.assertEqual(counts["priority"], {Priority.HIGH: 2, Priority.LOW: 1})
+        self.assertEqual(counts["status"], {Status.PENDING: 2})
+        self.assertEqual(counts["task_type"], {str(self.bug.pk): 2})
+        self.assertEqual(counts["assignee"], {str(self.ann.pk): 1})
+        self.assertEqual(counts["deadline_filter"]["tomorrow"], 1)
+        self.assertEqual(counts["deadline_filter"]["all"], 2)
+
+    def test_one_query_per_facet(self):
+        filterset = self.filterset(q="a")
+        with self.assertNumQueries(len(facets.FACETS)):
+            facets.compute(filterset)
+
+    @override_settings(TASK_FACET_BUDGET_MS=0)
+    def test_facets_over_budget_are_dropped(self):
+        filterset = self.filterset()
+        counts = facets.compute(filterset)
+        self.assertTrue(all(value is None for value in counts.values()))
+        facets.label_options(filterset.form, counts)
+        self.assertIn(
+            (Priority.HIGH, "High"), filterset.form.fields["priority"].choices
+        )
+
+    def test_timeout_is_set_on_the_database_counts_are_read_from(self):
+        replica = mock.MagicMock(vendor="postgresql")
+        with mock.patch.object(
+            facets.router, "db_for_read", return_value="replica1"
+        ), mock.patch.object(
+            facets, "connections", {"replica1": replica}
+        ), mock.patch.object(
+            facets.transaction, "atomic"
+        ) as atomic:
+            self.assertEqual(facets.within(0.25, lambda: 7), 7)
+        atomic.assert_called_once_with(using="replica1")
+        replica.cursor().__enter__().execute.assert_called_once_with(
+            "SET LOCAL statement_timeout = %s", [250]
+        )
+
+    @override_settings(TASK_FACET_CACHE_SECONDS=60)
+    def test_counts_are_cached_until_a_task_changes(self):
+        params = {"active_filter": "active"}
+        facets.invalidate()
+        facets.for_filterset(self.filterset(), params)
+        with self.assertNumQueries(0):
+            facets.for_filterset(self.filterset(), params)
+        facets.invalidate()
+        with self.assertNumQueries(len(facets.FACETS)):
+            facets.for_filterset(self.filterset(), params)
+
+    def test_task_list_labels_options(self):
+        get_user_model().objects.create_user(username="lead", password="pass12345")
+        self.client.login(username="lead", password="pass12345")
+        response = self.client.get(reverse("task-list"), {"status": Status.PENDING})
+        self.assertContains(response, "High (2)")
+        self.assertContains(response, "In Progress (1)")
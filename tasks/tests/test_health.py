@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from tasks import health
+
+
+@override_settings(ALLOWED_HOSTS=["tasks.example.com"], SECURE_SSL_REDIRECT=True)
+class HealthCheckTest(TestCase):
+    def setUp(self):
+        health.readiness.reset()
+        self.addCleanup(health.readiness.reset)
+
+    def test_liveness_skips_host_checks_and_redirects(self):
+        response = self.client.get("/healthz", HTTP_HOST="10.0.0.7")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"ok")
+
+    def test_ready_only_after_warm_up(self):
+        self.assertEqual(self.client.get("/readyz").status_code, 503)
+        self.assertTrue(health.readiness.wait(timeout=10))
+        self.assertEqual(self.client.get("/readyz").status_code, 200)
+
+    def test_code_loads_without_touching_the_database(self):
+        with self.assertNumQueries(0):
+            health.load_code()
+
+    def test_failed_warm_up_is_retried(self):
+        with mock.patch("tasks.health.warm_up", side_effect=RuntimeError):
+            with self.assertLogs("tasks.health", "ERROR"):
+                self.client.get("/readyz")
+                self.assertFalse(health.readiness.wait(timeout=0.5))
+        self.assertEqual(self.client.get("/readyz").status_code, 503)
+        self.assertTrue(health.readiness.wait(timeout=10))
@@ -0,0 +1,151 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks import hierarchy
+from tasks.models import CLOSED_STATUSES, Status, Task, TaskType
+
+
+def expected_tree():
+    """Paths, depths and counters recomputed from the parent links alone."""
+    parents = dict(Task.objects.values_list("pk", "parent_id"))
+    statuses = dict(Task.objects.values_list("pk", "status"))
+    expected = {}
+    for pk in parents:
+        chain = [pk]
+        while parents[chain[-1]] is not None:
+            chain.append(parents[chain[-1]])
+        expected[pk] = {
+            "path": "".join(hierarchy.segment(node) for node in reversed(chain)),
+            "depth": len(chain) - 1,
+            "subtask_count": 0,
+            "subtasks_done": 0,
+        }
+    for pk, row in expected.items():
+        for ancestor in hierarchy.ancestor_ids(row["path"]):
+            expected[ancestor]["subtask_count"] += 1
+            expected[ancestor]["subtasks_done"] += statuses[pk] in CLOSED_STATUSES
+    return expected
+
+
+class HierarchyTest(TestCase):
+    def setUp(self):
+        self.epic = Task.objects.create(name="Epic")
+        self.story = Task.objects.create(name="Story", parent=self.epic)
+        self.subtask = Task.objects.create(name="Subtask", parent=self.story)
+        self.other = Task.objects.create(name="Other")
+
+    def assertInSync(self):
+        stored = {
+            row.pop("pk"): row
+            for row in Task.objects.values(
+                "pk", "path", "depth", "subtask_count", "subtasks_done"
+            )
+        }
+        self.assertEqual(stored, expected_tree())
+
+    def reload(self, task):
+        return Task.objects.get(pk=task.pk)
+
+    def test_create_and_close_keep_counters(self):
+        self.assertInSync()
+        subtask = self.reload(self.subtask)
+        subtask.status = Status.COMPLETED
+        subtask.save()
+        self.assertInSync()
+        self.assertEqual(self.reload(self.epic).progress, 50)
+
+        subtask.status = Status.IN_PROGRESS
+        subtask.save()
+        self.assertInSync()
+
+    def test_move_rewrites_the_subtree(self):
+        story = self.reload(self.story)
+        story.parent = self.other
+        story.save()
+        self.assertInSync()
+        self.assertTrue(self.reload(self.subtask).path.startswith(self.other.path))
+
+        story.parent = None
+        story.save()
+        self.assertInSync()
+        self.assertEqual(self.reload(self.subtask).depth, 1)
+
+    def test_moving_under_own_subtree_is_refused(self):
+        epic = self.reload(self.epic)
+        epic.parent = self.subtask
+        with self.assertRaises(ValueError):
+            epic.save()
+        self.assertInSync()
+
+    def test_delete_hands_subtasks_to_the_grandparent(self):
+        self.reload(self.story).delete()
+        self.assertEqual(self.reload(self.subtask).parent_id, self.epic.pk)
+        self.assertInSync()
+
+        Task.objects.filter(pk__in=[self.epic.pk, self.subtask.pk]).delete()
+        self.assertInSync()
+
+    def test_stale_instance_does_not_clobber_counters(self):
+        stale = self.reload(self.epic)
+        Task.objects.create(name="Late subtask", parent=self.epic)
+        stale.name = "Renamed epic"
+        stale.save()
+        self.assertInSync()
+
+    def test_tree_reads_are_single_queries(self):
+        subtask, epic = self.reload(self.subtask), self.reload(self.epic)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [task.name for task in hierarchy.breadcrumb(subtask)],
+                ["Epic", "Story"],
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(hierarchy.descendants(epic)),
+                {self.story, self.subtask},
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                hierarchy.subtree_status_counts(epic),
+                {Status.PENDING: 2},
+            )
+
+
+class HierarchyViewTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username="planner", password="pass12345")
+        self.client.login(username="planner", password="pass12345")
+        self.epic = Task.objects.create(name="Epic")
+        self.fields = {
+            "description": "...",
+            "priority": "low",
+            "status": "pending",
+            "task_type": TaskType.objects.create(name="Feature").pk,
+        }
+
+    def test_subtask_created_from_the_form(self):
+        response = self.client.get(reverse("task-create") + f"?parent={self.epic.pk}")
+        self.assertEqual(response.context["form"].initial["parent"], self.epic.pk)
+
+        self.client.post(
+            reverse("task-create"),
+            {"name": "Story", "parent": self.epic.pk, **self.fields},
+        )
+        story = Task.objects.get(name="Story")
+        self.assertEqual(story.parent_id, self.epic.pk)
+
+        response = self.client.get(reverse("task-detail", kwargs={"pk": story.pk}))
+        self.assertEqual(response.context["breadcrumb"], [self.epic])
+        response = self.client.get(reverse("task-detail", kwargs={"pk": self.epic.pk}))
+        self.assertContains(response, "0 of 1 closed")
+
+    def test_form_refuses_a_cycle(self):
+        story = Task.objects.create(name="Story", parent=self.epic)
+        response = self.client.post(
+            reverse("task-update", kwargs={"pk": self.epic.pk}),
+            {"name": "Epic", "parent": story.pk, **self.fields},
+        )
+        self.assertContains(response, "cannot be moved under itself")
+        self.epic.refresh_from_db()
+        self.assertIsNone(self.epic.parent_id)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import ical
+from tasks.models import Status, Task
+
+
+class CalendarFeedTestMixin:
+    def setUp(self):
+        cache.clear()
+        workers = get_user_model().objects
+        self.worker = workers.create_user(username="ann", password="pw")
+        self.other = workers.create_user(username="bob")
+        self.deadline = timezone.now() + timedelta(days=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(
+                name="Ship, finally; v2", deadline=self.deadline
+            )
+            self.task.assignee.add(self.worker)
+            undated = Task.objects.create(name="Someday")
+            undated.assignee.add(self.worker)
+            done = Task.objects.create(
+                name="Shipped", deadline=self.deadline, status=Status.COMPLETED
+            )
+            done.assignee.add(self.worker)
+        self.url = reverse(
+            "worker-calendar", kwargs={"token": ical.make_token(self.worker.pk)}
+        )
+
+    def fetch(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        # Consumes the stream, so the cached feed is stored as on a server.
+        response.text = response.getvalue().decode()
+        return response
+
+    def test_feed_lists_open_tasks_with_deadlines(self):
+        response = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = response.text
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+        self.assertIn("SUMMARY:Ship\\, finally\\; v2\r\n", body)
+        self.assertIn(f"DTSTART:{ical.stamp(self.deadline)}\r\n", body)
+        self.assertNotIn("Someday", body)
+        self.assertNotIn("Shipped", body)
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.fetch()["ETag"]
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_deadline_change_changes_the_feed(self):
+        etag = self.fetch()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.deadline += timedelta(days=1)
+            self.task.save()
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(ical.stamp(self.task.deadline), response.text)
+
+    def test_unassigning_changes_the_feed(self):
+        etag = self.fetch()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.worker.assigned_tasks.remove(self.task)
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("BEGIN:VEVENT", response.text)
+
+    def test_forged_or_inactive_tokens_are_not_found(self):
+        forged = reverse("worker-calendar", kwargs={"token": f"{self.other.pk}:x"})
+        self.assertEqual(self.client.get(forged).status_code, 404)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.worker.is_active = False
+            self.worker.save()
+        self.assertEqual(self.fetch().status_code, 404)
+
+
+class UncachedCalendarFeedTest(CalendarFeedTestMixin, TestCase):
+    pass
+
+
+@override_settings(CALENDAR_CACHE_SECONDS=60)
+class CachedCalendarFeedTest(CalendarFeedTestMixin, TestCase):
+    def test_polls_cost_no_queries(self):
+        etag = self.fetch()["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.fetch(if_none_match=etag).status_code, 304)
+            self.assertEqual(self.fetch().status_code, 200)
+
+    def test_other_workers_changes_keep_the_version(self):
+        etag = self.fetch()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(name="Not mine", deadline=self.deadline)
+            task.assignee.add(self.other)
+            task.deadline += timedelta(days=1)
+            task.save()
+        self.assertEqual(self.fetch(if_none_match=etag).status_code, 304)
+
+
+class IcalTest(TestCase):
+    def test_long_lines_fold_at_75_octets(self):
+        folded = ical.fold("DESCRIPTION:" + "é" * 100)
+        lines = folded.split("\r\n")[:-1]
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertEqual("".join(line[1:] for line in lines[1:]), "é" * (100 - 31))
+
+    def test_worker_detail_shows_the_feed_only_to_its_worker(self):
+        worker = get_user_model().objects.create_user(username="ann", password="pw")
+        other = get_user_model().objects.create_user(username="bob")
+        self.client.force_login(worker)
+        token = ical.make_token(worker.pk)
+        response = self.client.get(reverse("worker-detail", args=[worker.pk]))
+        self.assertContains(response, token)
+        response = self.client.get(reverse("worker-detail", args=[other.pk]))
+        self.assertNotContains(response, "Deadline Calendar")
@@ -0,0 +1,160 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks import jobs
+from tasks.models import Job, JobStatus
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@jobs.job
+def remember(value):
+    with calls_lock:
+        calls.append(value)
+
+
+@jobs.job(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_follow_priority_then_due_time(self):
+        now = timezone.now()
+        low = remember.enqueue(["low"], run_at=now - timedelta(minutes=5))
+        high = remember.enqueue(["high"], priority=10)
+        later = remember.enqueue(["later"], delay=timedelta(hours=1))
+        older = remember.enqueue(["older"], run_at=now - timedelta(minutes=10))
+        self.assertEqual(jobs.claim("a", 10), [high.pk, older.pk, low.pk])
+        self.assertEqual(jobs.claim("b", 10), [])
+        later.refresh_from_db()
+        self.assertEqual(later.status, JobStatus.QUEUED)
+
+    def test_runners_claim_disjoint_jobs(self):
+        for n in range(5):
+            remember.enqueue([n])
+        first = jobs.claim("a", 3)
+        second = jobs.claim("b", 3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(
+            Job.objects.filter(
+                worker="a", status=JobStatus.RUNNING, attempts=1
+            ).count(),
+            3,
+        )
+
+    def test_skip_locked_claims_in_one_transaction(self):
+        remember.enqueue([1])
+        remember.enqueue([2])
+        with mock.patch.object(
+            connection.features, "has_select_for_update_skip_locked", True
+        ):
+            self.assertEqual(len(jobs.claim("a", 5)), 2)
+        self.assertFalse(Job.objects.filter(status=JobStatus.QUEUED).exists())
+
+    def test_successful_jobs_are_done(self):
+        job = remember.enqueue(["hello"])
+        jobs.claim("a", 1)
+        succeeded, wait, run = jobs.execute(job.pk, "a")
+        self.assertTrue(succeeded)
+        self.assertGreaterEqual(wait, 0)
+        self.assertEqual(calls, ["hello"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.DONE)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_jobs_back_off_then_fail(self):
+        job = explode.enqueue()
+        jobs.claim("a", 1)
+        with self.assertLogs("tasks.jobs", "ERROR"):
+            self.assertFalse(jobs.execute(job.pk, "a")[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        jobs.claim("a", 1)
+        with self.assertLogs("tasks.jobs", "ERROR"):
+            jobs.execute(job.pk, "a")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+    def test_lapsed_leases_are_queued_again(self):
+        job = remember.enqueue(["again"])
+        jobs.claim("dead", 1)
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.recover(), 1)
+        self.assertEqual(jobs.claim("alive", 1), [job.pk])
+
+    def test_unknown_jobs_are_refused(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("tasks.nope")
+
+    def test_job_stats_reports_depth_and_runners(self):
+        job = remember.enqueue(["x"])
+        remember.enqueue(["y"], delay=timedelta(hours=1))
+        jobs.claim("runner-1", 1)
+        jobs.execute(job.pk, "runner-1")
+        out = StringIO()
+        call_command("job_stats", stdout=out)
+        self.assertIn("0 due (1 delayed), 0 running", out.getvalue())
+        self.assertIn("runner-1", out.getvalue())
+
+
+@override_settings(JOB_LEASE_SECONDS=30)
+class RunnerTest(TransactionTestCase):
+    def test_runs_jobs_concurrently_until_idle(self):
+        calls.clear()
+        for n in range(6):
+            remember.enqueue([n])
+        reports = []
+        runner = jobs.Runner(concurrency=3, interval=0.05, worker="test-runner")
+        runner.run(until_idle=True, report=reports.append)
+        self.assertEqual(sorted(calls), list(range(6)))
+        self.assertEqual(Job.objects.filter(status=JobStatus.DONE).count(), 6)
+        self.assertIn("test-runner: ", reports[-1])
+        self.assertIn("(6 done, 0 raised), queue latency p50", reports[-1])
+
+    def test_racing_claims_take_each_job_once(self):
+        for n in range(40):
+            remember.enqueue([n])
+        claimed = {}
+        start = threading.Barrier(4)
+
+        def take(worker):
+            start.wait()
+            try:
+                while ids := jobs.claim(worker, 3):
+                    claimed.setdefault(worker, []).extend(ids)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=take, args=(f"runner-{n}",)) for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [pk for pks in claimed.values() for pk in pks]
+        self.assertEqual(len(ids), 40)
+        self.assertEqual(set(ids), set(Job.objects.values_list("pk", flat=True)))
+        for worker, pks in claimed.items():
+            self.assertEqual(
+                set(Job.objects.filter(worker=worker).values_list("pk", flat=True)),
+                set(pks),
+            )
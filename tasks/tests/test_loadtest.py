@@ -0,0 +1,70 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase
+
+from tasks import loadtest
+from tasks.models import Task
+
+
+class RecorderTest(SimpleTestCase):
+    def test_summary_reports_percentiles_and_error_rates(self):
+        recorder = loadtest.Recorder()
+        for ms in range(1, 101):
+            recorder.add("task-list", ms / 1000)
+        recorder.add("index", 0.005, error="HTTP 500")
+        recorder.add("index", 0.007)
+        summary = recorder.summary(duration=2)
+        self.assertEqual(summary["requests"], 102)
+        self.assertEqual(summary["throughput_rps"], 51)
+        task_list = summary["endpoints"]["task-list"]
+        self.assertEqual(
+            (task_list["p50_ms"], task_list["p95_ms"], task_list["p99_ms"]),
+            (50, 95, 99),
+        )
+        self.assertEqual(summary["endpoints"]["index"]["error_rate"], 0.5)
+        self.assertEqual(summary["endpoints"]["index"]["first_error"], "HTTP 500")
+
+
+class SyntheticWorkerTest(TestCase):
+    def test_created_tasks_are_visited_later(self):
+        worker = loadtest.SyntheticWorker(
+            "http://testserver", "ann", "pw", [], [1], loadtest.Recorder()
+        )
+
+        async def call(name, method, path, data=None, **kwargs):
+            task = await sync_to_async(Task.objects.create)(name=data["name"])
+            worker.posted = task.pk
+            return mock.Mock(status=302)
+
+        with mock.patch.object(worker, "call", call), mock.patch.object(
+            loadtest.random, "choices", return_value=["task-create"]
+        ):
+            async_to_sync(worker.step)()
+        self.assertEqual(worker.created, [worker.posted])
+
+
+class LoadTestCommandTest(LiveServerTestCase):
+    def test_drives_the_site_and_saves_results(self):
+        output = Path(tempfile.mkdtemp()) / "results.json"
+        out = StringIO()
+        call_command(
+            "loadtest",
+            url=self.live_server_url,
+            users=2,
+            duration=1,
+            seed=5,
+            output=str(output),
+            stdout=out,
+        )
+        results = json.loads(output.read_text())
+        self.assertEqual(results["failed_workers"], [])
+        self.assertEqual(results["endpoints"]["login"]["errors"], 0)
+        self.assertGreater(results["requests"], 4)
+        self.assertEqual(results["errors"], 0, results["endpoints"])
+        self.assertIn("req/s", out.getvalue())
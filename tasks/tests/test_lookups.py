@@ -0,0 +1,100 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tasks.filters import TaskFilter
+from tasks.forms import TaskForm
+from tasks import lookups
+from tasks.lookups import generation_key, tables
+from tasks.models import Position, Task, TaskType
+
+
+@override_settings(LOOKUP_CACHE_SECONDS=60)
+class LookupCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        tables.clear()
+        self.addCleanup(tables.clear)
+        self.bug = TaskType.objects.create(name="Bug")
+        self.task = Task.objects.create(name="Crash", task_type=self.bug)
+
+    def test_foreign_keys_are_served_from_the_cache(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(Task.objects.get(pk=self.task.pk).task_type, self.bug)
+        with self.assertNumQueries(1):
+            self.assertEqual(Task.objects.get(pk=self.task.pk).task_type, self.bug)
+
+        # The shared tier survives a cold process.
+        tables.clear()
+        task = Task.objects.get(pk=self.task.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(task.task_type.name, "Bug")
+
+    def test_generation_is_rechecked_only_when_it_expires(self):
+        tables.get(TaskType, self.bug.pk)
+        with mock.patch.object(lookups.cache, "get", wraps=cache.get) as shared:
+            for _ in range(3):
+                self.assertEqual(tables.get(TaskType, self.bug.pk).name, "Bug")
+            shared.assert_not_called()
+
+        # Another process renames the type; this one notices once its copy
+        # of the generation expires.
+        TaskType.objects.filter(pk=self.bug.pk).update(name="Defect")
+        cache.set(generation_key(TaskType), 5, None)
+        self.assertEqual(tables.get(TaskType, self.bug.pk).name, "Bug")
+        later = lookups.time.monotonic() + 60
+        with mock.patch.object(lookups.time, "monotonic", return_value=later):
+            self.assertEqual(tables.get(TaskType, self.bug.pk).name, "Defect")
+
+    def test_callers_get_their_own_copy(self):
+        Task.objects.get(pk=self.task.pk).task_type.name = "Changed"
+        self.assertEqual(Task.objects.get(pk=self.task.pk).task_type.name, "Bug")
+
+    def test_saving_or_deleting_a_row_invalidates_its_table(self):
+        Task.objects.get(pk=self.task.pk).task_type
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bug.name = "Defect"
+            self.bug.save()
+        self.assertEqual(Task.objects.get(pk=self.task.pk).task_type.name, "Defect")
+
+        developer = Position.objects.create(name="Developer")
+        worker = get_user_model().objects.create_user(
+            username="ann", position=developer
+        )
+        self.assertIn("Developer", str(get_user_model().objects.get(pk=worker.pk)))
+        with self.captureOnCommitCallbacks(execute=True):
+            developer.delete()
+        self.assertIsNone(get_user_model().objects.get(pk=worker.pk).position)
+
+    def test_dropdowns_list_and_validate_from_the_cache(self):
+        TaskForm().as_p()
+        with self.assertNumQueries(0):
+            self.assertIn(f'value="{self.bug.pk}"', str(TaskForm()["task_type"]))
+            filterset = TaskFilter(
+                {"task_type": self.bug.pk}, queryset=Task.objects.none()
+            )
+            self.assertTrue(filterset.is_valid())
+        self.assertEqual(filterset.form.cleaned_data["task_type"], self.bug)
+        filterset = TaskFilter({"task_type": 999}, queryset=Task.objects.none())
+        self.assertFalse(filterset.is_valid())
+
+    @override_settings(LOOKUP_CACHE_SECONDS=0)
+    def test_disabled_cache_reads_the_database(self):
+        task = Task.objects.get(pk=self.task.pk)
+        with self.assertNumQueries(1):
+            task.task_type
+
+    def test_field_migrates_as_a_plain_foreign_key(self):
+        _, path, _, _ = Task._meta.get_field("task_type").deconstruct()
+        self.assertEqual(path, "django.db.models.ForeignKey")
+
+    def test_benchmark_reports_queries_saved(self):
+        get_user_model().objects.create_superuser(username="admin")
+        out = StringIO()
+        call_command("benchmark_lookups", stdout=out)
+        self.assertIn("task detail", out.getvalue())
+        self.assertIn("per request", out.getvalue())
@@ -0,0 +1,136 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks import markup, mentions, rerender
+from tasks.models import Comment, Task
+
+
+class RenderTest(TestCase):
+    def test_renders_markdown(self):
+        self.assertEqual(
+            markup.render("Some **bold** and `code`\nnext line\n\n- one\n- two"),
+            "<p>Some <strong>bold</strong> and <code>code</code><br>\nnext line</p>\n"
+            "<ul>\n<li>one</li>\n<li>two</li>\n</ul>",
+        )
+
+    def test_sanitizes_html_and_links(self):
+        html = markup.render(
+            '<script>alert(1)</script><b onclick="x()">hi</b> '
+            "[bad](javascript:alert(1)) [ok](https://example.com) "
+            '<a href="/x" class="mention other">@fake</a>'
+        )
+        self.assertNotIn("script", html)
+        self.assertNotIn("onclick", html)
+        self.assertNotIn("javascript", html)
+        self.assertNotIn("other", html)
+        self.assertIn(
+            '<a href="https://example.com" rel="noopener noreferrer nofollow">ok</a>',
+            html,
+        )
+
+    def test_links_mentions_outside_code_only(self):
+        text = "see `@bob`, [@bob](https://example.com) and _@bob_\n```\n@bob\n```"
+        links = [
+            (start, start + 4, "/workers/2/")
+            for start in range(len(text))
+            if text.startswith("@bob", start)
+        ]
+        self.assertEqual(
+            markup.render(text, links),
+            "<p>see <code>@bob</code>, "
+            '<a href="https://example.com" rel="noopener noreferrer nofollow">'
+            "@bob</a> and <em>"
+            '<a class="mention" href="/workers/2/" rel="noopener noreferrer nofollow">'
+            "@bob</a></em></p>\n<pre><code>@bob\n</code></pre>",
+        )
+
+    def test_key_changes_with_text_and_version(self):
+        key = markup.key("text")
+        self.assertFalse(markup.is_stale(key, "text"))
+        self.assertTrue(markup.is_stale(key, "other text"))
+        with mock.patch.object(markup, "VERSION", markup.VERSION + 1):
+            self.assertTrue(markup.is_stale(key, "text"))
+
+
+class StoredHtmlTest(TestCase):
+    def setUp(self):
+        self.worker = get_user_model().objects.create_user(
+            username="ann", password="pw"
+        )
+        self.task = Task.objects.create(name="Ship it", description="Do *it*")
+        self.addCleanup(mentions.index.invalidate)
+
+    def test_description_renders_only_when_it_changes(self):
+        self.assertEqual(self.task.description_html, "<p>Do <em>it</em></p>")
+        self.assertEqual(self.task.description_html_key, markup.key("Do *it*"))
+        with mock.patch.object(markup, "render", wraps=markup.render) as render:
+            self.task.name = "Ship it now"
+            self.task.save()
+            render.assert_not_called()
+            self.task.description = "Do **it**"
+            self.task.save()
+            render.assert_called_once_with("Do **it**")
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.description_html, "<p>Do <strong>it</strong></p>")
+
+    def test_task_detail_does_not_render_markdown(self):
+        Comment.objects.create(task=self.task, author=self.worker, content="> quoted")
+        self.client.login(username="ann", password="pw")
+        with mock.patch.object(markup, "render", side_effect=AssertionError):
+            response = self.client.get(
+                reverse("task-detail", kwargs={"pk": self.task.pk})
+            )
+        self.assertContains(response, "<p>Do <em>it</em></p>")
+        self.assertContains(response, "<blockquote>\n<p>quoted</p>\n</blockquote>")
+
+
+class RenderMarkupCommandTest(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(username="author")
+        self.ann = get_user_model().objects.create_user(username="ann")
+        mentions.index.invalidate()
+        self.addCleanup(mentions.index.invalidate)
+        self.tasks = [
+            Task.objects.create(name=f"Task {n}", description=f"Step *{n}*")
+            for n in range(5)
+        ]
+        self.comment = Comment.objects.create(
+            task=self.tasks[0], author=self.author, content="**@ann** look"
+        )
+        # As if rendered before there was a renderer.
+        Task.objects.update(description_html="", description_html_key="")
+        Comment.objects.update(content_html="", content_html_key="")
+
+    def test_renders_stale_rows_across_processes(self):
+        out = StringIO()
+        call_command(
+            "render_markup", processes=2, batch_size=2, stdout=out, stderr=StringIO()
+        )
+        self.assertIn("Rendered 5 tasks under version", out.getvalue())
+        self.assertIn("Rendered 1 comments", out.getvalue())
+        self.assertIn("Rendered 0 archived comments", out.getvalue())
+        task = Task.objects.get(pk=self.tasks[3].pk)
+        self.assertEqual(task.description_html, "<p>Step <em>3</em></p>")
+        self.assertEqual(task.description_html_key, markup.key("Step *3*"))
+        self.comment.refresh_from_db()
+        self.assertIn(
+            f'<strong><a class="mention" href="{self.ann.get_absolute_url()}"',
+            self.comment.content_html,
+        )
+
+        out = StringIO()
+        call_command("render_markup", processes=1, stdout=out)
+        self.assertIn("Rendered 0 tasks", out.getvalue())
+
+    def test_skips_rows_edited_since_they_were_read(self):
+        target = rerender.TARGETS["tasks"]
+        batch = next(rerender.batches(target, batch_size=10))
+        Task.objects.filter(pk=self.tasks[0].pk).update(description="Edited")
+        stored = rerender.save(target, batch, markup.render_rows(batch))
+        self.assertEqual(stored, 4)
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].pk).description_html, "")
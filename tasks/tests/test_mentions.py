@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks import mentions
+from tasks.models import Comment, Mention, Notification, NotificationKind, Task
+
+
+def link(worker):
+    return (
+        f'<a class="mention" href="{worker.get_absolute_url()}" '
+        f'rel="noopener noreferrer nofollow">@{worker.username}</a>'
+    )
+
+
+class MentionIndexTest(TestCase):
+    def setUp(self):
+        workers = get_user_model().objects
+        self.ann = workers.create_user(username="ann")
+        self.anna = workers.create_user(username="anna")
+        self.dev = workers.create_user(username="ann.dev")
+        workers.create_user(username="gone", is_active=False)
+        self.index = mentions.index
+        self.index.invalidate()
+        self.addCleanup(self.index.invalidate)
+
+    def names(self, text):
+        return [text[start:end] for start, end, _ in self.index.find(text)]
+
+    def test_finds_longest_username_at_a_word_boundary(self):
+        self.assertEqual(
+            self.names("@ann, @anna and @ann.dev: see @annabel and @ann."),
+            ["@ann", "@anna", "@ann.dev", "@ann"],
+        )
+        found = self.index.find("cc @anna")
+        self.assertEqual(found, [(3, 8, self.anna.pk)])
+
+    def test_ignores_emails_unknown_and_inactive_workers(self):
+        self.assertEqual(self.names("mail ann@example.com, ping @gone or @bob @"), [])
+
+    def test_ignores_code(self):
+        self.assertEqual(
+            self.names("`@ann` @anna ``a `@ann` b``\n```\n@ann.dev\n```\n\\`@ann`"),
+            ["@anna", "@ann"],
+        )
+
+    def test_updates_follow_worker_changes(self):
+        self.index.find("@")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.anna.username = "hanna"
+            self.anna.save()
+            get_user_model().objects.create_user(username="zed")
+            self.dev.delete()
+        # The index kept its build and followed the changes.
+        self.assertEqual(
+            self.names("@anna @hanna @zed @ann.dev"), ["@hanna", "@zed", "@ann"]
+        )
+        self.assertEqual(self.index._root["a"]["n"]["n"].keys(), {mentions.END})
+        self.index.update(self.ann.pk, "ann", is_active=False)
+        self.assertEqual(self.names("@ann"), [])
+
+
+class CommentMentionTest(TestCase):
+    def setUp(self):
+        workers = get_user_model().objects
+        self.author = workers.create_user(username="author", password="pw")
+        self.ann = workers.create_user(username="ann")
+        self.bob = workers.create_user(username="bob")
+        self.task = Task.objects.create(name="Ship it")
+        mentions.index.invalidate()
+        self.addCleanup(mentions.index.invalidate)
+
+    def test_comment_stores_linked_html_and_notifies_in_bulk(self):
+        mentions.index.find("@")
+        # The comment, the webhook subscriber check and one insert each for
+        # the mentions and the notifications.
+        with self.assertNumQueries(4):
+            comment = Comment.objects.create(
+                task=self.task,
+                author=self.author,
+                content="@ann & @bob <b>look</b>\n@ann @author",
+            )
+        self.assertEqual(
+            comment.content_html,
+            f"<p>{link(self.ann)} &amp; {link(self.bob)} look<br>\n"
+            f"{link(self.ann)} {link(self.author)}</p>",
+        )
+        self.assertEqual(
+            set(comment.mentions.values_list("worker__username", flat=True)),
+            {"ann", "bob"},
+        )
+        notification = Notification.objects.get(recipient=self.ann)
+        self.assertEqual(notification.kind, NotificationKind.MENTION)
+        self.assertEqual(notification.actor, self.author)
+        self.assertEqual(notification.comment, comment)
+        self.assertFalse(Notification.objects.filter(recipient=self.author).exists())
+
+    def test_editing_only_notifies_newly_mentioned_workers(self):
+        comment = Comment.objects.create(
+            task=self.task, author=self.author, content="@ann"
+        )
+        comment.content = "@bob"
+        comment.save()
+        self.assertEqual(
+            list(Mention.objects.values_list("worker__username", flat=True)), ["bob"]
+        )
+        self.assertEqual(Notification.objects.count(), 2)
+        comment.save()
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_mention_in_code_is_shown_as_code_and_notifies_nobody(self):
+        comment = Comment.objects.create(
+            task=self.task, author=self.author, content="see `@bob` and @ann"
+        )
+        self.assertEqual(
+            comment.content_html,
+            f"<p>see <code>@bob</code> and {link(self.ann)}</p>",
+        )
+        self.assertEqual(
+            list(Notification.objects.values_list("recipient__username", flat=True)),
+            ["ann"],
+        )
+
+    def test_task_detail_links_mentions(self):
+        self.client.login(username="author", password="pw")
+        self.client.post(
+            reverse("task-detail", kwargs={"pk": self.task.pk}),
+            {"content": "thanks @ann"},
+        )
+        response = self.client.get(reverse("task-detail", kwargs={"pk": self.task.pk}))
+        self.assertContains(
+            response,
+            f"<p>thanks {link(self.ann)}</p>",
+        )
+
+    def test_notification_list_marks_notifications_read(self):
+        Comment.objects.create(task=self.task, author=self.author, content="@ann hi")
+        self.ann.set_password("pw")
+        self.ann.save()
+        self.client.login(username="ann", password="pw")
+        response = self.client.get(reverse("notification-list"))
+        self.assertContains(response, "mentioned you on")
+        self.assertContains(response, "Ship it")
+        self.assertIsNotNone(Notification.objects.get().read_at)
@@ -1,3 +1,6 @@
+from unittest import mock
+
+from django.db.models.signals import post_save, pre_save
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -79,6 +82,21 @@ class TaskModelTest(TestCase):
         )
         self.assertEqual(task.status, Status.PENDING)
 
+    def test_saving_a_deferred_task_writes_only_loaded_fields(self):
+        task = Task.objects.only("id", "name", "status").get(pk=self.task.pk)
+        task.name = "Finish it"
+        # The save itself; handlers may read what they need.
+        with mock.patch.object(pre_save, "send"), mock.patch.object(
+            post_save, "send"
+        ), self.assertNumQueries(1) as queries:
+            task.save()
+        update = queries.captured_queries[0]["sql"]
+        self.assertTrue(update.startswith("UPDATE"))
+        self.assertNotIn('"description"', update)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.name, "Finish it")
+        self.assertEqual(self.task.description, "Finish Django project before deadline")
+
     def test_task_get_absolute_url(self):
         url = self.task.get_absolute_url()
         self.assertEqual(url, reverse("task-detail", kwargs={"pk": self.task.pk}))
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import DeadlineReminder, ReminderKind, Status, Task
+from tasks.reminders import (
+    BaseReminderSender,
+    ReminderScheduler,
+    acquire_lease,
+)
+
+
+class RecordingSender(BaseReminderSender):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, task, kind):
+        self.sent.append((task.pk, kind))
+
+
+class ReminderSchedulerTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.sender = RecordingSender()
+        self.task = Task.objects.create(
+            name="Release", deadline=self.now + timedelta(minutes=30)
+        )
+        self.task.assignee.add(get_user_model().objects.create_user(username="ann"))
+
+    def scheduler(self):
+        return ReminderScheduler(
+            self.sender, lead_time=timedelta(hours=1), horizon=timedelta(days=1)
+        )
+
+    def test_upcoming_then_overdue(self):
+        scheduler = self.scheduler()
+        scheduler.run_once(self.now)
+        self.assertEqual(self.sender.sent, [(self.task.pk, ReminderKind.UPCOMING)])
+
+        scheduler.run_once(self.now + timedelta(minutes=31))
+        self.assertEqual(self.sender.sent[-1], (self.task.pk, ReminderKind.OVERDUE))
+        self.assertEqual(DeadlineReminder.objects.count(), 2)
+
+    def test_reminders_are_not_repeated_after_restart(self):
+        self.scheduler().run_once(self.now)
+        self.scheduler().run_once(self.now)
+        self.assertEqual(len(self.sender.sent), 1)
+
+    def test_moved_deadline_replaces_planned_reminders(self):
+        scheduler = self.scheduler()
+        scheduler.run_once(self.now - timedelta(hours=2))
+        self.task.deadline = self.now + timedelta(hours=5)
+        self.task.save()
+
+        scheduler.run_once(self.now)
+        self.assertEqual(self.sender.sent, [])
+        scheduler.run_once(self.now + timedelta(hours=4, minutes=1))
+        self.assertEqual(self.sender.sent, [(self.task.pk, ReminderKind.UPCOMING)])
+
+    def test_closed_tasks_are_skipped(self):
+        self.task.status = Status.COMPLETED
+        self.task.save()
+        self.scheduler().run_once(self.now + timedelta(hours=1))
+        self.assertEqual(self.sender.sent, [])
+
+    def test_changes_are_scanned_from_the_first_load(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            updated_at=self.now - timedelta(days=3)
+        )
+        scheduler = self.scheduler()
+        scheduler.run_once(self.now)
+        self.assertEqual(scheduler.watermark, self.now)
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.deadline = self.now + timedelta(hours=5)
+        task.save()
+        scheduler.run_once(self.now + timedelta(seconds=1))
+        self.assertEqual(scheduler.watermark, task.updated_at)
+        self.assertEqual(scheduler.planned[task.pk], task.deadline)
+
+    def test_tasks_beyond_horizon_load_as_it_slides(self):
+        later = Task.objects.create(name="Later", deadline=self.now + timedelta(days=2))
+        scheduler = self.scheduler()
+        scheduler.run_once(self.now)
+        self.assertNotIn(later.pk, scheduler.planned)
+
+        scheduler.run_once(self.now + timedelta(days=1, hours=1))
+        self.assertIn(later.pk, scheduler.planned)
+
+
+class SchedulerLeaseTest(TestCase):
+    def test_only_one_holder_leads_until_expiry(self):
+        self.assertTrue(acquire_lease("reminders", "a", timedelta(minutes=1)))
+        self.assertFalse(acquire_lease("reminders", "b", timedelta(minutes=1)))
+        self.assertTrue(acquire_lease("reminders", "a", timedelta(minutes=1)))
+
+        self.assertTrue(acquire_lease("reminders", "a", timedelta(seconds=-1)))
+        self.assertTrue(acquire_lease("reminders", "b", timedelta(minutes=1)))
+
+    @override_settings(REMINDER_SENDER="tasks.tests.test_reminders.RecordingSender")
+    def test_run_scheduler_once(self):
+        Task.objects.create(name="Soon", deadline=timezone.now() + timedelta(minutes=5))
+        out = StringIO()
+        call_command("run_scheduler", "--once", stdout=out)
+        self.assertIn("Sent 1 reminder(s).", out.getvalue())
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import rollups
+from tasks.models import Priority, Status, Task, TaskRollup, TaskType
+
+
+def stored_counts():
+    return {
+        (row.dimension, row.value, row.status): row.count
+        for row in TaskRollup.objects.exclude(count=0)
+    }
+
+
+class RollupMaintenanceTest(TestCase):
+    def setUp(self):
+        self.bug = TaskType.objects.create(name="Bug")
+        self.ann = get_user_model().objects.create_user(username="ann")
+        self.bob = get_user_model().objects.create_user(username="bob")
+        self.task = Task.objects.create(
+            name="Crash",
+            task_type=self.bug,
+            priority=Priority.HIGH,
+            deadline=timezone.now() - timedelta(days=2),
+        )
+
+    def assertInSync(self):
+        self.assertEqual(stored_counts(), dict(+rollups.compute()))
+
+    def test_create_update_and_delete_stay_in_sync(self):
+        self.assertInSync()
+        self.task.assignee.add(self.ann, self.bob)
+        self.assertInSync()
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = Status.IN_PROGRESS
+        task.priority = Priority.CRITICAL
+        task.deadline = None
+        task.save()
+        self.assertInSync()
+
+        task.assignee.remove(self.bob)
+        self.assertInSync()
+        task.delete()
+        self.assertInSync()
+
+    def test_tasks_loaded_without_tracked_fields_stay_in_sync(self):
+        task = Task.objects.only("id", "name").get(pk=self.task.pk)
+        task.priority = Priority.LOW
+        # The save, one read of the unloaded old values and the rollup moves.
+        with self.assertNumQueries(7):
+            task.save(update_fields=["priority"])
+        self.assertInSync()
+
+        task = Task.objects.defer("status", "deadline").get(pk=self.task.pk)
+        task.status = Status.COMPLETED
+        task.save()
+        self.assertInSync()
+        self.assertEqual(rollups.open_counts(rollups.PRIORITY), {})
+
+    def test_changes_from_the_worker_side_stay_in_sync(self):
+        other = Task.objects.create(name="Other", status=Status.REVIEWING)
+        self.ann.assigned_tasks.add(self.task, other)
+        self.assertInSync()
+        self.ann.assigned_tasks.clear()
+        self.assertInSync()
+
+    def test_overdue_and_open_counts(self):
+        Task.objects.create(
+            name="Done",
+            status=Status.COMPLETED,
+            deadline=timezone.now() - timedelta(days=3),
+        )
+        self.assertEqual(rollups.overdue_count(), 1)
+        self.assertEqual(
+            rollups.open_counts(rollups.PRIORITY), {"high": {"pending": 1}}
+        )
+
+    def test_reconcile_repairs_drift(self):
+        TaskRollup.objects.filter(dimension=rollups.PRIORITY).update(count=99)
+        call_command("reconcile_rollups", stdout=open("/dev/null", "w"))
+        self.assertInSync()
+
+
+class DashboardViewTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="manager", password="password123"
+        )
+        self.client.login(username="manager", password="password123")
+        for i in range(5):
+            Task.objects.create(name=f"Task {i}").assignee.add(user)
+
+    def test_dashboard_reads_rollups(self):
+        self.client.get(reverse("dashboard"))
+        # Seven rollup reads, the user, and the sidebar's saved filters.
+        with self.assertNumQueries(9):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["open_total"], 5)
+        self.assertEqual(response.context["assignee_rows"][0]["label"], "manager")
@@ -0,0 +1,92 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from tasks import routers
+from tasks.models import Task
+
+
+@override_settings(DATABASE_REPLICAS=["replica1", "replica2"])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        routers.health.reset()
+        self.addCleanup(routers.health.reset)
+        self.router = routers.ReplicaRouter()
+
+    def test_reads_go_to_a_healthy_replica_inside_reading(self):
+        routers.health.record("replica1", False)
+        routers.health.record("replica2", True)
+        self.assertIsNone(self.router.db_for_read(Task))
+        with routers.reading():
+            self.assertEqual(self.router.db_for_read(Task), "replica2")
+            self.assertEqual(self.router.db_for_write(Task), DEFAULT_DB_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Task))
+
+    def test_primary_serves_reads_when_no_replica_is_healthy(self):
+        routers.health.record("replica1", False)
+        routers.health.record("replica2", False)
+        with routers.reading():
+            self.assertIsNone(self.router.db_for_read(Task))
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "tasks"))
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, "tasks"))
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_lagging_or_unreachable_replicas_are_unhealthy(self):
+        with mock.patch("tasks.routers.lag", return_value=30):
+            self.assertFalse(routers.check("replica1"))
+        with mock.patch("tasks.routers.lag", side_effect=DatabaseError):
+            self.assertFalse(routers.check("replica1"))
+        with mock.patch("tasks.routers.lag", return_value=1):
+            self.assertTrue(routers.check("replica1"))
+
+    def test_health_is_rechecked_only_when_stale(self):
+        with mock.patch("tasks.routers.check", return_value=True) as check:
+            routers.health.is_healthy("replica1")
+            routers.health.is_healthy("replica1")
+        self.assertEqual(check.call_count, 1)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="lead")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(name="Crash")
+
+    def test_read_only_pages_use_a_replica(self):
+        with mock.patch("tasks.routers.choose_replica", return_value=None) as choose:
+            self.client.get(reverse("task-list"))
+            self.client.get(reverse("task-detail", kwargs={"pk": self.task.pk}))
+            self.client.get(reverse("task-create"))
+        self.assertEqual(choose.call_count, 2)
+
+    def test_clients_stick_to_the_primary_after_writing(self):
+        response = self.client.post(
+            reverse("task-detail", kwargs={"pk": self.task.pk}), {"content": "On it"}
+        )
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+        with mock.patch("tasks.routers.choose_replica", return_value=None) as choose:
+            self.client.get(reverse("task-detail", kwargs={"pk": self.task.pk}))
+        choose.assert_not_called()
+
+
+@skipUnless(
+    "replica1" in settings.DATABASES,
+    "Set DATABASE_REPLICA_URLS to run against a replica.",
+)
+class ReplicaIntegrationTest(TransactionTestCase):
+    databases = "__all__"
+
+    def test_task_list_reads_from_the_replica(self):
+        routers.health.reset()
+        user = get_user_model().objects.create_user(username="lead")
+        self.client.force_login(user)
+        Task.objects.create(name="Replicated")
+        response = self.client.get(reverse("task-list"))
+        self.assertContains(response, "Replicated")
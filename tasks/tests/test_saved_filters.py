@@ -0,0 +1,205 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import archive, jobs, saved_filters
+from tasks.models import (
+    Job,
+    Position,
+    Priority,
+    SavedFilter,
+    SavedFilterMatch,
+    Status,
+    Task,
+    TaskType,
+)
+
+
+def run_jobs():
+    for pk in jobs.claim("test", 100):
+        jobs.execute(pk, "test")
+
+
+class SavedFilterCacheTest(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username="lead")
+        self.bug = TaskType.objects.create(name="Bug")
+        self.saved = SavedFilter.objects.create(
+            name="Critical bugs",
+            owner=self.owner,
+            params={"priority": Priority.CRITICAL, "task_type": str(self.bug.pk)},
+        )
+        saved_filters.refresh(self.saved)
+
+    def matched(self, saved=None):
+        return list(saved_filters.matched_ids(saved or self.saved))
+
+    def assertInSync(self):
+        self.assertEqual(self.matched(), saved_filters.matching_ids(self.saved.params))
+
+    def test_task_changes_update_the_matches_in_a_job(self):
+        task = Task.objects.create(
+            name="Crash", task_type=self.bug, priority=Priority.CRITICAL
+        )
+        Task.objects.create(name="Typo", task_type=self.bug)
+        self.assertEqual(self.matched(), [])
+        self.assertEqual(Job.objects.count(), 2)
+        run_jobs()
+        self.assertInSync()
+        self.assertEqual(self.matched(), [task.pk])
+
+        task = Task.objects.get(pk=task.pk)
+        task.priority = Priority.LOW
+        task.save()
+        run_jobs()
+        self.assertInSync()
+        self.assertEqual(self.matched(), [])
+
+        task.priority = Priority.CRITICAL
+        task.save()
+        run_jobs()
+        Task.objects.filter(pk=task.pk).delete()
+        self.assertInSync()
+
+    def test_unrelated_changes_skip_the_filter(self):
+        task = Task.objects.create(name="Crash", task_type=self.bug)
+        # Only the saved filters' parameters are read.
+        with self.assertNumQueries(1):
+            saved_filters.tasks_changed([task.pk], {"description"})
+
+    def test_filters_with_the_same_parameters_share_one_check(self):
+        twin = SavedFilter.objects.create(
+            name="Same", owner=self.owner, params=dict(self.saved.params)
+        )
+        saved_filters.refresh(twin)
+        task = Task.objects.create(
+            name="Crash", task_type=self.bug, priority=Priority.CRITICAL
+        )
+        with mock.patch.object(
+            saved_filters, "matching_ids", wraps=saved_filters.matching_ids
+        ) as matching:
+            saved_filters.tasks_changed([task.pk])
+        matching.assert_called_once()
+        self.assertEqual(self.matched(twin), [task.pk])
+        self.assertInSync()
+
+    def test_archived_tasks_leave_without_a_job(self):
+        task = Task.objects.create(
+            name="Crash",
+            task_type=self.bug,
+            priority=Priority.CRITICAL,
+            status=Status.COMPLETED,
+        )
+        run_jobs()
+        Task.objects.filter(pk=task.pk).update(
+            updated_at=timezone.now() - timedelta(days=120)
+        )
+        archive.archive(90)
+        self.assertFalse(SavedFilterMatch.objects.exists())
+        self.assertFalse(Job.objects.filter(status="queued").exists())
+
+    def test_assignee_changes_patch_assignee_filters(self):
+        mine = SavedFilter.objects.create(
+            name="Mine",
+            owner=self.owner,
+            params={"assignee": str(self.owner.pk), "active_filter": "active"},
+        )
+        saved_filters.refresh(mine)
+        task = Task.objects.create(name="Review")
+        task.assignee.add(self.owner)
+        run_jobs()
+        self.assertEqual(self.matched(mine), [task.pk])
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = Status.COMPLETED
+        task.save()
+        run_jobs()
+        self.assertEqual(self.matched(mine), [])
+
+    def test_stale_lists_are_recomputed_once_a_day(self):
+        Task.objects.create(name="Crash", task_type=self.bug, priority="critical")
+        SavedFilter.objects.filter(pk=self.saved.pk).update(
+            refreshed_on=timezone.localdate() - timedelta(days=1)
+        )
+        saved = SavedFilter.objects.get(pk=self.saved.pk)
+        self.assertTrue(saved_filters.refresh_if_stale(saved))
+        self.assertFalse(saved_filters.refresh_if_stale(saved))
+        self.assertEqual(SavedFilter.objects.get(pk=saved.pk).match_count, 1)
+        self.assertInSync()
+        # Until then, task changes queue no job and stale filters keep their matches.
+        SavedFilter.objects.update(refreshed_on=None)
+        queued = Job.objects.count()
+        task = Task.objects.create(
+            name="Freeze", task_type=self.bug, priority=Priority.CRITICAL
+        )
+        self.assertEqual(Job.objects.count(), queued)
+        run_jobs()
+        self.assertNotIn(task.pk, self.matched())
+
+    def test_sidebar_reads_the_stored_counts(self):
+        Task.objects.create(name="Crash", task_type=self.bug, priority="critical")
+        run_jobs()
+        SavedFilter.objects.update(refreshed_on=None)
+        with self.assertNumQueries(1):
+            [saved] = saved_filters.sidebar(self.owner)
+        self.assertEqual(saved.match_count, 1)
+        self.assertIsNone(SavedFilter.objects.get(pk=saved.pk).refreshed_on)
+
+    def test_only_changes_a_current_filter_reads_queue_a_job(self):
+        task = Task.objects.create(name="Crash", task_type=self.bug)
+        Job.objects.all().delete()
+        task.description = "Stack trace"
+        task.save()
+        self.assertFalse(Job.objects.exists())
+        task.priority = Priority.HIGH
+        task.save()
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class SavedFilterViewTest(TestCase):
+    def setUp(self):
+        support = Position.objects.create(name="Support")
+        self.lead = get_user_model().objects.create_user(
+            username="lead", password="pass12345", position=support
+        )
+        self.peer = get_user_model().objects.create_user(
+            username="peer", password="pass12345", position=support
+        )
+        self.client.login(username="lead", password="pass12345")
+        for n in range(12):
+            Task.objects.create(name=f"Urgent {n}", priority=Priority.HIGH)
+        Task.objects.create(name="Someday")
+
+    def test_save_open_and_share(self):
+        response = self.client.post(
+            reverse("saved-filter-create") + "?priority=high&page=2",
+            {"name": "Urgent", "shared": "on"},
+            follow=True,
+        )
+        saved = SavedFilter.objects.get(name="Urgent")
+        self.assertEqual(saved.params, {"priority": "high"})
+        self.assertEqual(saved.matches.count(), 12)
+        self.assertEqual(len(response.context["tasks"]), 10)
+        self.assertContains(response, '<span class="badge rounded-pill', count=1)
+
+        response = self.client.get(saved.get_absolute_url() + "?page=2")
+        self.assertEqual(
+            [task.name for task in response.context["tasks"]], ["Urgent 1", "Urgent 0"]
+        )
+
+        # Matches written by the first open of the day are read from the primary.
+        SavedFilter.objects.filter(pk=saved.pk).update(refreshed_on=None)
+        response = self.client.get(saved.get_absolute_url())
+        self.assertEqual(response.context["paginator"].object_list.db, DEFAULT_DB_ALIAS)
+        self.assertEqual(len(response.context["tasks"]), 10)
+
+        self.client.login(username="peer", password="pass12345")
+        response = self.client.get(saved.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.client.post(reverse("saved-filter-delete", kwargs={"pk": saved.pk}))
+        self.assertTrue(SavedFilter.objects.filter(pk=saved.pk).exists())
@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import rollups, snapshots
+from tasks.models import (
+    ActivityVerb,
+    Priority,
+    Status,
+    Task,
+    TaskActivity,
+    TaskSnapshot,
+)
+
+
+def snapshot_of(day, dimension):
+    return {
+        (row.value, row.status): row.count
+        for row in TaskSnapshot.objects.filter(date=day, dimension=dimension)
+    }
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+        self.ann = get_user_model().objects.create_user(username="ann")
+        self.task = Task.objects.create(
+            name="Migrate", status=Status.IN_PROGRESS, priority=Priority.HIGH
+        )
+        self.task.assignee.add(self.ann)
+        Task.objects.filter(pk=self.task.pk).update(
+            created_at=self.now - timedelta(days=3)
+        )
+        self.log(
+            self.task,
+            ActivityVerb.UPDATED,
+            {"status": ["pending", "in_progress"]},
+            days_ago=1,
+        )
+        self.log(self.task, ActivityVerb.ASSIGNED, {"assignee": ["ann"]}, days_ago=2)
+        self.new = Task.objects.create(name="Fresh")
+        self.log(self.new, ActivityVerb.CREATED, {}, days_ago=0)
+
+    def log(self, task, verb, changes, days_ago):
+        TaskActivity.objects.create(
+            task=task,
+            task_name=task.name,
+            verb=verb,
+            changes=changes,
+            created_at=self.now - timedelta(days=days_ago),
+        )
+
+    def day(self, days_ago):
+        return self.today - timedelta(days=days_ago)
+
+    def test_take_records_current_counts(self):
+        snapshots.take()
+        self.assertEqual(
+            snapshot_of(self.today, rollups.STATUS),
+            {("in_progress", "in_progress"): 1, ("pending", "pending"): 1},
+        )
+        self.assertEqual(
+            snapshot_of(self.today, rollups.ASSIGNEE),
+            {(str(self.ann.pk), "in_progress"): 1},
+        )
+        self.assertFalse(
+            TaskSnapshot.objects.filter(dimension=rollups.DEADLINE).exists()
+        )
+
+    def test_backfill_replays_activity_log(self):
+        written = snapshots.backfill(30)
+
+        self.assertEqual(written, [self.day(3), self.day(2), self.day(1)])
+        self.assertEqual(
+            snapshot_of(self.day(1), rollups.STATUS),
+            {("in_progress", "in_progress"): 1},
+        )
+        self.assertEqual(
+            snapshot_of(self.day(2), rollups.STATUS), {("pending", "pending"): 1}
+        )
+        self.assertEqual(
+            snapshot_of(self.day(2), rollups.ASSIGNEE),
+            {(str(self.ann.pk), "pending"): 1},
+        )
+        self.assertEqual(snapshot_of(self.day(3), rollups.ASSIGNEE), {})
+
+    def test_backfill_drops_tasks_created_later_without_a_log_entry(self):
+        quiet = Task.objects.create(name="Quiet")
+        Task.objects.filter(pk=quiet.pk).update(created_at=self.now - timedelta(days=2))
+        snapshots.backfill(30)
+        self.assertEqual(
+            snapshot_of(self.day(2), rollups.STATUS), {("pending", "pending"): 2}
+        )
+        self.assertEqual(
+            snapshot_of(self.day(3), rollups.STATUS), {("pending", "pending"): 1}
+        )
+
+    def test_backfill_reads_each_table_once_however_many_days(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            created_at=self.now - timedelta(days=200)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            written = snapshots.backfill(365)
+        self.assertEqual(len(written), 200)
+        reads = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertLessEqual(len(reads), 10)
+
+    def test_backfill_skips_days_already_taken(self):
+        snapshots.backfill(30)
+        self.assertEqual(snapshots.backfill(30), [])
+
+    def test_command_takes_today_and_backfills(self):
+        call_command("snapshot_tasks", stdout=open("/dev/null", "w"))
+        dates = set(TaskSnapshot.objects.values_list("date", flat=True))
+        self.assertEqual(dates, {self.today, self.day(1), self.day(2), self.day(3)})
+
+
+class TaskTrendViewTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username="viewer", password="pass12345")
+        self.client.login(username="viewer", password="pass12345")
+        today = timezone.localdate()
+        for days_ago, count in ((2, 3), (1, 5)):
+            TaskSnapshot.objects.create(
+                date=today - timedelta(days=days_ago),
+                dimension=rollups.PRIORITY,
+                value="high",
+                status=Status.PENDING,
+                count=count,
+            )
+        TaskSnapshot.objects.create(
+            date=today - timedelta(days=1),
+            dimension=rollups.PRIORITY,
+            value="low",
+            status=Status.COMPLETED,
+            count=2,
+        )
+
+    def test_series_are_aligned_on_dates(self):
+        url = reverse("task-trends", kwargs={"dimension": rollups.PRIORITY})
+        with self.assertNumQueries(2):
+            data = self.client.get(url).json()
+        self.assertEqual(len(data["dates"]), 2)
+        self.assertEqual(
+            data["series"],
+            [
+                {"value": "high", "label": "High", "counts": [3, 5]},
+                {"value": "low", "label": "Low", "counts": [0, 2]},
+            ],
+        )
+
+    def test_status_filter_and_unknown_dimension(self):
+        url = reverse("task-trends", kwargs={"dimension": rollups.PRIORITY})
+        data = self.client.get(url, {"status": "pending"}).json()
+        self.assertEqual([row["value"] for row in data["series"]], ["high"])
+        response = self.client.get(
+            reverse("task-trends", kwargs={"dimension": "deadline"})
+        )
+        self.assertEqual(response.status_code, 404)
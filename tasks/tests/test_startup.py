@@ -0,0 +1,21 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+# Generous next to the ~250 ms a warm developer machine needs, so only a
+# real regression (an eager heavy import, a slow settings read) trips it.
+SETUP_BUDGET_MS = 750
+
+
+class ProfileStartupTest(SimpleTestCase):
+    def test_setup_stays_within_budget(self):
+        out = StringIO()
+        call_command("profile_startup", budget=SETUP_BUDGET_MS, stdout=out)
+        self.assertIn("tasks", out.getvalue())
+        self.assertIn("django.contrib.admin", out.getvalue())
+
+    def test_budget_overrun_fails(self):
+        with self.assertRaisesMessage(CommandError, "over the 1 ms budget"):
+            call_command("profile_startup", runs=1, budget=1, stdout=StringIO())
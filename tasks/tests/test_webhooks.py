@@ -0,0 +1,177 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import webhooks
+from tasks.models import (
+    Comment,
+    DeliveryStatus,
+    Status,
+    Task,
+    TaskType,
+    WebhookDelivery,
+    WebhookEndpoint,
+    WebhookOutbox,
+)
+from tasks.webhook_stub import StubReceiver
+
+
+class WebhookTestMixin:
+    def setUp(self):
+        self.receiver = StubReceiver().start()
+        self.addCleanup(self.receiver.stop)
+        self.endpoint = WebhookEndpoint.objects.create(
+            url=self.receiver.url, secret="s3cret"
+        )
+        self.deliverer = webhooks.Deliverer()
+        self.addCleanup(self.deliverer.close)
+
+    def events(self):
+        return [
+            delivery["event"]
+            for received in self.receiver.received
+            for delivery in received.json["deliveries"]
+        ]
+
+
+class WebhookOutboxTest(WebhookTestMixin, TestCase):
+    def test_task_changes_are_written_to_the_outbox(self):
+        task = Task.objects.create(name="Draft")
+        task.status = Status.COMPLETED
+        task.save()
+        Comment.objects.create(
+            task=task,
+            author=get_user_model().objects.create_user(username="ann"),
+            content="Done!",
+        )
+        self.assertEqual(
+            list(WebhookOutbox.objects.order_by("pk").values_list("event", flat=True)),
+            ["task.created", "task.updated", "task.completed", "comment.created"],
+        )
+        updated = WebhookOutbox.objects.get(event="task.updated")
+        self.assertEqual(updated.payload["changed"], ["status"])
+
+    def test_unsubscribed_events_are_not_written(self):
+        self.endpoint.events = ["comment.created"]
+        self.endpoint.save()
+        Task.objects.create(name="Quiet")
+        self.assertFalse(WebhookOutbox.objects.exists())
+
+    def test_slow_subscribers_do_not_slow_requests(self):
+        self.receiver.delay = 2
+        self.client.force_login(get_user_model().objects.create_user(username="ann"))
+        task_type = TaskType.objects.create(name="Bug")
+        started = time.perf_counter()
+        response = self.client.post(
+            reverse("task-create"),
+            {
+                "name": "Fix it",
+                "description": "Soon",
+                "priority": "low",
+                "status": "pending",
+                "task_type": task_type.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(self.receiver.received, [])
+        self.assertTrue(WebhookOutbox.objects.filter(event="task.created").exists())
+
+
+class WebhookDeliveryTest(WebhookTestMixin, TestCase):
+    def test_events_are_batched_per_endpoint_and_signed(self):
+        other = StubReceiver().start()
+        self.addCleanup(other.stop)
+        WebhookEndpoint.objects.create(url=other.url, events=["task.completed"])
+        for n in range(3):
+            Task.objects.create(name=f"Task {n}")
+
+        self.assertEqual(self.deliverer.run_once(), (3, 0))
+        self.assertEqual(len(self.receiver.received), 1)
+        batch = self.receiver.received[0]
+        self.assertEqual(self.events(), ["task.created"] * 3)
+        self.assertEqual(
+            batch.headers[webhooks.SIGNATURE_HEADER],
+            webhooks.signature("s3cret", batch.body),
+        )
+        self.assertEqual(other.received, [])
+        self.assertTrue(WebhookOutbox.objects.filter(dispatched=True).exists())
+        self.assertEqual(self.deliverer.run_once(), (0, 0))
+
+    def test_endpoint_cookies_are_not_sent_back(self):
+        self.receiver.headers = {"Set-Cookie": "session=abc; Path=/"}
+        Task.objects.create(name="First")
+        self.deliverer.run_once()
+        Task.objects.create(name="Second")
+        self.deliverer.run_once()
+        self.assertEqual(len(self.receiver.received), 2)
+        self.assertNotIn("Cookie", self.receiver.received[1].headers)
+        ids = [
+            delivery["id"]
+            for received in self.receiver.received
+            for delivery in received.json["deliveries"]
+        ]
+        self.assertEqual(len(set(ids)), 2)
+
+    def test_failed_batches_back_off_and_retry(self):
+        self.receiver.status = 503
+        Task.objects.create(name="Flaky")
+        with self.assertLogs("tasks.webhooks", "WARNING") as logs:
+            self.assertEqual(self.deliverer.run_once(), (0, 1))
+        self.assertIn("failed: HTTP 503", logs.output[0])
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, DeliveryStatus.PENDING)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertEqual(delivery.last_status_code, 503)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+
+        # Not due yet.
+        self.assertEqual(self.deliverer.run_once(), (0, 0))
+
+        self.receiver.status = 200
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self.deliverer.run_once(), (1, 0))
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, DeliveryStatus.DELIVERED)
+        self.assertEqual(delivery.attempts, 2)
+        self.assertEqual(len(self.receiver.received), 2)
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=1)
+    def test_unreachable_endpoints_fail_after_max_attempts(self):
+        self.receiver.stop()
+        Task.objects.create(name="Lost")
+        with self.assertLogs("tasks.webhooks", "WARNING"):
+            self.assertEqual(self.deliverer.run_once(), (0, 1))
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, DeliveryStatus.FAILED)
+        self.assertIsNone(delivery.last_status_code)
+        self.assertIn("POST /hooks", delivery.last_error)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        with override_settings(
+            WEBHOOK_RETRY_BASE_SECONDS=10, WEBHOOK_RETRY_MAX_SECONDS=60
+        ):
+            self.assertTrue(5 <= webhooks.backoff(1) <= 10)
+            self.assertTrue(20 <= webhooks.backoff(3) <= 40)
+            self.assertTrue(30 <= webhooks.backoff(9) <= 60)
+
+    def test_prune_keeps_events_with_pending_deliveries(self):
+        Task.objects.create(name="Old")
+        self.receiver.status = 500
+        with self.assertLogs("tasks.webhooks", "WARNING"):
+            self.deliverer.run_once()
+        Task.objects.create(name="Delivered")
+        WebhookOutbox.objects.update(created_at=timezone.now() - timedelta(days=30))
+        self.receiver.status = 200
+        webhooks.dispatch()
+        delivered = WebhookDelivery.objects.filter(outbox__payload__name="Delivered")
+        webhooks.record(list(delivered), 200, "", 5)
+        webhooks.prune()
+        self.assertEqual(
+            list(WebhookOutbox.objects.values_list("payload__name", flat=True)),
+            ["Old"],
+        )
@@ -2,12 +2,23 @@ from django.urls import path
 
 from tasks.views import (
     IndexView,
+    DashboardView,
+    TaskTrendView,
     TaskTypeListView,
     TaskListView,
+    SavedFilterTaskListView,
+    SavedFilterCreateView,
+    SavedFilterDeleteView,
     WorkerListView,
     PositionListView,
     TaskDetailView,
+    TaskCommentStreamView,
+    TaskDependencyCreateView,
+    TaskDependencyDeleteView,
+    ArchivedTaskDetailView,
+    ArchivedTaskRestoreView,
     WorkerDetailView,
+    WorkerCalendarView,
     TaskCreateView,
     TaskTypeCreateView,
     TaskTypeDetailView,
@@ -24,6 +35,9 @@ from tasks.views import (
     WorkerUpdateView,
     WorkerDeleteView,
     PositionDetailView,
+    TaskActivityListView,
+    WorkerActivityListView,
+    NotificationListView,
 )
 
 urlpatterns = [
@@ -32,6 +46,16 @@ urlpatterns = [
         IndexView.as_view(),
         name="index",
     ),
+    path(
+        "dashboard/",
+        DashboardView.as_view(),
+        name="dashboard",
+    ),
+    path(
+        "dashboard/trends/<str:dimension>/",
+        TaskTrendView.as_view(),
+        name="task-trends",
+    ),
     # Task Types
     path(
         "task-types/",
@@ -69,6 +93,51 @@ urlpatterns = [
         TaskDetailView.as_view(),
         name="task-detail",
     ),
+    path(
+        "tasks/<int:pk>/comments/stream/",
+        TaskCommentStreamView.as_view(),
+        name="task-comment-stream",
+    ),
+    path(
+        "tasks/<int:pk>/activity/",
+        TaskActivityListView.as_view(),
+        name="task-activity",
+    ),
+    path(
+        "tasks/<int:pk>/dependencies/",
+        TaskDependencyCreateView.as_view(),
+        name="task-dependency-create",
+    ),
+    path(
+        "tasks/<int:pk>/dependencies/<int:depends_on_pk>/delete/",
+        TaskDependencyDeleteView.as_view(),
+        name="task-dependency-delete",
+    ),
+    path(
+        "tasks/saved/",
+        SavedFilterCreateView.as_view(),
+        name="saved-filter-create",
+    ),
+    path(
+        "tasks/saved/<int:pk>/",
+        SavedFilterTaskListView.as_view(),
+        name="saved-filter-detail",
+    ),
+    path(
+        "tasks/saved/<int:pk>/delete/",
+        SavedFilterDeleteView.as_view(),
+        name="saved-filter-delete",
+    ),
+    path(
+        "tasks/archive/<int:pk>/",
+        ArchivedTaskDetailView.as_view(),
+        name="archived-task-detail",
+    ),
+    path(
+        "tasks/archive/<int:pk>/restore/",
+        ArchivedTaskRestoreView.as_view(),
+        name="archived-task-restore",
+    ),
     path(
         "tasks/create/",
         TaskCreateView.as_view(),
@@ -136,6 +205,16 @@ urlpatterns = [
         WorkerDetailView.as_view(),
         name="worker-detail",
     ),
+    path(
+        "workers/<int:pk>/activity/",
+        WorkerActivityListView.as_view(),
+        name="worker-activity",
+    ),
+    path(
+        "calendar/<str:token>.ics",
+        WorkerCalendarView.as_view(),
+        name="worker-calendar",
+    ),
     # Comments
     path(
         "comments/<int:pk>/update/",
@@ -147,4 +226,9 @@ urlpatterns = [
         CommentDeleteView.as_view(),
         name="comment-delete",
     ),
+    path(
+        "notifications/",
+        NotificationListView.as_view(),
+        name="notification-list",
+    ),
 ]
@@ -1,13 +1,36 @@
+from datetime import timedelta
+
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import redirect
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.views import generic
 from django.views.generic import TemplateView
 from django.db.models import Q
 
+from tasks import (
+    archive,
+    assignment,
+    dependencies,
+    facets,
+    hierarchy,
+    ical,
+    rollups,
+    routers,
+    saved_filters,
+    snapshots,
+)
+from tasks.comment_stream import CommentStream, parse_last_event_id
 from tasks.filters import TaskFilter
 from tasks.forms import (
     TaskForm,
+    TaskDependencyForm,
     WorkerCreationForm,
     TaskTypeSearchForm,
     PositionSearchForm,
@@ -16,8 +39,22 @@ from tasks.forms import (
     WorkerForm,
     WorkerSearchForm,
     PositionForm,
+    SavedFilterForm,
+)
+from tasks.models import (
+    CLOSED_STATUSES,
+    ArchivedTask,
+    Comment,
+    Notification,
+    Position,
+    Priority,
+    SavedFilter,
+    Status,
+    Task,
+    TaskActivity,
+    TaskType,
+    Worker,
 )
-from tasks.models import TaskType, Task, Worker, Position, Comment
 
 
 class SearchListViewMixin:
@@ -41,7 +78,21 @@ class SearchListViewMixin:
         return context
 
 
-class IndexView(LoginRequiredMixin, TemplateView):
+class ReplicaReadMixin:
+    """Mixin for read-only pages: serves GET requests from a database replica
+    unless the client wrote recently, including the template rendering."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if routers.wants_primary(request):
+            return super().dispatch(request, *args, **kwargs)
+        with routers.reading():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
+
+
+class IndexView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Home page view that displays tasks assigned to the current user with active statuses."""
 
     template_name = "tasks/index.html"
@@ -66,7 +117,113 @@ class IndexView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class TaskTypeListView(LoginRequiredMixin, SearchListViewMixin, generic.ListView):
+class DashboardView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
+    """Open-task counts by status, priority, type and assignee, read from rollups."""
+
+    template_name = "tasks/dashboard.html"
+    top_assignees = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        statuses = [status for status in Status if status not in CLOSED_STATUSES]
+
+        def rows(table, labels):
+            result = []
+            for value, counts in table.items():
+                result.append(
+                    {
+                        "label": labels.get(value, value),
+                        "counts": [counts.get(status, 0) for status in statuses],
+                        "total": sum(counts.values()),
+                    }
+                )
+            return sorted(result, key=lambda row: -row["total"])
+
+        by_status = rollups.open_counts(rollups.STATUS)
+        by_task_type = rollups.open_counts(rollups.TASK_TYPE)
+        top = [row["value"] for row in rollups.top_open_assignees(self.top_assignees)]
+        by_assignee = rollups.open_counts(rollups.ASSIGNEE, values=top)
+        task_types = TaskType.objects.in_bulk(map(int, by_task_type))
+        workers = Worker.objects.only("username").in_bulk(map(int, top))
+
+        context["statuses"] = statuses
+        context["status_totals"] = [
+            (status.label, by_status.get(status, {}).get(status, 0))
+            for status in statuses
+        ]
+        context["open_total"] = sum(total for _, total in context["status_totals"])
+        context["overdue_total"] = rollups.overdue_count()
+        context["priority_rows"] = rows(
+            rollups.open_counts(rollups.PRIORITY), dict(Priority.choices)
+        )
+        context["task_type_rows"] = rows(
+            by_task_type,
+            {str(pk): task_type.name for pk, task_type in task_types.items()},
+        )
+        context["assignee_rows"] = rows(
+            by_assignee,
+            {str(pk): worker.username for pk, worker in workers.items()},
+        )
+        return context
+
+
+class TaskTrendView(LoginRequiredMixin, ReplicaReadMixin, generic.View):
+    """Daily snapshot series of one dimension as JSON, for trend and burndown charts."""
+
+    default_days = 365
+    max_days = 366
+
+    def get(self, request, dimension):
+        if dimension not in snapshots.DIMENSIONS:
+            raise Http404("Unknown dimension.")
+        try:
+            days = int(request.GET.get("days", self.default_days))
+        except ValueError:
+            days = self.default_days
+        days = min(max(days, 1), self.max_days)
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+        statuses = [
+            status
+            for status in request.GET.getlist("status")
+            if status in Status.values
+        ]
+
+        dates, series = snapshots.series(dimension, start, end, statuses)
+        return JsonResponse(
+            {
+                "dimension": dimension,
+                "dates": [date.isoformat() for date in dates],
+                "series": [
+                    {"value": value, "label": label, "counts": series[value]}
+                    for value, label in self.labels(dimension, series).items()
+                ],
+            }
+        )
+
+    def labels(self, dimension, series):
+        if dimension == rollups.STATUS:
+            names = dict(Status.choices)
+        elif dimension == rollups.PRIORITY:
+            names = dict(Priority.choices)
+        elif dimension == rollups.TASK_TYPE:
+            names = {
+                str(pk): task_type.name
+                for pk, task_type in TaskType.objects.in_bulk(map(int, series)).items()
+            }
+        else:
+            names = {
+                str(pk): worker.username
+                for pk, worker in Worker.objects.only("username")
+                .in_bulk(map(int, series))
+                .items()
+            }
+        return {value: names.get(value, value) for value in sorted(series)}
+
+
+class TaskTypeListView(
+    LoginRequiredMixin, ReplicaReadMixin, SearchListViewMixin, generic.ListView
+):
     """Displays a paginated list of task types with a search form."""
 
     model = TaskType
@@ -76,7 +233,7 @@ class TaskTypeListView(LoginRequiredMixin, SearchListViewMixin, generic.ListView
     search_form_class = TaskTypeSearchForm
 
 
-class TaskTypeDetailView(LoginRequiredMixin, generic.DetailView):
+class TaskTypeDetailView(LoginRequiredMixin, ReplicaReadMixin, generic.DetailView):
     """Displays details of a specific task type."""
 
     model = TaskType
@@ -111,7 +268,7 @@ class TaskTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
     template_name = "tasks/task_type_confirm_delete.html"
 
 
-class TaskListView(LoginRequiredMixin, generic.ListView):
+class TaskListView(LoginRequiredMixin, ReplicaReadMixin, generic.ListView):
     """Displays a list of all tasks with advanced filtering by status and priority."""
 
     model = Task
@@ -124,20 +281,116 @@ class TaskListView(LoginRequiredMixin, generic.ListView):
         data = self.request.GET.copy()
         if not data:
             data["active_filter"] = "active"
-        self.filterset = TaskFilter(data, queryset=queryset)
+        self.filterset = TaskFilter(
+            data,
+            queryset=queryset,
+            archive_queryset=ArchivedTask.objects.select_related(
+                "task_type"
+            ).prefetch_related("assignee"),
+        )
         return self.filterset.qs.distinct()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filter"] = self.filterset
+        if self.filterset.is_valid():
+            facets.label_options(
+                self.filterset.form,
+                facets.for_filterset(
+                    self.filterset, saved_filters.clean_params(self.filterset.data)
+                ),
+            )
+        context["saved_filter_form"] = SavedFilterForm()
         return context
 
 
-class TaskDetailView(LoginRequiredMixin, generic.DetailView):
-    """Displays task details and handles adding new comments via POST request."""
+class SavedFilterTaskListView(LoginRequiredMixin, ReplicaReadMixin, generic.ListView):
+    """Tasks matched by a saved filter, paged over its stored matches."""
+
+    context_object_name = "tasks"
+    template_name = "tasks/task_list.html"
+    paginate_by = 10
+
+    def get_queryset(self):
+        self.saved_filter = get_object_or_404(
+            saved_filters.visible_to(self.request.user), pk=self.kwargs["pk"]
+        )
+        ids = saved_filters.matched_ids(self.saved_filter)
+        if saved_filters.refresh_if_stale(self.saved_filter):
+            # Just written to the primary; a replica may not have them yet.
+            ids = ids.using(DEFAULT_DB_ALIAS)
+        return ids
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page_ids = context["object_list"]
+        tasks = (
+            Task.objects.select_related("task_type")
+            .prefetch_related("assignee")
+            .in_bulk(page_ids)
+        )
+        context["tasks"] = [tasks[pk] for pk in page_ids if pk in tasks]
+        context["filter"] = TaskFilter(
+            self.saved_filter.params, queryset=Task.objects.none()
+        )
+        context["saved_filter"] = self.saved_filter
+        return context
+
+
+class SavedFilterCreateView(LoginRequiredMixin, generic.CreateView):
+    """Saves the task list's current filter under a name."""
+
+    model = SavedFilter
+    form_class = SavedFilterForm
+    http_method_names = ["post"]
+
+    def form_valid(self, form):
+        form.instance.owner = self.request.user
+        form.instance.params = saved_filters.clean_params(self.request.GET) or {
+            "active_filter": TaskFilter.STATUS_ACTIVE
+        }
+        if form.cleaned_data["shared"]:
+            form.instance.position_id = self.request.user.position_id
+        response = super().form_valid(form)
+        saved_filters.refresh(self.object)
+        return response
+
+    def form_invalid(self, form):
+        messages.error(self.request, "Give the filter a name to save it.")
+        return redirect(f"{reverse('task-list')}?{self.request.GET.urlencode()}")
+
+
+class SavedFilterDeleteView(LoginRequiredMixin, generic.DeleteView):
+    """Deletes one of the current user's saved filters."""
+
+    success_url = reverse_lazy("task-list")
+    http_method_names = ["post"]
+
+    def get_queryset(self):
+        return SavedFilter.objects.filter(owner=self.request.user)
+
+
+def is_ajax(request):
+    return request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+
+class TaskDetailView(LoginRequiredMixin, ReplicaReadMixin, generic.DetailView):
+    """Displays task details and handles adding new comments via POST request.
+
+    Comments posted asynchronously get back only the rendered comment fragment.
+    """
 
     model = Task
     template_name = "tasks/task_detail.html"
+    waiting_tasks_shown = 20
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            if ArchivedTask.objects.filter(pk=kwargs["pk"]).exists():
+                return redirect("archived-task-detail", pk=kwargs["pk"])
+            raise
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -145,6 +398,25 @@ class TaskDetailView(LoginRequiredMixin, generic.DetailView):
         context["comments"] = task.comments.select_related("author")
         if "comment_form" not in context:
             context["comment_form"] = CommentForm()
+        context["depends_on"] = [
+            dependency.depends_on
+            for dependency in task.dependencies.select_related("depends_on")
+        ]
+        context["needed_by"] = [
+            dependency.task for dependency in task.dependents.select_related("task")
+        ]
+        waiting = dependencies.blocked_by(task).only("id", "name", "status")
+        context["waiting_tasks"] = waiting[: self.waiting_tasks_shown]
+        context["waiting_count"] = waiting.count()
+        context["dependency_form"] = TaskDependencyForm(task=task)
+        context["breadcrumb"] = hierarchy.breadcrumb(task)
+        context["subtasks"] = task.children.only(
+            "id", "name", "status", "subtask_count"
+        )
+        context["subtree_statuses"] = [
+            (Status(status).label, count)
+            for status, count in sorted(hierarchy.subtree_status_counts(task).items())
+        ]
         return context
 
     def post(self, request, *args, **kwargs):
@@ -155,11 +427,87 @@ class TaskDetailView(LoginRequiredMixin, generic.DetailView):
             comment.task = task
             comment.author = request.user
             comment.save()
+            if is_ajax(request):
+                return render(
+                    request, "includes/comment.html", {"comment": comment}, status=201
+                )
             return redirect("task-detail", pk=task.pk)
+        if is_ajax(request):
+            return JsonResponse({"errors": form.errors}, status=400)
         context = self.get_context_data()
         return self.render_to_response(context)
 
 
+class TaskDependencyCreateView(LoginRequiredMixin, generic.View):
+    """Makes a task depend on another one, refusing cycles."""
+
+    def post(self, request, pk):
+        task = get_object_or_404(Task, pk=pk)
+        form = TaskDependencyForm(request.POST, task=task)
+        if form.is_valid():
+            try:
+                dependencies.add(task, form.cleaned_data["depends_on"])
+            except ValueError as error:
+                messages.error(request, str(error))
+        else:
+            for error in form.errors.get("depends_on", []):
+                messages.error(request, error)
+        return redirect("task-detail", pk=pk)
+
+
+class TaskDependencyDeleteView(LoginRequiredMixin, generic.View):
+    """Removes one dependency of a task."""
+
+    def post(self, request, pk, depends_on_pk):
+        if not dependencies.remove(pk, depends_on_pk):
+            raise Http404("No such dependency.")
+        return redirect("task-detail", pk=pk)
+
+
+class ArchivedTaskDetailView(LoginRequiredMixin, ReplicaReadMixin, generic.DetailView):
+    """Displays an archived task and its comments, read-only."""
+
+    model = ArchivedTask
+    context_object_name = "task"
+    template_name = "tasks/archived_task_detail.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comments"] = self.object.comments.select_related("author")
+        return context
+
+
+class ArchivedTaskRestoreView(LoginRequiredMixin, generic.View):
+    """Moves an archived task back into the task table."""
+
+    def post(self, request, pk):
+        if not archive.restore([pk]):
+            raise Http404("No archived task found.")
+        return redirect("task-detail", pk=pk)
+
+
+class TaskCommentStreamView(LoginRequiredMixin, generic.View):
+    """Streams new, edited and deleted comments of a task as server-sent events.
+
+    Under ASGI each stream is a coroutine, so one process can hold thousands of
+    them; under WSGI every stream occupies a worker thread.
+    """
+
+    def get(self, request, pk):
+        task = get_object_or_404(Task.objects.only("id"), pk=pk)
+        stream = CommentStream(
+            task.pk, parse_last_event_id(request.headers.get("last-event-id"))
+        )
+        if isinstance(request, ASGIRequest):
+            events = stream.aevents()
+        else:
+            events = stream.events()
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class TaskCreateView(LoginRequiredMixin, generic.CreateView):
     """Provides a form to create a new task."""
 
@@ -168,6 +516,23 @@ class TaskCreateView(LoginRequiredMixin, generic.CreateView):
     success_url = reverse_lazy("task-list")
     template_name = "tasks/task_form.html"
 
+    def get_initial(self):
+        initial = super().get_initial()
+        parent = self.request.GET.get("parent", "")
+        if parent.isdigit():
+            initial["parent"] = int(parent)
+        return initial
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if form.cleaned_data["auto_assign"] and not form.cleaned_data["assignee"]:
+            worker = assignment.balancer.assign(self.object)
+            if worker is None:
+                messages.warning(self.request, "No worker could take this task.")
+            else:
+                messages.success(self.request, f"Assigned to {worker.username}.")
+        return response
+
 
 class TaskUpdateView(LoginRequiredMixin, generic.UpdateView):
     """Provides a form to update an existing task."""
@@ -187,7 +552,54 @@ class TaskDeleteView(LoginRequiredMixin, generic.DeleteView):
     template_name = "tasks/task_confirm_delete.html"
 
 
-class WorkerListView(LoginRequiredMixin, generic.ListView):
+class ActivityListView(LoginRequiredMixin, ReplicaReadMixin, generic.ListView):
+    """Base for the paginated activity log of a single task or worker."""
+
+    context_object_name = "activities"
+    template_name = "tasks/activity_list.html"
+    paginate_by = 20
+    subject_model = None
+    subject_field = None
+
+    def get_subject(self):
+        return get_object_or_404(self.subject_model, pk=self.kwargs["pk"])
+
+    def get_queryset(self):
+        self.subject = self.get_subject()
+        return (
+            TaskActivity.objects.filter(**{f"{self.subject_field}_id": self.subject.pk})
+            .select_related("actor")
+            .order_by("-created_at")
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["subject"] = self.subject
+        return context
+
+
+class TaskActivityListView(ActivityListView):
+    """Displays the history of changes made to a task."""
+
+    subject_model = Task
+    subject_field = "task"
+
+    def get_subject(self):
+        pk = self.kwargs["pk"]
+        task = Task.objects.filter(pk=pk).first()
+        if task is None:
+            task = get_object_or_404(ArchivedTask, pk=pk)
+        return task
+
+
+class WorkerActivityListView(ActivityListView):
+    """Displays the changes a worker has made across all tasks."""
+
+    subject_model = Worker
+    subject_field = "actor"
+
+
+class WorkerListView(LoginRequiredMixin, ReplicaReadMixin, generic.ListView):
     """Displays a list of workers with search by username, first name, and last name."""
 
     model = Worker
@@ -213,13 +625,69 @@ class WorkerListView(LoginRequiredMixin, generic.ListView):
         return context
 
 
-class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
+class WorkerDetailView(LoginRequiredMixin, ReplicaReadMixin, generic.DetailView):
     """Displays the profile of a specific worker."""
 
     model = Worker
     context_object_name = "worker"
     template_name = "tasks/worker_detail.html"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.object.pk == self.request.user.pk:
+            context["calendar_url"] = self.request.build_absolute_uri(
+                reverse(
+                    "worker-calendar", kwargs={"token": ical.make_token(self.object.pk)}
+                )
+            )
+        return context
+
+
+class WorkerCalendarView(generic.View):
+    """Serves a worker's open task deadlines as an iCalendar feed.
+
+    Calendar apps poll it without a session, so the signed token in the URL
+    stands in for a login. Reads stay on the primary: a feed read from a
+    lagging replica would be cached under the newer version.
+    """
+
+    def get(self, request, token):
+        worker_id = ical.worker_for_token(token)
+        if worker_id is None:
+            raise Http404("Unknown calendar.")
+        if ical.enabled():
+            version = ical.version(worker_id)
+            etag = ical.etag(worker_id, version)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                body = cache.get(ical.body_key(worker_id, version))
+                if body is None:
+                    self.check_worker(worker_id)
+                    body = ical.cached_stream(worker_id, version)
+                response = self.feed_response(body)
+        else:
+            self.check_worker(worker_id)
+            body = b"".join(ical.stream(worker_id))
+            etag = ical.body_etag(body)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = self.feed_response(body)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def check_worker(self, worker_id):
+        if not Worker.objects.filter(pk=worker_id, is_active=True).exists():
+            raise Http404("Unknown calendar.")
+
+    def feed_response(self, body):
+        response_class = (
+            HttpResponse if isinstance(body, bytes) else StreamingHttpResponse
+        )
+        response = response_class(body, content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = 'inline; filename="deadlines.ics"'
+        return response
+
 
 class WorkerCreateView(LoginRequiredMixin, generic.CreateView):
     """Handles new worker registration using a custom UserCreationForm."""
@@ -248,7 +716,9 @@ class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
     template_name = "tasks/worker_confirm_delete.html"
 
 
-class PositionListView(LoginRequiredMixin, SearchListViewMixin, generic.ListView):
+class PositionListView(
+    LoginRequiredMixin, ReplicaReadMixin, SearchListViewMixin, generic.ListView
+):
     """Displays a paginated list of positions with search functionality."""
 
     model = Position
@@ -258,7 +728,7 @@ class PositionListView(LoginRequiredMixin, SearchListViewMixin, generic.ListView
     search_form_class = PositionSearchForm
 
 
-class PositionDetailView(LoginRequiredMixin, generic.DetailView):
+class PositionDetailView(LoginRequiredMixin, ReplicaReadMixin, generic.DetailView):
     """Displays details of a specific position."""
 
     model = Position
@@ -319,3 +789,27 @@ class CommentDeleteView(LoginRequiredMixin, generic.DeleteView):
 
     def get_success_url(self):
         return self.object.task.get_absolute_url()
+
+
+class NotificationListView(LoginRequiredMixin, generic.ListView):
+    """Lists the signed-in worker's notifications, marking the shown ones read."""
+
+    context_object_name = "notifications"
+    template_name = "tasks/notification_list.html"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).select_related(
+            "actor", "task", "comment"
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        unread = [
+            notification.pk
+            for notification in context["notifications"]
+            if notification.read_at is None
+        ]
+        if unread:
+            Notification.objects.filter(pk__in=unread).update(read_at=timezone.now())
+        return context
@@ -0,0 +1,95 @@
+"""A local webhook receiver for development and tests.
+
+``StubReceiver`` listens on a free local port in a background thread,
+answers every POST with a fixed status and headers after an optional
+delay, and keeps what it received. ``manage.py run_webhook_stub`` runs one in the
+foreground and prints each batch.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class Received:
+    path: str
+    headers: dict
+    body: bytes
+
+    @property
+    def json(self):
+        return json.loads(self.body)
+
+
+class StubReceiver:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        status=200,
+        delay=0,
+        on_receive=None,
+        headers=None,
+    ):
+        self.status = status
+        self.headers = headers or {}
+        self.delay = delay
+        self.on_receive = on_receive
+        self.received = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/hooks"
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                received = Received(self.path, dict(self.headers), body)
+                with receiver._lock:
+                    receiver.received.append(received)
+                if receiver.on_receive is not None:
+                    receiver.on_receive(received)
+                if receiver.delay:
+                    time.sleep(receiver.delay)
+                self.send_response(receiver.status)
+                for name, value in receiver.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,307 @@
+"""Outbound webhooks delivered through a transactional outbox.
+
+``emit`` writes an event to ``WebhookOutbox`` in the transaction that
+caused it, so a request pays for one insert and never waits on a
+subscriber, and an event exists exactly when its change committed.
+``manage.py run_webhooks`` delivers them in cycles:
+
+1. undispatched events fan out into one ``WebhookDelivery`` per active
+   endpoint subscribed to them;
+2. each endpoint's due deliveries are posted as one JSON batch, all
+   endpoints at once, over asyncio clients that keep a connection open to
+   every endpoint between cycles;
+3. a 2xx marks the batch delivered; anything else retries it with
+   exponential backoff and jitter until WEBHOOK_MAX_ATTEMPTS.
+
+Delivery is at least once. A batch whose response was lost, to a timeout
+or to a connection the endpoint closed after reading it, is posted again,
+so endpoints should skip deliveries whose ``id`` they have already seen.
+The clients keep no cookies: every batch stands on its signature alone.
+
+The deliveries double as the delivery log: status, attempts, the last
+status code, error and duration.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tasks import lookups
+from tasks.http_client import HttpClient, HttpError
+from tasks.models import (
+    DeliveryStatus,
+    WebhookDelivery,
+    WebhookEndpoint,
+    WebhookOutbox,
+)
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+TASK_FIELDS = ("name", "description", "deadline", "status", "priority", "task_type_id")
+
+PRUNE_INTERVAL = timedelta(hours=1)
+
+
+def endpoints():
+    if lookups.enabled():
+        return lookups.tables.all(WebhookEndpoint)
+    return list(WebhookEndpoint.objects.all())
+
+
+def subscribed(event):
+    return any(endpoint.is_active and endpoint.wants(event) for endpoint in endpoints())
+
+
+def emit(event, payload):
+    """Queue ``event`` for delivery once the current transaction commits."""
+    if subscribed(event):
+        WebhookOutbox.objects.create(event=event, payload=payload)
+
+
+def task_payload(task, changed=()):
+    payload = {
+        "id": task.pk,
+        "name": task.name,
+        "description": task.description,
+        "status": task.status,
+        "priority": task.priority,
+        "deadline": task.deadline.isoformat() if task.deadline else None,
+        "task_type": task.task_type_id,
+        "parent": task.parent_id,
+        "url": settings.SITE_URL.rstrip("/") + task.get_absolute_url(),
+    }
+    if changed:
+        payload["changed"] = sorted(name.removesuffix("_id") for name in changed)
+    return payload
+
+
+def comment_payload(comment):
+    return {
+        "id": comment.pk,
+        "task": comment.task_id,
+        "author": comment.author.username,
+        "content": comment.content,
+        "created_at": comment.created_at.isoformat(),
+    }
+
+
+def dispatch(limit=1000):
+    """Fan undispatched events out into deliveries; the number of events."""
+    with transaction.atomic():
+        events = list(
+            WebhookOutbox.objects.filter(dispatched=False).order_by("pk")[:limit]
+        )
+        if not events:
+            return 0
+        active = list(WebhookEndpoint.objects.filter(is_active=True))
+        WebhookDelivery.objects.bulk_create(
+            WebhookDelivery(endpoint=endpoint, outbox=event)
+            for event in events
+            for endpoint in active
+            if endpoint.wants(event.event)
+        )
+        WebhookOutbox.objects.filter(pk__in=[event.pk for event in events]).update(
+            dispatched=True
+        )
+    return len(events)
+
+
+def due_batches(now=None):
+    """``[(endpoint, deliveries)]`` of every endpoint with deliveries due."""
+    now = now or timezone.now()
+    batches = []
+    for endpoint in WebhookEndpoint.objects.filter(is_active=True):
+        deliveries = list(
+            endpoint.deliveries.filter(
+                status=DeliveryStatus.PENDING, next_attempt_at__lte=now
+            )
+            .select_related("outbox")
+            .order_by("next_attempt_at", "pk")[: settings.WEBHOOK_BATCH_SIZE]
+        )
+        if deliveries:
+            batches.append((endpoint, deliveries))
+    return batches
+
+
+def encode(deliveries):
+    return json.dumps(
+        {
+            "deliveries": [
+                {
+                    "id": delivery.pk,
+                    "event": delivery.outbox.event,
+                    "created_at": delivery.outbox.created_at,
+                    "data": delivery.outbox.payload,
+                }
+                for delivery in deliveries
+            ]
+        },
+        cls=DjangoJSONEncoder,
+    ).encode()
+
+
+def signature(secret, body):
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``, doubling with jitter."""
+    delay = min(
+        settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.WEBHOOK_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def record(deliveries, status_code, error, duration_ms, now=None):
+    """Log one attempt at a batch and schedule what is left of it."""
+    now = now or timezone.now()
+    delivered = status_code is not None and 200 <= status_code < 300
+    for delivery in deliveries:
+        delivery.attempts += 1
+        delivery.last_status_code = status_code
+        delivery.last_error = error
+        delivery.last_duration_ms = duration_ms
+        if delivered:
+            delivery.status = DeliveryStatus.DELIVERED
+            delivery.delivered_at = now
+        elif delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            delivery.status = DeliveryStatus.FAILED
+        else:
+            delivery.next_attempt_at = now + timedelta(
+                seconds=backoff(delivery.attempts)
+            )
+    WebhookDelivery.objects.bulk_update(
+        deliveries,
+        [
+            "status",
+            "attempts",
+            "next_attempt_at",
+            "last_status_code",
+            "last_error",
+            "last_duration_ms",
+            "delivered_at",
+        ],
+    )
+    return delivered
+
+
+def prune(now=None):
+    """Delete dispatched events older than WEBHOOK_RETENTION_DAYS.
+
+    Events with a delivery still pending are kept; the rest go with their
+    delivery log.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.WEBHOOK_RETENTION_DAYS)
+    pending = WebhookDelivery.objects.filter(
+        outbox=OuterRef("pk"), status=DeliveryStatus.PENDING
+    )
+    deleted, _ = (
+        WebhookOutbox.objects.filter(dispatched=True, created_at__lt=cutoff)
+        .exclude(Exists(pending))
+        .delete()
+    )
+    return deleted
+
+
+class Deliverer:
+    """Runs delivery cycles, keeping one HTTP connection per endpoint.
+
+    Database work happens between the network rounds, outside the event
+    loop, so the ORM is only ever used synchronously.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._clients = {}
+        self._pruned_at = None
+
+    def client(self, endpoint):
+        parts = urlsplit(endpoint.url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        current = self._clients.get(endpoint.pk)
+        if current is None or current[0] != origin:
+            if current is not None:
+                self._loop.run_until_complete(current[1].close())
+            current = (
+                origin,
+                HttpClient(origin, timeout=settings.WEBHOOK_TIMEOUT, cookies=False),
+            )
+            self._clients[endpoint.pk] = current
+        return current[1]
+
+    async def post(self, client, endpoint, body, semaphore):
+        parts = urlsplit(endpoint.url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "task-manager-webhooks",
+        }
+        if endpoint.secret:
+            headers[SIGNATURE_HEADER] = signature(endpoint.secret, body)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    "POST", path, body=body, headers=headers
+                )
+            except HttpError as error:
+                status_code, message = None, str(error)
+            else:
+                status_code = response.status
+                message = "" if response.status < 300 else response.text[:500]
+            return status_code, message, int((time.perf_counter() - started) * 1000)
+
+    async def post_all(self, requests):
+        semaphore = asyncio.Semaphore(settings.WEBHOOK_CONCURRENCY)
+        return await asyncio.gather(
+            *(self.post(*request, semaphore) for request in requests)
+        )
+
+    def run_once(self):
+        """One delivery cycle; returns ``(delivered, failed)`` deliveries."""
+        dispatch()
+        batches = due_batches()
+        requests = [
+            (self.client(endpoint), endpoint, encode(deliveries))
+            for endpoint, deliveries in batches
+        ]
+        results = self._loop.run_until_complete(self.post_all(requests))
+        delivered = failed = 0
+        now = timezone.now()
+        for (endpoint, deliveries), result in zip(batches, results):
+            if record(deliveries, *result, now=now):
+                delivered += len(deliveries)
+            else:
+                failed += len(deliveries)
+                logger.warning(
+                    "Webhook batch of %d to %s failed: %s",
+                    len(deliveries),
+                    endpoint.url,
+                    f"HTTP {result[0]}" if result[0] else result[1],
+                )
+        if self._pruned_at is None or now - self._pruned_at >= PRUNE_INTERVAL:
+            prune(now)
+            self._pruned_at = now
+        return delivered, failed
+
+    def close(self):
+        for _, client in self._clients.values():
+            self._loop.run_until_complete(client.close())
+        self._clients.clear()
+        self._loop.close()